@@ -1,20 +1,77 @@
+import os
+import threading
+
 from flask import Flask, render_template
+from config import Config
+from models.database import db
+from models.model_registry import model_registry
+from models.response_cache import response_cache
+from models.email_outbox import email_outbox
+from models.email_service import email_service
+from models.sla_engine import sla_engine
+from models.priority_engine import priority_engine
+from models.duplicate_index import duplicate_index
+from models.metrics import metrics
+from models.event_bus import event_bus
+from models.department_directory import department_directory
+from models.archiver import complaint_archiver
+
+_services_lock = threading.Lock()
+
+def start_background_services(app):
+    """Start the model warm-up, email outbox, SLA sweep and archiver threads in this process.
+
+    Serving processes call this (the first request does it otherwise);
+    CLI commands and server supervisors never do, so no work runs twice.
+    """
+    with _services_lock:
+        if app.extensions.get('background_services') == os.getpid():
+            return
+        app.extensions['background_services'] = os.getpid()
+    model_registry.start()
+    email_outbox.start()
+    sla_engine.start()
+    complaint_archiver.start()
 
 def create_app():
     app = Flask(__name__)
-    app.config['SECRET_KEY'] = 'your-secret-key-here'
+    app.config.from_object(Config)
+    
+    # Create the schema once at startup, not per blueprint import
+    db.init_app(app)
+    model_registry.init_app(app)
+    response_cache.init_app(app, db)
+    email_outbox.init_app(app, db, email_service)
+    department_directory.init_app(app, db)
+    event_bus.init_app(app, db)
+    sla_engine.init_app(app, db, email_service, event_bus)
+    complaint_archiver.init_app(app, db)
+    priority_engine.init_app(app)
+    duplicate_index.init_app(app, db, model_registry)
+    metrics.init_app(app, db)
     
     # Register blueprints directly to avoid circular imports
     from routes.complaints import complaints_bp
     from routes.departments import departments_bp
     from routes.dashboard import dashboard_bp
     from routes.auth import auth_bp
+    from routes.export import export_bp
+    from routes.events import events_bp
     
     app.register_blueprint(complaints_bp)
     app.register_blueprint(departments_bp)
     app.register_blueprint(dashboard_bp)
     app.register_blueprint(auth_bp)
+    app.register_blueprint(export_bp)
+    app.register_blueprint(events_bp)
+
+    from cli import complaints_cli
+    app.cli.add_command(complaints_cli)
     
+    @app.before_request
+    def start_services():
+        start_background_services(app)
+
     @app.route('/')
     def index():
         return render_template('index.html')
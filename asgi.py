@@ -0,0 +1,56 @@
+"""Production entry point: the app behind an ASGI server.
+
+    python asgi.py                        # uvicorn, ASGI_WORKERS processes
+    uvicorn asgi:app --port 8000          # any ASGI server can load asgi:app
+
+Requests run on ASGI_THREADS threads per worker process. The Flask app and
+its background services are created in each worker at lifespan startup,
+never at import, so the server supervisor does not run them.
+"""
+import socket
+
+from app import create_app, start_background_services
+from config import Config
+from models.asgi_bridge import AsgiBridge
+from models.event_bus import event_bus
+
+def build_app():
+    """The Flask app for this worker process, with its background services running"""
+    flask_app = create_app()
+    start_background_services(flask_app)
+    return flask_app
+
+app = AsgiBridge(
+    factory=build_app,
+    threads=Config.ASGI_THREADS,
+    # Live event streams wait on the event loop rather than a request thread
+    routes={'/api/events': event_bus.asgi_app}
+)
+
+def serve():
+    try:
+        import uvicorn
+        from uvicorn.supervisors import Multiprocess
+    except ImportError:
+        raise SystemExit('Serving with asgi.py requires uvicorn>=0.30 (pip install uvicorn)')
+
+    config = uvicorn.Config(
+        'asgi:app',
+        host=Config.ASGI_HOST,
+        port=Config.ASGI_PORT,
+        workers=Config.ASGI_WORKERS,
+        log_level='warning',
+        # Event streams never finish on their own; do not wait on them forever
+        timeout_graceful_shutdown=5
+    )
+    sock = config.bind_socket()
+    # Accepted connections inherit this. Without it a keep-alive response
+    # written as headers + body waits ~40 ms on the client's delayed ACK.
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    if config.workers > 1:
+        Multiprocess(config, sockets=[sock]).run()
+    else:
+        uvicorn.Server(config).run(sockets=[sock])
+
+if __name__ == '__main__':
+    serve()
@@ -0,0 +1,54 @@
+"""Compare two endpoint benchmark results and flag regressions.
+
+    python -m benchmarks.compare baseline.json current.json [--threshold 0.2] [--metric p95_ms]
+
+Exits with status 1 when any endpoint's metric grew by more than the
+threshold (a fraction: 0.2 = 20% slower), so it can gate a CI job.
+"""
+import argparse
+import json
+import sys
+
+def _by_endpoint(path):
+    with open(path) as f:
+        data = json.load(f)
+    return {result['endpoint']: result for result in data.get('results', [])}
+
+def compare(baseline, current, metric='p95_ms', threshold=0.2, floor_ms=0.5):
+    """Rows of (endpoint, before, after, change, regressed); changes under floor_ms are noise"""
+    rows = []
+    for endpoint, result in current.items():
+        before = baseline.get(endpoint, {}).get(metric)
+        after = result.get(metric)
+        if before is None or after is None:
+            rows.append((endpoint, before, after, None, False))
+            continue
+        change = (after - before) / before if before else 0.0
+        regressed = change > threshold and after - before > floor_ms
+        rows.append((endpoint, before, after, change, regressed))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('baseline')
+    parser.add_argument('current')
+    parser.add_argument('--metric', default='p95_ms', choices=['p50_ms', 'p95_ms', 'p99_ms', 'mean_ms'])
+    parser.add_argument('--threshold', type=float, default=0.2)
+    args = parser.parse_args()
+
+    rows = compare(_by_endpoint(args.baseline), _by_endpoint(args.current), args.metric, args.threshold)
+    for endpoint, before, after, change, regressed in rows:
+        if change is None:
+            print(f"{endpoint:>24}  {'new' if before is None else 'missing'}")
+            continue
+        marker = '❌ regression' if regressed else ''
+        print(f"{endpoint:>24}  {before:>9.3f} -> {after:>9.3f} ms  {change:+7.1%}  {marker}")
+
+    regressions = [row for row in rows if row[4]]
+    if regressions:
+        print(f"❌ {len(regressions)} endpoint(s) slower than {args.threshold:.0%} on {args.metric}")
+        sys.exit(1)
+    print(f"✅ No {args.metric} regressions above {args.threshold:.0%}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Benchmark the compiled classifier against the sklearn pipeline.
+
+Times single-complaint classification (the /predict path) and batches of
+increasing size with both implementations, after checking that they agree
+on every text of the corpus.
+
+    python -m benchmarks.compiled_model [--repeat 2000] [--json results.json]
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+
+import joblib
+import numpy as np
+
+from models.compiled_model import CompiledModel
+
+SAMPLE = "My credit card was charged twice for one purchase and the bank will not refund it"
+
+def _corpus(vectorizer, size, seed=0):
+    vocabulary = list(vectorizer.vocabulary_)
+    rng = random.Random(seed)
+    return [' '.join(rng.choices(vocabulary, k=rng.randint(20, 120))) for _ in range(size)]
+
+def _time(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1e6)
+    return {
+        'median_us': round(statistics.median(samples), 1),
+        'p95_us': round(sorted(samples)[int(len(samples) * 0.95) - 1], 1),
+    }
+
+def run(repeat, batch_sizes):
+    model = joblib.load('customer_classification_model_lr.pkl')
+    vectorizer = joblib.load('tfidf_vectorizer.pkl')
+    encoder = joblib.load('label_encoder.pkl')
+    compiled = CompiledModel.from_sklearn(model, vectorizer, encoder)
+
+    def sklearn_classify(texts):
+        return list(encoder.inverse_transform(model.predict(vectorizer.transform(texts))))
+
+    corpus = _corpus(vectorizer, max(batch_sizes))
+    assert np.array_equal(compiled.decision_function(corpus),
+                          model.decision_function(vectorizer.transform(corpus))), 'scores differ'
+    print(f"✓ Identical scores on {len(corpus)} texts")
+
+    results = []
+    cases = [('single', [SAMPLE], repeat)] + [
+        (f'batch_{size}', corpus[:size], max(3, repeat // size)) for size in batch_sizes
+    ]
+    for name, texts, runs in cases:
+        result = {
+            'case': name,
+            'texts': len(texts),
+            'sklearn': _time(lambda: sklearn_classify(texts), runs),
+            'compiled': _time(lambda: compiled.classify(texts), runs),
+        }
+        result['speedup'] = round(result['sklearn']['median_us'] / result['compiled']['median_us'], 2)
+        results.append(result)
+        print(f"{name:>12}  sklearn {result['sklearn']['median_us']:>12,.1f} us  "
+              f"compiled {result['compiled']['median_us']:>12,.1f} us  x{result['speedup']}")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=2000)
+    parser.add_argument('--batch-sizes', default='32,1000', help='comma separated batch sizes')
+    parser.add_argument('--json', help='write results to this file')
+    args = parser.parse_args()
+
+    batch_sizes = [int(size) for size in args.batch_sizes.split(',') if size]
+    results = run(args.repeat, batch_sizes)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'repeat': args.repeat, 'results': results}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""Time every /api/* endpoint under the Flask test client.
+
+Builds (or reuses) a synthetic database, creates the app against it with
+background threads and response caching off, then calls each endpoint
+``--repeat`` times after a warm-up call and reports p50/p95/p99 latency.
+POST endpoints insert rows, so point --db at a scratch copy. The event
+stream is timed twice: connecting until its opening lines arrive, and
+from a publish until the event reaches the open stream.
+
+Not timed: login/register (one-shot accounts, dominated by password
+hashing), department create/delete and model reload (admin writes that
+change what the other cases measure), and /api/feedback, whose
+blueprint is not registered with the app.
+
+    python -m benchmarks.endpoints --rows 100k [--db bench.db] [--json results.json]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+
+from benchmarks.stats import summarize
+from benchmarks.synthetic import build, parse_size
+
+def _cases(client):
+    """(name, method, url, kwargs) for each endpoint, using ids from the database"""
+    from models.database import db
+
+    complaint_id = db.fetch_one('SELECT MAX(id) FROM complaints')[0] or 1
+    page = client.get('/api/complaints?limit=50&fields=id').get_json()
+    cursor = page.get('next_cursor') or ''
+    batch = [f'The debt collector keeps calling me about account {i}' for i in range(32)]
+    month = 'date_from=2024-01-01&date_to=2024-01-31'
+
+    return [
+        ('complaints_first_page', 'GET', '/api/complaints?limit=50', {}),
+        ('complaints_next_page', 'GET', f'/api/complaints?limit=50&cursor={cursor}', {}),
+        ('complaints_by_status', 'GET', '/api/complaints?limit=50&status=Pending', {}),
+        ('complaints_date_range', 'GET', '/api/complaints?limit=50&date_from=2024-01-01&date_to=2024-01-31', {}),
+        ('complaints_search', 'GET', '/api/complaints/search?q=late%20fee&limit=20', {}),
+        ('complaint_details', 'GET', f'/api/complaint_details/{complaint_id}', {}),
+        ('complaint_duplicates', 'GET', f'/api/complaints/{complaint_id}/duplicates', {}),
+        ('analytics', 'GET', '/api/analytics', {}),
+        ('kpi_metrics', 'GET', '/api/kpi_metrics', {}),
+        ('departments', 'GET', '/api/departments', {}),
+        ('sla_status', 'GET', '/api/sla_status', {}),
+        ('inference_stats', 'GET', '/api/inference_stats', {}),
+        ('model_status', 'GET', '/api/admin/model', {}),
+        ('email_queue', 'GET', '/api/admin/email_queue', {}),
+        ('export_month_csv', 'GET', f'/api/export/complaints?{month}', {}),
+        ('export_feedback_csv', 'GET', f'/api/export/feedback?{month}&fields=id,rating,predicted_category', {}),
+        ('sla_check', 'GET', '/api/sla_check', {}),
+        ('priority_analysis', 'GET', '/api/priority_analysis', {}),
+        ('archive_status', 'GET', '/api/admin/archive', {}),
+        ('events_connect', 'STREAM', '/api/events', {}),
+        ('events_first_event', 'STREAM', '/api/events', {'publish': complaint_id}),
+        ('predict', 'POST', '/predict',
+         {'data': {'complaint': 'My credit card was charged twice and the bank will not refund it'}}),
+        ('predict_batch_32', 'POST', '/api/predict_batch', {'json': batch}),
+    ]
+
+def _time_stream(client, url, publish=None):
+    """(milliseconds, status) until an SSE stream's opening lines arrive, or with
+    publish (a complaint id), from publishing an event until the stream delivers it"""
+    from models.event_bus import event_bus
+
+    started = time.perf_counter()
+    response = client.get(url)
+    chunks = iter(response.response)
+    try:
+        next(chunks)
+        if publish is None:
+            return (time.perf_counter() - started) * 1000, response.status_code
+        started = time.perf_counter()
+        event_id = event_bus.publish('status', publish, {'id': publish})
+        while f'id: {event_id}\n' not in next(chunks).decode():
+            pass
+        return (time.perf_counter() - started) * 1000, response.status_code
+    finally:
+        response.close()
+
+def run(db_path, repeat):
+    os.environ.update({
+        'DATABASE_PATH': db_path,
+        'SLA_CHECK_INTERVAL': '0',
+        'EMAIL_WORKERS': '0',
+        'ARCHIVE_INTERVAL': '0',
+        'RESPONSE_CACHE_TTL': '0',
+        'PREDICTION_CACHE_SIZE': '0',
+        'INFERENCE_BATCHING': 'False',
+        'MODEL_PRELOAD': 'eager',
+    })
+    from app import create_app
+    app = create_app()
+    client = app.test_client()
+
+    results = []
+    for name, method, url, kwargs in _cases(client):
+        samples = []
+        status = None
+        for i in range(repeat + 1):
+            # The routes log every request; keep that out of the report
+            with contextlib.redirect_stdout(io.StringIO()):
+                if method == 'STREAM':
+                    elapsed, status = _time_stream(client, url, **kwargs)
+                else:
+                    started = time.perf_counter()
+                    response = client.open(url, method=method, **kwargs)
+                    response.get_data()
+                    elapsed = (time.perf_counter() - started) * 1000
+                    status = response.status_code
+            if i:   # the first call warms caches and lazy loads
+                samples.append(elapsed)
+        result = {'endpoint': name, 'method': method, 'url': url, 'status': status, **summarize(samples)}
+        results.append(result)
+        print(f"{name:>24}  {status}  p50 {result['p50_ms']:>9.3f} ms  "
+              f"p95 {result['p95_ms']:>9.3f} ms  p99 {result['p99_ms']:>9.3f} ms")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', help='existing database to use (default: build a temporary one)')
+    parser.add_argument('--rows', default='10k', help='rows for a freshly built database, e.g. 10k, 100k, 1M')
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--json', help='write results to this file')
+    args = parser.parse_args()
+
+    db_path = args.db
+    rows = None
+    if not db_path:
+        rows = parse_size(args.rows)
+        db_path = os.path.join(tempfile.mkdtemp(prefix='bench-endpoints-'), 'complaints.db')
+        print(f"Building {rows:,} row database at {db_path}")
+        build(db_path, rows).close()
+
+    results = run(db_path, args.repeat)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'rows': rows, 'db': db_path, 'repeat': args.repeat, 'results': results}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""Concurrent load test against a running server.
+
+Each of ``--concurrency`` threads holds one keep-alive connection and
+issues requests from a weighted read-heavy mix (list, search, details,
+analytics, with a share of /predict) for ``--duration`` seconds. Reports
+throughput, error count and p50/p95/p99 latency overall and per endpoint.
+
+    python -m benchmarks.load --url http://127.0.0.1:5000 --concurrency 16 --duration 30
+"""
+import argparse
+import http.client
+import json
+import random
+import threading
+import time
+from urllib.parse import urlencode, urlsplit
+
+from benchmarks.stats import summarize
+
+# (name, weight, method, path); {id} is replaced with a random complaint id
+SCENARIO = [
+    ('complaints_list', 30, 'GET', '/api/complaints?limit=50'),
+    ('complaints_by_status', 10, 'GET', '/api/complaints?limit=50&status=Pending'),
+    ('complaints_search', 10, 'GET', '/api/complaints/search?q=refund&limit=20'),
+    ('complaint_details', 25, 'GET', '/api/complaint_details/{id}'),
+    ('analytics', 5, 'GET', '/api/analytics'),
+    ('kpi_metrics', 5, 'GET', '/api/kpi_metrics'),
+    ('departments', 5, 'GET', '/api/departments'),
+    ('predict', 10, 'POST', '/predict'),
+]
+
+PREDICT_TEXTS = [
+    'My credit card was charged twice and the bank will not refund it',
+    'The debt collector keeps calling me at work about a loan I already paid',
+    'My mortgage servicer lost my payment and reported me late to the bureaus',
+    'There is an account on my credit report that I never opened',
+]
+
+def _worker(base, deadline, max_id, seed, results, lock):
+    rng = random.Random(seed)
+    names = [name for name, *_ in SCENARIO]
+    weights = [weight for _, weight, *_ in SCENARIO]
+    routes = {name: (method, path) for name, _, method, path in SCENARIO}
+    samples = {}
+    errors = 0
+    conn = http.client.HTTPConnection(base.hostname, base.port or 80, timeout=30)
+
+    while time.perf_counter() < deadline:
+        name = rng.choices(names, weights)[0]
+        method, path = routes[name]
+        path = base.path.rstrip('/') + path.replace('{id}', str(rng.randint(1, max_id)))
+        body, headers = None, {}
+        if method == 'POST':
+            body = urlencode({'complaint': rng.choice(PREDICT_TEXTS)})
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+
+        started = time.perf_counter()
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 400:
+                errors += 1
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            conn.close()
+            conn = http.client.HTTPConnection(base.hostname, base.port or 80, timeout=30)
+            continue
+        samples.setdefault(name, []).append((time.perf_counter() - started) * 1000)
+
+    conn.close()
+    with lock:
+        results['errors'] += errors
+        for name, values in samples.items():
+            results['samples'].setdefault(name, []).extend(values)
+
+def run(url, concurrency, duration, max_id, seed=0):
+    base = urlsplit(url)
+    results = {'errors': 0, 'samples': {}}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(target=_worker, args=(base, deadline, max_id, seed + i, results, lock))
+        for i in range(concurrency)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    everything = [value for values in results['samples'].values() for value in values]
+    return {
+        'url': url,
+        'concurrency': concurrency,
+        'duration_s': round(elapsed, 2),
+        'requests': len(everything),
+        'errors': results['errors'],
+        'requests_per_second': round(len(everything) / elapsed, 1) if elapsed else 0.0,
+        'latency': summarize(everything),
+        'endpoints': {name: summarize(values) for name, values in sorted(results['samples'].items())},
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--max-id', type=int, default=1000, help='highest complaint id to request details for')
+    parser.add_argument('--json', help='write results to this file')
+    args = parser.parse_args()
+
+    report = run(args.url, args.concurrency, args.duration, args.max_id)
+    latency = report['latency']
+    print(f"{report['requests']:,} requests in {report['duration_s']}s with {args.concurrency} clients: "
+          f"{report['requests_per_second']:,.1f} req/s, {report['errors']} errors")
+    if latency.get('count'):
+        print(f"  p50 {latency['p50_ms']} ms  p95 {latency['p95_ms']} ms  p99 {latency['p99_ms']} ms")
+    for name, summary in report['endpoints'].items():
+        print(f"{name:>24}  {summary['count']:>7,}  p50 {summary['p50_ms']:>9.3f} ms  "
+              f"p99 {summary['p99_ms']:>9.3f} ms")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == '__main__':
+    main()
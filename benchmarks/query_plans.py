@@ -0,0 +1,116 @@
+"""Compare query plans and timings before and after the index migration.
+
+Builds two copies of a synthetic database: one stopped at schema version 2
+(no secondary indexes, queries wrapping columns in datetime()/strftime())
+and one fully migrated (indexes, plain range predicates on the timestamp
+text). Prints EXPLAIN QUERY PLAN and the median run time of each query.
+
+    python -m benchmarks.query_plans --rows 200000 [--json results.json]
+"""
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from models import migrations
+from benchmarks.synthetic import populate
+
+def _queries():
+    now = datetime.now()
+    fmt = "%Y-%m-%d %H:%M:%S"
+    sla_cutoff = (now - timedelta(hours=24)).strftime(fmt)
+    month_start = now.replace(day=1)
+    next_month = (month_start + timedelta(days=32)).replace(day=1)
+    today = now.strftime("%Y-%m-%d")
+    tomorrow = (now + timedelta(days=1)).strftime("%Y-%m-%d")
+
+    # (name, query before, params before, query after, params after)
+    return [
+        ('sla_scan',
+         """SELECT id FROM complaints WHERE resolution_status IN ('Pending', 'Assigned')
+            AND datetime(timestamp) < datetime('now', '-24 hours')""", (),
+         """SELECT id FROM complaints WHERE resolution_status IN ('Pending', 'Assigned')
+            AND timestamp < ?""", (sla_cutoff,)),
+        ('monthly_count',
+         "SELECT COUNT(*) FROM complaints WHERE strftime('%Y-%m', timestamp) = ?", (now.strftime('%Y-%m'),),
+         'SELECT COUNT(*) FROM complaints WHERE timestamp >= ? AND timestamp < ?',
+         (month_start.strftime('%Y-%m-%d'), next_month.strftime('%Y-%m-%d'))),
+        ('today_count',
+         'SELECT COUNT(*) FROM complaints WHERE date(timestamp) = ?', (today,),
+         'SELECT COUNT(*) FROM complaints WHERE timestamp >= ? AND timestamp < ?', (today, tomorrow)),
+        ('department_assigned',
+         'SELECT COUNT(*) FROM complaints WHERE assigned_department_id = ?', (1,),
+         'SELECT COUNT(*) FROM complaints WHERE assigned_department_id = ?', (1,)),
+        ('feedback_by_complaint',
+         'SELECT rating FROM feedback WHERE complaint_id = ?', (12345,),
+         'SELECT rating FROM feedback WHERE complaint_id = ?', (12345,)),
+        ('first_page_by_status',
+         """SELECT id FROM complaints WHERE resolution_status = 'Pending'
+            ORDER BY timestamp DESC, id DESC LIMIT 50""", (),
+         """SELECT id FROM complaints WHERE resolution_status = 'Pending'
+            ORDER BY timestamp DESC, id DESC LIMIT 50""", ()),
+    ]
+
+def _build(path, rows, target):
+    conn = sqlite3.connect(path)
+    migrations.migrate(conn, target=2)
+    # Index creation happens after the load in both copies so the data is identical
+    populate(conn, rows)
+    conn.executemany(
+        'INSERT INTO feedback (complaint_id, rating, comments, created_at) VALUES (?, ?, ?, ?)',
+        [(i, 1 + i % 5, None, '2024-01-01 00:00:00') for i in range(1, rows + 1, 10)]
+    )
+    conn.commit()
+    migrations.migrate(conn, target=target)
+    conn.execute('ANALYZE')
+    return conn
+
+def _time(conn, query, params, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        conn.execute(query, params).fetchall()
+        samples.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(samples), 3)
+
+def _plan(conn, query, params):
+    return [row[3] for row in conn.execute(f'EXPLAIN QUERY PLAN {query}', params)]
+
+def run(rows, repeat):
+    workdir = tempfile.mkdtemp(prefix='query-plans-')
+    before = _build(os.path.join(workdir, 'before.db'), rows, target=2)
+    after = _build(os.path.join(workdir, 'after.db'), rows, target=None)
+
+    results = []
+    for name, old_query, old_params, new_query, new_params in _queries():
+        result = {
+            'query': name,
+            'before_plan': _plan(before, old_query, old_params),
+            'before_ms': _time(before, old_query, old_params, repeat),
+            'after_plan': _plan(after, new_query, new_params),
+            'after_ms': _time(after, new_query, new_params, repeat),
+        }
+        results.append(result)
+        print(f"\n{name}")
+        print(f"  before {result['before_ms']:>9} ms  {'; '.join(result['before_plan'])}")
+        print(f"  after  {result['after_ms']:>9} ms  {'; '.join(result['after_plan'])}")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--json', help='write results to this file')
+    args = parser.parse_args()
+
+    results = run(args.rows, args.repeat)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'rows': args.rows, 'results': results}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""Compare concurrent throughput of the dev server and the ASGI entry point.
+
+Starts each server on a scratch copy of a synthetic database, drives it
+with benchmarks.load at every concurrency level, then stops it.
+
+    python -m benchmarks.serving --rows 100k --concurrency 1,8,32 --duration 15
+"""
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from benchmarks import load
+from benchmarks.synthetic import build, parse_size
+
+def _servers(port):
+    return {
+        'flask-dev': [sys.executable, '-m', 'flask', '--app', 'app', 'run', '--port', str(port), '--with-threads'],
+        'asgi': [sys.executable, 'asgi.py'],
+    }
+
+def _wait_ready(url, timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url + '/api/departments', timeout=2):
+                return
+        except OSError:
+            time.sleep(0.5)
+    raise RuntimeError(f'Server at {url} did not start within {timeout}s')
+
+def _max_id(path):
+    with sqlite3.connect(path) as conn:
+        return conn.execute('SELECT MAX(id) FROM complaints').fetchone()[0] or 1
+
+def run(source_db, concurrency_levels, duration, workers, port=5099):
+    max_id = _max_id(source_db)
+    results = []
+    for name, command in _servers(port).items():
+        scratch = os.path.join(tempfile.mkdtemp(prefix='bench-serving-'), 'complaints.db')
+        shutil.copy(source_db, scratch)
+        env = dict(os.environ, DATABASE_PATH=scratch, SLA_CHECK_INTERVAL='0', EMAIL_WORKERS='0',
+                   MODEL_PRELOAD='eager', ASGI_PORT=str(port), ASGI_WORKERS=str(workers))
+        server = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        url = f'http://127.0.0.1:{port}'
+        try:
+            _wait_ready(url)
+            for concurrency in concurrency_levels:
+                report = load.run(url, concurrency, duration, max_id)
+                report['server'] = name
+                results.append(report)
+                latency = report['latency']
+                print(f"{name:>10}  {concurrency:>4} clients  {report['requests_per_second']:>9,.1f} req/s  "
+                      f"p50 {latency.get('p50_ms', 0):>8.2f} ms  p99 {latency.get('p99_ms', 0):>8.2f} ms  "
+                      f"{report['errors']} errors")
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', help='database to copy for each server (default: build one)')
+    parser.add_argument('--rows', default='10k')
+    parser.add_argument('--concurrency', default='1,8,32', help='comma separated client counts')
+    parser.add_argument('--duration', type=float, default=10, help='seconds per concurrency level')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='ASGI worker processes')
+    parser.add_argument('--json', help='write results to this file')
+    args = parser.parse_args()
+
+    source = args.db
+    if not source:
+        source = os.path.join(tempfile.mkdtemp(prefix='bench-serving-'), 'source.db')
+        build(source, parse_size(args.rows)).close()
+    levels = [int(level) for level in args.concurrency.split(',') if level]
+    results = run(source, levels, args.duration, args.workers)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'workers': args.workers, 'results': results}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
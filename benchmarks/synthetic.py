@@ -0,0 +1,141 @@
+"""Synthetic complaint data for benchmarks.
+
+Rows are spread over the last ``days`` days with a realistic mix of
+statuses, categories and department assignments, and written with
+executemany in large transactions. Run as a script to build a fully
+migrated database of a given size:
+
+    python -m benchmarks.synthetic --db bench.db --rows 100k
+"""
+import argparse
+import random
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+from models import migrations
+
+CATEGORIES = [
+    'Bank account or service', 'Consumer Loan', 'Credit card', 'Credit reporting',
+    'Debt collection', 'Money transfers', 'Mortgage', 'Other financial service',
+    'Payday loan', 'Prepaid card', 'Student loan'
+]
+
+PHRASES = [
+    'I was charged a late fee even though I paid on time',
+    'the collector keeps calling me at work about a debt I do not owe',
+    'my credit report shows an account that is not mine',
+    'the bank closed my account without any notice',
+    'my mortgage payment was not applied to the principal',
+    'the wire transfer never arrived and nobody can tell me why',
+    'my student loan servicer lost my income driven repayment application',
+    'the prepaid card was frozen and I cannot access my money',
+    'this is urgent, the payday lender withdrew money twice',
+    'the online portal is broken and the payment failed',
+]
+
+def ensure_departments(conn, count=5):
+    existing = conn.execute('SELECT COUNT(*) FROM departments').fetchone()[0]
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    conn.executemany(
+        'INSERT INTO departments (name, email, description, created_at) VALUES (?, ?, ?, ?)',
+        [(f'Department {i}', f'dept{i}@example.com', None, now)
+         for i in range(existing + 1, count + 1)]
+    )
+    conn.commit()
+    return [row[0] for row in conn.execute('SELECT id FROM departments')]
+
+def generate_rows(count, days=730, department_ids=(), seed=42):
+    rng = random.Random(seed)
+    now = datetime.now()
+    fmt = "%Y-%m-%d %H:%M:%S"
+    for _ in range(count):
+        received = now - timedelta(seconds=rng.randint(0, days * 86400))
+        text = f"{rng.choice(PHRASES)} ({rng.randint(1, 10 ** 6)})"
+        category = rng.choice(CATEGORIES)
+        roll = rng.random()
+        if roll < 0.6 or not department_ids:
+            status, forwarded, completed = 'Completed', True, True
+        elif roll < 0.8:
+            status, forwarded, completed = 'Assigned', True, False
+        elif roll < 0.9:
+            status, forwarded, completed = 'Escalated', False, False
+        else:
+            status, forwarded, completed = 'Pending', False, False
+        if not department_ids:
+            forwarded = completed = False
+            status = 'Pending'
+
+        department_id = rng.choice(department_ids) if forwarded else None
+        forwarded_at = (received + timedelta(hours=rng.uniform(0.1, 48))).strftime(fmt) if forwarded else None
+        completed_at = (received + timedelta(hours=rng.uniform(48, 240))).strftime(fmt) if completed else None
+        priority = 'High' if rng.random() < 0.3 else 'Medium'
+        yield (text, category, received.strftime(fmt), forwarded,
+               f'Department {department_id}' if department_id else None, forwarded_at,
+               status, department_id, completed, completed_at, priority)
+
+def populate(conn, count, days=730, batch_size=50000, seed=42):
+    """Insert count synthetic complaints through conn"""
+    department_ids = ensure_departments(conn)
+    rows = generate_rows(count, days=days, department_ids=department_ids, seed=seed)
+    while True:
+        batch = [row for _, row in zip(range(batch_size), rows)]
+        if not batch:
+            break
+        conn.executemany('''
+            INSERT INTO complaints (complaint_text, predicted_category, timestamp, forwarded,
+                                    forwarded_to, forwarded_at, resolution_status,
+                                    assigned_department_id, case_completed, completed_at, priority)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', batch)
+        conn.commit()
+
+def add_feedback(conn, every=10):
+    """Rate one completed complaint in every ``every``"""
+    conn.execute('''
+        INSERT INTO feedback (complaint_id, rating, comments, created_at)
+        SELECT id, 1 + id % 5, NULL, completed_at
+        FROM complaints
+        WHERE case_completed AND id % ? = 0
+          AND id NOT IN (SELECT complaint_id FROM feedback)
+    ''', (every,))
+    conn.execute('UPDATE complaints SET feedback_provided = TRUE WHERE id IN (SELECT complaint_id FROM feedback)')
+    conn.commit()
+
+def parse_size(value):
+    """'10k', '1M' or a plain number of rows"""
+    value = value.strip().lower()
+    multiplier = {'k': 1000, 'm': 1000000}.get(value[-1:], 1)
+    return int(float(value.rstrip('km')) * multiplier)
+
+def build(path, rows, days=730, seed=42):
+    """Create or extend a fully migrated database with rows synthetic complaints"""
+    conn = sqlite3.connect(path)
+    migrations.migrate(conn)
+    # Load without secondary indexes, then build them once
+    migrations.drop_complaint_indexes(conn)
+    conn.commit()
+    populate(conn, rows, days=days, seed=seed)
+    add_feedback(conn)
+    migrations.create_complaint_indexes(conn)
+    conn.execute('ANALYZE')
+    conn.commit()
+    return conn
+
+def main():
+    parser = argparse.ArgumentParser(description='Fill a complaints database with synthetic rows.')
+    parser.add_argument('--db', default='bench.db')
+    parser.add_argument('--rows', default='10k', help='e.g. 10k, 100k, 1M')
+    parser.add_argument('--days', type=int, default=730)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rows = parse_size(args.rows)
+    started = time.perf_counter()
+    conn = build(args.db, rows, days=args.days, seed=args.seed)
+    total = conn.execute('SELECT COUNT(*) FROM complaints').fetchone()[0]
+    elapsed = time.perf_counter() - started
+    print(f"✅ Added {rows:,} complaints to {args.db} in {elapsed:.1f}s ({total:,} total)")
+
+if __name__ == '__main__':
+    main()
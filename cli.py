@@ -0,0 +1,99 @@
+import click
+import numpy as np
+from flask import current_app
+from flask.cli import AppGroup
+
+from models.archiver import complaint_archiver
+from models.database import db
+from models.model_registry import model_registry
+from models.priority_engine import priority_engine
+from models.inference_pool import InferencePool
+from models.bulk_importer import BulkImporter
+from models.compiled_model import CompiledModel
+
+complaints_cli = AppGroup('complaints', help='Complaint maintenance commands.')
+
+@complaints_cli.command('import')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--text-column', help='Column holding the complaint text (default: auto-detect).')
+@click.option('--timestamp-column', help='Column holding the received date (default: auto-detect).')
+@click.option('--completed-column', help='Column holding the completion date of Completed rows (default: auto-detect).')
+@click.option('--status', default='Completed', show_default=True,
+              type=click.Choice(['Pending', 'Assigned', 'Completed']),
+              help='Status given to imported complaints.')
+@click.option('--chunk-size', default=5000, show_default=True, help='Rows per classification chunk and transaction.')
+@click.option('--workers', type=int, default=None,
+              help='Inference processes (default: one per CPU; 0 classifies in this process).')
+@click.option('--keep-indexes', is_flag=True, help='Maintain indexes during the load instead of rebuilding them after.')
+def import_complaints(path, text_column, timestamp_column, completed_column, status, chunk_size, workers,
+                      keep_indexes):
+    """Bulk-load legacy complaints from a CSV or Parquet file, classifying each one."""
+    config = current_app.config
+    pool = InferencePool(
+        model_registry.paths,
+        workers=workers,
+        mmap_mode=config.get('MODEL_MMAP_MODE', 'r'),
+        chunk_size=chunk_size
+    )
+    importer = BulkImporter(db, pool, priority_engine, chunk_size=chunk_size,
+                            status=status, defer_indexes=not keep_indexes)
+
+    def report(stats):
+        click.echo(f"  {stats['imported']:>10,} rows  {stats['rows_per_second']:>10,.0f} rows/s")
+
+    click.echo(f"📥 Importing {path} with {pool.workers or 'no'} inference worker(s)")
+    try:
+        with pool:
+            stats = importer.run(path, text_column, timestamp_column, completed_column, progress=report)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+
+    click.echo(
+        f"✅ Imported {stats['imported']:,} complaints in {stats['seconds']}s "
+        f"({stats['rows_per_second']:,.0f} rows/s); skipped {stats['skipped']:,} empty rows"
+    )
+    if stats['bad_timestamps']:
+        click.echo(f"⚠️ {stats['bad_timestamps']:,} unreadable timestamps were set to the import time")
+    if stats['bad_completed_dates']:
+        click.echo(f"⚠️ {stats['bad_completed_dates']:,} unreadable completion dates were left empty")
+
+@complaints_cli.command('compile-model')
+@click.argument('output', type=click.Path(dir_okay=False), required=False)
+@click.option('--verify-limit', default=10000, show_default=True,
+              help='Stored complaints to check against sklearn before writing.')
+def compile_model(output, verify_limit):
+    """Export the loaded model in the compact, pickle-free compiled format.
+
+    Written to MODEL_COMPILED_PATH by default, where the model registry
+    loads it on the next start or reload.
+    """
+    output = output or model_registry.compiled_path
+    bundle = model_registry.get()
+    try:
+        compiled = CompiledModel.from_sklearn(bundle.model, bundle.vectorizer, bundle.encoder)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+
+    texts = [row[0] or '' for row in db.fetch_all(
+        'SELECT complaint_text FROM complaints ORDER BY id DESC LIMIT ?', (verify_limit,)
+    )]
+    texts.append('model registry smoke test')
+    expected = bundle.model.decision_function(bundle.vectorizer.transform(texts))
+    if not np.array_equal(compiled.decision_function(texts), expected):
+        raise click.ClickException('Compiled scores differ from sklearn; not writing the file')
+
+    compiled.save(output)
+    click.echo(f"✅ Compiled model {bundle.version} written to {output} (verified on {len(texts):,} texts)")
+
+@complaints_cli.command('archive')
+@click.option('--after-days', type=int, default=None,
+              help='Archive cases completed more than this many days ago (default: ARCHIVE_AFTER_DAYS).')
+@click.option('--limit', type=int, default=None, help='Stop after this many complaints.')
+def archive_complaints(after_days, limit):
+    """Move long-completed complaints into the monthly archive tables."""
+    try:
+        result = complaint_archiver.run(after_days, limit)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    months = ', '.join(result['months']) or 'none'
+    click.echo(f"✅ Archived {result['archived']:,} complaints (months: {months})")
@@ -1,3 +1,4 @@
+import json
 import os
 from datetime import timedelta
 
@@ -5,6 +6,10 @@ class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'your-secret-key-here'
     SQLALCHEMY_DATABASE_URI = 'sqlite:///complaints.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # SQLite connection pool
+    DATABASE_PATH = os.environ.get('DATABASE_PATH') or 'complaints.db'
+    DATABASE_POOL_SIZE = int(os.environ.get('DATABASE_POOL_SIZE', 8))
     
     # Email Configuration
     MAIL_SERVER = 'smtp.gmail.com'
@@ -12,8 +17,119 @@ class Config:
     MAIL_USE_TLS = True
     MAIL_USERNAME = os.environ.get('MAIL_USERNAME')
     MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD')
+
+    # Outbound email queue (EMAIL_WORKERS=0 leaves messages queued for
+    # another process to send)
+    EMAIL_WORKERS = int(os.environ.get('EMAIL_WORKERS', 2))
+    EMAIL_BATCH_SIZE = int(os.environ.get('EMAIL_BATCH_SIZE', 20))
+    EMAIL_MAX_ATTEMPTS = int(os.environ.get('EMAIL_MAX_ATTEMPTS', 5))
+    EMAIL_RETRY_BACKOFF = float(os.environ.get('EMAIL_RETRY_BACKOFF', 30))
+
+    # SLA escalation: hours before an open complaint is escalated. Priority
+    # and category overrides are JSON objects (e.g. '{"High": 12}'); the
+    # strictest one applies. None are set by default.
+    # SLA_CHECK_INTERVAL is the sweep period in seconds (0 disables the
+    # background sweep; /api/sla_check still runs it on demand)
+    SLA_DEFAULT_HOURS = float(os.environ.get('SLA_DEFAULT_HOURS', 24))
+    SLA_PRIORITY_HOURS = json.loads(os.environ.get('SLA_PRIORITY_HOURS') or '{}')
+    SLA_CATEGORY_HOURS = json.loads(os.environ.get('SLA_CATEGORY_HOURS') or '{}')
+    SLA_CHECK_INTERVAL = float(os.environ.get('SLA_CHECK_INTERVAL', 300))
+    SLA_MANAGER_EMAIL = os.environ.get('SLA_MANAGER_EMAIL')
     
+    # Seconds a cached dashboard/KPI response may be served (0 disables);
+    # any committed write in this process invalidates it sooner
+    RESPONSE_CACHE_TTL = float(os.environ.get('RESPONSE_CACHE_TTL', 5))
+
+    # Rows fetched per chunk by the streaming CSV/NDJSON exports
+    EXPORT_CHUNK_SIZE = int(os.environ.get('EXPORT_CHUNK_SIZE', 1000))
+
+    # Largest batch accepted by /api/predict_batch
+    PREDICT_BATCH_MAX_SIZE = int(os.environ.get('PREDICT_BATCH_MAX_SIZE', 10000))
+
+    # Priority scoring: keywords/categories that make a complaint High
+    # (comma-separated; empty keeps the built-in rules). With a confidence
+    # above 0 the category rule needs the classifier to be that sure.
+    PRIORITY_HIGH_KEYWORDS = [k for k in os.environ.get('PRIORITY_HIGH_KEYWORDS', '').split(',') if k]
+    PRIORITY_HIGH_CATEGORIES = [c for c in os.environ.get('PRIORITY_HIGH_CATEGORIES', '').split(',') if c]
+    PRIORITY_MIN_CONFIDENCE = float(os.environ.get('PRIORITY_MIN_CONFIDENCE', 0))
+    PRIORITY_BACKFILL_CHUNK = int(os.environ.get('PRIORITY_BACKFILL_CHUNK', 1000))
+
+    # Near-duplicate detection against open complaints from the last
+    # DUPLICATE_WINDOW_HOURS (threshold is TF-IDF cosine similarity, 0
+    # disables). With auto-link on, a duplicate is stored linked to its case.
+    DUPLICATE_THRESHOLD = float(os.environ.get('DUPLICATE_THRESHOLD', 0.8))
+    DUPLICATE_WINDOW_HOURS = float(os.environ.get('DUPLICATE_WINDOW_HOURS', 72))
+    DUPLICATE_WINDOW_SIZE = int(os.environ.get('DUPLICATE_WINDOW_SIZE', 5000))
+    DUPLICATE_AUTO_LINK = os.environ.get('DUPLICATE_AUTO_LINK', 'False').lower() == 'true'
+
+    # Micro-batching of concurrent /predict requests
+    INFERENCE_BATCHING = os.environ.get('INFERENCE_BATCHING', 'True').lower() == 'true'
+    INFERENCE_BATCH_WINDOW_MS = float(os.environ.get('INFERENCE_BATCH_WINDOW_MS', 5))
+    INFERENCE_MAX_BATCH_SIZE = int(os.environ.get('INFERENCE_MAX_BATCH_SIZE', 32))
+
+    # Inference backend: 'thread' runs transform + predict in the request
+    # process; 'process' sends inputs of at least INFERENCE_INLINE_MAX_CHARS
+    # characters to a pool of model-holding worker processes (workers
+    # default to one per CPU)
+    INFERENCE_BACKEND = os.environ.get('INFERENCE_BACKEND', 'thread')
+    INFERENCE_POOL_WORKERS = (int(os.environ['INFERENCE_POOL_WORKERS'])
+                              if os.environ.get('INFERENCE_POOL_WORKERS') else None)
+    INFERENCE_INLINE_MAX_CHARS = int(os.environ.get('INFERENCE_INLINE_MAX_CHARS', 2000))
+
+    # Prediction cache keyed on normalized complaint text (size 0 disables)
+    PREDICTION_CACHE_SIZE = int(os.environ.get('PREDICTION_CACHE_SIZE', 10000))
+    PREDICTION_CACHE_TTL = float(os.environ.get('PREDICTION_CACHE_TTL', 3600))
+
+    # ASGI serving (asgi.py): worker processes, and request threads per
+    # process, which default to the connection pool size so every running
+    # request can hold a pooled connection
+    ASGI_HOST = os.environ.get('ASGI_HOST', '127.0.0.1')
+    ASGI_PORT = int(os.environ.get('ASGI_PORT', 8000))
+    ASGI_WORKERS = int(os.environ.get('ASGI_WORKERS', os.cpu_count() or 1))
+    ASGI_THREADS = int(os.environ.get('ASGI_THREADS', DATABASE_POOL_SIZE))
+
+    # Live complaint events (/api/events): how often each process checks for
+    # events written by other processes, how many are kept for reconnecting
+    # clients, and the keepalive comment interval in seconds
+    EVENTS_POLL_INTERVAL = float(os.environ.get('EVENTS_POLL_INTERVAL', 1))
+    EVENTS_RETENTION = int(os.environ.get('EVENTS_RETENTION', 10000))
+    EVENTS_KEEPALIVE = float(os.environ.get('EVENTS_KEEPALIVE', 15))
+
+    # Archive of completed complaints: cases completed more than
+    # ARCHIVE_AFTER_DAYS ago move to monthly archive tables (keep it above 30
+    # so the 30-day KPIs stay complete). ARCHIVE_INTERVAL is the period of
+    # the background run in seconds (0 disables it; `flask complaints
+    # archive` runs it on demand)
+    ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS', 365))
+    ARCHIVE_INTERVAL = float(os.environ.get('ARCHIVE_INTERVAL', 86400))
+    ARCHIVE_BATCH_SIZE = int(os.environ.get('ARCHIVE_BATCH_SIZE', 5000))
+
+    # Seconds between checks for department changes made by other worker
+    # processes (this process's own changes show immediately)
+    DEPARTMENTS_CHECK_INTERVAL = float(os.environ.get('DEPARTMENTS_CHECK_INTERVAL', 2))
+
+    # Prometheus /metrics endpoint and Server-Timing headers; requests making
+    # more than METRICS_QUERY_WARN database calls are logged (N+1 loops)
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'True').lower() == 'true'
+    METRICS_QUERY_WARN = int(os.environ.get('METRICS_QUERY_WARN', 20))
+
     # Model paths
     MODEL_PATH = 'customer_classification_model_lr.pkl'
     VECTORIZER_PATH = 'tfidf_vectorizer.pkl'
-    ENCODER_PATH = 'label_encoder.pkl'
\ No newline at end of file
+    ENCODER_PATH = 'label_encoder.pkl'
+
+    # Model registry: 'lazy' loads on first prediction, 'background' warms up
+    # in a thread at startup, 'eager' loads before workers fork (share pages
+    # copy-on-write with gunicorn --preload)
+    MODEL_PRELOAD = os.environ.get('MODEL_PRELOAD', 'background')
+    MODEL_MMAP_MODE = os.environ.get('MODEL_MMAP_MODE', 'r') or None
+    # Serve predictions from the compiled TF-IDF/LogisticRegression path
+    # (checked against sklearn at load; falls back to sklearn on mismatch)
+    MODEL_COMPILED = os.environ.get('MODEL_COMPILED', 'True').lower() == 'true'
+    # Written by `flask complaints compile-model`; loaded instead of
+    # rebuilding the compiled path when present and current
+    MODEL_COMPILED_PATH = os.environ.get('MODEL_COMPILED_PATH', 'compiled_model.npz')
+    MODEL_WATCH_INTERVAL = float(os.environ.get('MODEL_WATCH_INTERVAL', 0))
+    # Required by /api/admin/reload_model (X-Admin-Token header); the
+    # endpoint is disabled while it is unset
+    ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
\ No newline at end of file
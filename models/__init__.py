@@ -1,4 +1,21 @@
+from .archiver import ComplaintArchiver
+from .asgi_bridge import AsgiBridge
 from .database import Database
+from .department_directory import DepartmentDirectory
+from .duplicate_index import DuplicateIndex
 from .email_service import EmailService
+from .email_outbox import EmailOutbox
+from .event_bus import EventBus
+from .inference_scheduler import InferenceScheduler
+from .metrics import Metrics
+from .model_registry import ModelRegistry
+from .prediction_cache import PredictionCache
+from .priority_engine import PriorityEngine
+from .response_cache import ResponseCache
+from .sla_engine import SLAEngine
 
-__all__ = ['Database', 'EmailService']
\ No newline at end of file
+__all__ = [
+    'AsgiBridge', 'ComplaintArchiver', 'Database', 'DepartmentDirectory', 'DuplicateIndex', 'EmailService', 'EmailOutbox', 'EventBus',
+    'InferenceScheduler', 'Metrics',
+    'ModelRegistry', 'PredictionCache', 'PriorityEngine', 'ResponseCache', 'SLAEngine'
+]
\ No newline at end of file
@@ -0,0 +1,210 @@
+import json
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+
+class ComplaintArchiver:
+    """Moves long-completed complaints out of the hot complaints table.
+
+    Cases completed more than ``after_days`` ago are moved, one batch per
+    transaction, into a table per month of receipt
+    (complaints_archive_YYYY_MM), so listings, KPIs and every index on
+    complaints only cover live work. complaint_archive_index records which
+    month each moved complaint went to; the rollup delete trigger skips
+    those rows, so the dashboard's all-time figures do not change.
+    complaint_archive_months keeps the per-month totals the KPIs add back,
+    and the complaints_all view unions the hot table with every archive
+    table for historical reports and lookups by id.
+    """
+
+    VIEW = 'complaints_all'
+    TABLE_FORMAT = 'complaints_archive_{year}_{month}'
+    TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+    def __init__(self, after_days=365, batch_size=5000):
+        self.after_days = after_days
+        self.batch_size = batch_size
+        self.interval = 0
+        self.db = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app, db):
+        config = app.config
+        self.db = db
+        self.after_days = config.get('ARCHIVE_AFTER_DAYS', self.after_days)
+        self.batch_size = config.get('ARCHIVE_BATCH_SIZE', self.batch_size)
+        self.interval = config.get('ARCHIVE_INTERVAL', self.interval)
+
+    def start(self):
+        """Schedule archive runs in this process, if they are configured"""
+        if self.db is not None and self.interval and self.after_days:
+            self.schedule(self.interval)
+
+    def schedule(self, interval):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._loop, args=(interval,), name='complaint-archiver', daemon=True
+        )
+        self._thread.start()
+
+    def _loop(self, interval):
+        while True:
+            time.sleep(interval)
+            try:
+                self.run()
+            except Exception as e:
+                print(f"❌ Archive run failed: {e}")
+
+    def run(self, after_days=None, limit=None):
+        """Archive every eligible complaint (at most limit); returns {'archived', 'months'}"""
+        after_days = self.after_days if after_days is None else after_days
+        if after_days < 1:
+            raise ValueError('after_days must be at least 1')
+        cutoff = (datetime.now() - timedelta(days=after_days)).strftime(self.TIME_FORMAT)
+
+        with self._lock:
+            self._sync_view()
+            archived, months = 0, set()
+            while limit is None or archived < limit:
+                size = self.batch_size if limit is None else min(self.batch_size, limit - archived)
+                count, batch_months = self._archive_batch(cutoff, size)
+                archived += count
+                months.update(batch_months)
+                if count < size:
+                    break
+
+        if archived:
+            print(f"🗄️ Archived {archived} completed complaints into {len(months)} monthly table(s)")
+        return {'archived': archived, 'months': sorted(months)}
+
+    def _archive_batch(self, cutoff, size):
+        with self.db.transaction() as tx:
+            rows = tx.fetch_all('''
+                SELECT id, substr(timestamp, 1, 7) FROM complaints
+                WHERE case_completed = TRUE AND completed_at < ?
+                  AND timestamp GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-*'
+                ORDER BY completed_at
+                LIMIT ?
+            ''', (cutoff, size))
+            if not rows:
+                return 0, []
+
+            by_month = {}
+            for complaint_id, month in rows:
+                by_month.setdefault(month, []).append(complaint_id)
+
+            columns = ', '.join(self._columns(tx, 'complaints'))
+            rebuild_view = False
+            now = datetime.now().strftime(self.TIME_FORMAT)
+            for month, ids in by_month.items():
+                table, changed = self._ensure_table(tx, month)
+                rebuild_view = rebuild_view or changed
+                ids_json = json.dumps(ids)
+                tx.execute_query(f'''
+                    INSERT INTO {table} ({columns})
+                    SELECT {columns} FROM complaints WHERE id IN (SELECT value FROM json_each(?))
+                ''', (ids_json,))
+                tx.execute_query('''
+                    UPDATE complaint_archive_months
+                    SET complaint_count = complaint_count + moved.complaints,
+                        resolution_hours_sum = resolution_hours_sum + moved.hours,
+                        sla_breached_count = sla_breached_count + moved.breached,
+                        archived_at = ?
+                    FROM (
+                        SELECT COUNT(*) AS complaints,
+                               COALESCE(SUM((julianday(completed_at) - julianday(timestamp)) * 24), 0) AS hours,
+                               COALESCE(SUM(sla_breached = TRUE), 0) AS breached
+                        FROM complaints WHERE id IN (SELECT value FROM json_each(?))
+                    ) AS moved
+                    WHERE month = ?
+                ''', (now, ids_json, month))
+                tx.execute_query('''
+                    INSERT INTO complaint_archive_index (complaint_id, month)
+                    SELECT value, ? FROM json_each(?)
+                ''', (month, ids_json))
+
+            # Indexed first, so the rollup delete trigger leaves these rows counted
+            tx.execute_query('DELETE FROM complaints WHERE id IN (SELECT value FROM json_each(?))',
+                             (json.dumps([row[0] for row in rows]),))
+            if rebuild_view:
+                self._create_view(tx)
+        return len(rows), list(by_month)
+
+    def _ensure_table(self, tx, month):
+        """Archive table for a YYYY-MM month, created or given any new complaints columns; returns (name, changed)"""
+        match = re.fullmatch(r'(\d{4})-(\d{2})', month)
+        if not match:
+            raise ValueError(f'Invalid archive month: {month}')
+        table = self.TABLE_FORMAT.format(year=match.group(1), month=match.group(2))
+
+        source = tx.fetch_all('PRAGMA table_info(complaints)')
+        existing = {row[1] for row in tx.fetch_all(f'PRAGMA table_info({table})')}
+        if not existing:
+            definitions = ', '.join(
+                f'{name} INTEGER PRIMARY KEY' if pk else f'{name} {col_type}'
+                for _, name, col_type, _, _, pk in source
+            )
+            tx.execute_query(f'CREATE TABLE {table} ({definitions})')
+            tx.execute_query(f'CREATE INDEX idx_{table}_timestamp ON {table} (timestamp, id)')
+            # Lets the department delete check search complaints_all without scanning the archive
+            tx.execute_query(f'CREATE INDEX idx_{table}_department ON {table} (assigned_department_id)')
+            tx.execute_query('''
+                INSERT INTO complaint_archive_months (month, table_name) VALUES (?, ?)
+                ON CONFLICT (month) DO NOTHING
+            ''', (month, table))
+            return table, True
+
+        missing = [(name, col_type) for _, name, col_type, _, _, _ in source if name not in existing]
+        for name, col_type in missing:
+            tx.execute_query(f'ALTER TABLE {table} ADD COLUMN {name} {col_type}')
+        return table, bool(missing)
+
+    def _sync_view(self):
+        """Rebuild complaints_all if complaints gained columns since it was built"""
+        with self.db.transaction() as tx:
+            if self._columns(tx, self.VIEW) != self._columns(tx, 'complaints'):
+                for (month,) in tx.fetch_all('SELECT month FROM complaint_archive_months'):
+                    self._ensure_table(tx, month)
+                self._create_view(tx)
+
+    def _create_view(self, tx):
+        columns = ', '.join(self._columns(tx, 'complaints'))
+        tables = ['complaints'] + [row[0] for row in tx.fetch_all(
+            'SELECT table_name FROM complaint_archive_months ORDER BY month'
+        )]
+        tx.execute_query(f'DROP VIEW IF EXISTS {self.VIEW}')
+        tx.execute_query(f'''
+            CREATE VIEW {self.VIEW} AS
+            {' UNION ALL '.join(f'SELECT {columns} FROM {table}' for table in tables)}
+        ''')
+
+    @staticmethod
+    def _columns(source, table):
+        return [row[1] for row in source.fetch_all(f'PRAGMA table_info({table})')]
+
+    def totals(self):
+        """(complaints, resolution hours, SLA breaches) summed over every archived month"""
+        return self.db.fetch_one('''
+            SELECT COALESCE(SUM(complaint_count), 0), COALESCE(SUM(resolution_hours_sum), 0),
+                   COALESCE(SUM(sla_breached_count), 0)
+            FROM complaint_archive_months
+        ''')
+
+    def status(self):
+        months = self.db.fetch_all('''
+            SELECT month, table_name, complaint_count, archived_at
+            FROM complaint_archive_months ORDER BY month
+        ''')
+        return {
+            'after_days': self.after_days,
+            'scheduled': self._thread is not None,
+            'archived': sum(row[2] for row in months),
+            'months': [{'month': month, 'table': table, 'complaints': count, 'archived_at': archived_at}
+                       for month, table, count, archived_at in months]
+        }
+
+# Shared instance; configured in create_app(), scheduled by start_background_services()
+complaint_archiver = ComplaintArchiver()
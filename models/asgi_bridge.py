@@ -0,0 +1,174 @@
+import asyncio
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import SpooledTemporaryFile
+
+class AsgiBridge:
+    """Serve the Flask (WSGI) app from an ASGI server.
+
+    The event loop accepts connections and reads request bodies; each
+    request then runs on a bounded thread pool, so at most ``threads``
+    requests touch SQLite at once (sized to the connection pool by
+    default) and the rest wait on the loop without holding a thread.
+    Response chunks are sent back as they are produced, so streamed
+    exports are not buffered, and a client disconnect stops the stream.
+    Paths in ``routes`` are served by native ASGI apps instead, for
+    long-lived streams that would otherwise pin a thread each. Given a
+    ``factory`` instead of an app, the app is built in the serving process
+    at lifespan startup (or by its first request).
+    """
+
+    def __init__(self, wsgi_app=None, threads=8, max_spooled_body=1024 * 1024, routes=None, factory=None):
+        if wsgi_app is None and factory is None:
+            raise ValueError('AsgiBridge needs a WSGI app or a factory')
+        self.wsgi_app = wsgi_app
+        self.factory = factory
+        self.routes = routes or {}
+        self.threads = threads
+        self.max_spooled_body = max_spooled_body
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                # Each worker process gets its own request threads
+                self._executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix='asgi-request')
+                self._pid = os.getpid()
+            return self._executor
+
+    def app(self):
+        """The WSGI app, built by the factory on first use in this process"""
+        with self._lock:
+            if self.wsgi_app is None:
+                self.wsgi_app = self.factory()
+            return self.wsgi_app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            if self.wsgi_app is None:
+                # A server without lifespan support: build on the first request
+                await asyncio.get_running_loop().run_in_executor(None, self.app)
+            route = self.routes.get(scope['path'])
+            if route is not None and scope['method'] == 'GET':
+                await route(scope, receive, send)
+            else:
+                await self._http(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                try:
+                    await asyncio.get_running_loop().run_in_executor(None, self.app)
+                except Exception as e:
+                    await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                    return
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if self._executor is not None:
+                    self._executor.shutdown(wait=False, cancel_futures=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _http(self, scope, receive, send):
+        body = SpooledTemporaryFile(max_size=self.max_spooled_body)
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                body.close()
+                return
+            body.write(message.get('body', b''))
+            more_body = message.get('more_body', False)
+        body.seek(0)
+
+        disconnected = threading.Event()
+
+        async def watch_disconnect():
+            while (await receive())['type'] != 'http.disconnect':
+                pass
+            disconnected.set()
+
+        loop = asyncio.get_running_loop()
+        watcher = loop.create_task(watch_disconnect())
+        try:
+            await loop.run_in_executor(
+                self.executor, self._run, self._environ(scope, body), loop, send, disconnected
+            )
+        finally:
+            watcher.cancel()
+            body.close()
+
+    def _environ(self, scope, body):
+        server = scope.get('server') or ('localhost', 80)
+        client = scope.get('client') or ('', 0)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+            'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+            'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+            'SERVER_NAME': server[0],
+            'SERVER_PORT': str(server[1]),
+            'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+            'REMOTE_ADDR': client[0],
+            'REMOTE_PORT': str(client[1]),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': body,
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False,
+        }
+        for name, value in scope.get('headers', []):
+            name = name.decode('latin-1').upper().replace('-', '_')
+            value = value.decode('latin-1')
+            if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+                name = f'HTTP_{name}'
+            environ[name] = f'{environ[name]},{value}' if name in environ else value
+        return environ
+
+    def _run(self, environ, loop, send, disconnected):
+        """Run one request on a pool thread, forwarding the response to the loop"""
+        response = {}
+
+        def call(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        def send_body(data, more_body):
+            if 'started' not in response:
+                status, headers = response['status']
+                call({
+                    'type': 'http.response.start',
+                    'status': int(status.split(' ', 1)[0]),
+                    'headers': [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in headers],
+                })
+                response['started'] = True
+            call({'type': 'http.response.body', 'body': data, 'more_body': more_body})
+
+        def start_response(status, headers, exc_info=None):
+            if exc_info and 'started' in response:
+                raise exc_info[1].with_traceback(exc_info[2])
+            response['status'] = (status, headers)
+            return lambda data: send_body(data, True)
+
+        result = self.app()(environ, start_response)
+        try:
+            for chunk in result:
+                if disconnected.is_set():
+                    return
+                if chunk:
+                    send_body(chunk, True)
+            if not disconnected.is_set():
+                send_body(b'', False)
+        finally:
+            close = getattr(result, 'close', None)
+            if close is not None:
+                close()
@@ -0,0 +1,172 @@
+import csv
+import time
+from collections import deque
+from datetime import datetime
+
+from . import migrations
+
+TEXT_COLUMNS = ('complaint_text', 'complaint', 'text', 'consumer complaint narrative')
+TIMESTAMP_COLUMNS = ('timestamp', 'date', 'date received', 'created_at')
+COMPLETED_COLUMNS = ('completed_at', 'date closed', 'closed_at', 'resolved_at')
+TIMESTAMP_FORMATS = ('%m/%d/%Y %H:%M:%S', '%m/%d/%Y %H:%M', '%m/%d/%Y')
+
+def parse_timestamp(value):
+    """Normalize a legacy date to 'YYYY-MM-DD HH:MM:SS', or None if unreadable"""
+    value = (value or '').strip()
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        for fmt in TIMESTAMP_FORMATS:
+            try:
+                parsed = datetime.strptime(value, fmt)
+                break
+            except ValueError:
+                continue
+        else:
+            return None
+    return parsed.replace(tzinfo=None).strftime("%Y-%m-%d %H:%M:%S")
+
+def _pick_column(columns, requested, candidates):
+    lookup = {column.strip().lower(): column for column in columns}
+    if requested:
+        if requested.strip().lower() not in lookup:
+            raise ValueError(f"Column '{requested}' not found (have: {', '.join(columns)})")
+        return lookup[requested.strip().lower()]
+    return next((lookup[name] for name in candidates if name in lookup), None)
+
+def read_chunks(path, chunk_size, text_column=None, timestamp_column=None, completed_column=None):
+    """Yield lists of (text, raw_timestamp, raw_completed_at) from a CSV or Parquet file without loading it whole"""
+    if path.lower().endswith(('.parquet', '.pq')):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError('Reading Parquet files requires pyarrow (pip install pyarrow)')
+        parquet = pq.ParquetFile(path)
+        names = parquet.schema_arrow.names
+        text_name = _pick_column(names, text_column, TEXT_COLUMNS)
+        if text_name is None:
+            raise ValueError(f"No complaint text column found (have: {', '.join(names)})")
+        time_name = _pick_column(names, timestamp_column, TIMESTAMP_COLUMNS)
+        completed_name = _pick_column(names, completed_column, COMPLETED_COLUMNS)
+        columns = [name for name in (text_name, time_name, completed_name) if name]
+        for batch in parquet.iter_batches(batch_size=chunk_size, columns=columns):
+            texts = batch.column(text_name).to_pylist()
+            stamps, completed = [
+                [None if value is None else str(value) for value in batch.column(name).to_pylist()]
+                if name else [None] * len(texts)
+                for name in (time_name, completed_name)
+            ]
+            yield list(zip(texts, stamps, completed))
+        return
+
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.DictReader(f)
+        names = reader.fieldnames or []
+        text_name = _pick_column(names, text_column, TEXT_COLUMNS)
+        if text_name is None:
+            raise ValueError(f"No complaint text column found (have: {', '.join(names)})")
+        time_name = _pick_column(names, timestamp_column, TIMESTAMP_COLUMNS)
+        completed_name = _pick_column(names, completed_column, COMPLETED_COLUMNS)
+        chunk = []
+        for row in reader:
+            chunk.append((row[text_name], row[time_name] if time_name else None,
+                          row[completed_name] if completed_name else None))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+class BulkImporter:
+    """Load legacy complaints from a file, re-classifying them offline.
+
+    The file is read in chunks; each chunk is classified on the inference
+    pool while the next one is being read, then scored for priority and
+    inserted in a single transaction. Secondary indexes are dropped for
+    the load and rebuilt once at the end, which is far cheaper than
+    maintaining them row by row. Completed rows only get a completed_at
+    when the file has a completion date; guessing one would skew the
+    resolution-time KPIs and make old cases archive-eligible at once.
+    """
+
+    def __init__(self, db, classify_pool, priority_engine, chunk_size=5000,
+                 status='Completed', defer_indexes=True):
+        self.db = db
+        self.pool = classify_pool
+        self.priority_engine = priority_engine
+        self.chunk_size = chunk_size
+        self.status = status
+        self.defer_indexes = defer_indexes
+
+    def run(self, path, text_column=None, timestamp_column=None, completed_column=None, progress=None):
+        """Import path; progress(stats) is called after every committed chunk"""
+        stats = {'imported': 0, 'skipped': 0, 'bad_timestamps': 0, 'bad_completed_dates': 0,
+                 'seconds': 0.0, 'rows_per_second': 0.0}
+        started = time.perf_counter()
+        in_flight = deque()
+        max_in_flight = getattr(self.pool, 'workers', 1) + 1
+
+        if self.defer_indexes:
+            with self.db.connection() as conn:
+                migrations.drop_complaint_indexes(conn)
+                conn.commit()
+        try:
+            for chunk in read_chunks(path, self.chunk_size, text_column, timestamp_column, completed_column):
+                rows = [(text.strip(), stamp, completed) for text, stamp, completed in chunk
+                        if text and text.strip()]
+                stats['skipped'] += len(chunk) - len(rows)
+                if not rows:
+                    continue
+                in_flight.append((rows, self.pool.submit([text for text, _, _ in rows])))
+                if len(in_flight) >= max_in_flight:
+                    self._store(*in_flight.popleft(), stats, started, progress)
+            while in_flight:
+                self._store(*in_flight.popleft(), stats, started, progress)
+        finally:
+            for _, future in in_flight:
+                future.cancel()
+            if self.defer_indexes:
+                with self.db.connection() as conn:
+                    migrations.create_complaint_indexes(conn)
+                    conn.execute('ANALYZE complaints')
+                    conn.commit()
+
+        stats['seconds'] = round(time.perf_counter() - started, 2)
+        return stats
+
+    def _store(self, rows, future, stats, started, progress):
+        labels = future.result()
+        texts = [text for text, _, _ in rows]
+        priorities = self.priority_engine.score(texts, labels)
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        completed = self.status == 'Completed'
+
+        records = []
+        for (text, raw_stamp, raw_completed), label, priority in zip(rows, labels, priorities):
+            timestamp = parse_timestamp(raw_stamp)
+            if timestamp is None:
+                if raw_stamp:
+                    stats['bad_timestamps'] += 1
+                timestamp = now
+            completed_at = parse_timestamp(raw_completed) if completed else None
+            if completed_at is not None and completed_at < timestamp:
+                completed_at = None
+            if completed and completed_at is None and raw_completed:
+                stats['bad_completed_dates'] += 1
+            records.append((text, label, timestamp, self.status, completed,
+                            completed_at, priority, now))
+
+        self.db.insert_many('''
+            INSERT INTO complaints (complaint_text, predicted_category, timestamp, resolution_status,
+                                    case_completed, completed_at, priority, priority_scored_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', records)
+
+        stats['imported'] += len(records)
+        elapsed = time.perf_counter() - started
+        stats['seconds'] = round(elapsed, 2)
+        stats['rows_per_second'] = round(stats['imported'] / elapsed, 1) if elapsed else 0.0
+        if progress:
+            progress(stats)
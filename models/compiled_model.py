@@ -0,0 +1,169 @@
+import json
+import math
+import re
+
+import numpy as np
+import scipy.sparse as sp
+
+class CompiledModel:
+    """TF-IDF + LogisticRegression classifier without the sklearn call overhead.
+
+    Built from the fitted vectorizer, model and label encoder: the vocabulary
+    becomes a plain dict, idf and the (feature x class) coefficients
+    contiguous float64 arrays and the labels a tuple. Classifying a text is
+    a regex tokenize, a dict count and one sparse-dense product for the
+    whole batch. The arithmetic follows sklearn's order (tf * idf, L2
+    norm summed in index order, the same CSR product kernel, intercept
+    last), so the scores match sklearn's bit for bit.
+
+    Only the configuration this project trains is supported (word analyzer,
+    unigrams, no stop words, accent stripping or custom callables); anything
+    else raises ValueError at compile time.
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, vocabulary, idf, coef, intercept, labels, token_pattern,
+                 lowercase=True, sublinear_tf=False, norm='l2'):
+        self.vocabulary = vocabulary
+        self.idf = np.ascontiguousarray(idf, dtype=np.float64)
+        self.coef = np.ascontiguousarray(coef, dtype=np.float64)            # (n_features, n_classes)
+        self.intercept = np.ascontiguousarray(intercept, dtype=np.float64)
+        self.labels = tuple(labels)
+        self.token_pattern = token_pattern
+        self.lowercase = lowercase
+        self.sublinear_tf = sublinear_tf
+        self.norm = norm
+        self._tokenize = re.compile(token_pattern).findall
+        # Python floats avoid a numpy scalar per term in the hot loop
+        self._idf_list = self.idf.tolist()
+
+    @classmethod
+    def from_sklearn(cls, model, vectorizer, encoder):
+        params = vectorizer.get_params()
+        required = {
+            'analyzer': 'word', 'ngram_range': (1, 1), 'stop_words': None, 'strip_accents': None,
+            'preprocessor': None, 'tokenizer': None, 'binary': False,
+        }
+        for name, expected in required.items():
+            if params.get(name) != expected:
+                raise ValueError(f"Cannot compile vectorizer with {name}={params.get(name)!r}")
+        if params.get('norm') not in ('l2', 'l1', None):
+            raise ValueError(f"Cannot compile vectorizer with norm={params.get('norm')!r}")
+        if not hasattr(model, 'coef_') or model.coef_.shape[0] != len(model.classes_):
+            raise ValueError('Only multi-class linear models with one coefficient row per class are supported')
+
+        n_features = len(vectorizer.vocabulary_)
+        idf = vectorizer.idf_ if params.get('use_idf', True) else np.ones(n_features)
+        # Model classes are encoder indices; map them straight to label strings
+        labels = encoder.inverse_transform(model.classes_)
+        return cls(
+            vocabulary={term: int(index) for term, index in vectorizer.vocabulary_.items()},
+            idf=idf,
+            coef=np.asarray(model.coef_).T,
+            intercept=model.intercept_,
+            labels=[str(label) for label in labels],
+            token_pattern=params['token_pattern'],
+            lowercase=params['lowercase'],
+            sublinear_tf=params['sublinear_tf'],
+            norm=params['norm']
+        )
+
+    def save(self, path):
+        """Write the compiled model as a pickle-free .npz file"""
+        terms = np.empty(len(self.vocabulary), dtype=object)
+        for term, index in self.vocabulary.items():
+            terms[index] = term
+        meta = {
+            'format_version': self.FORMAT_VERSION,
+            'token_pattern': self.token_pattern,
+            'lowercase': self.lowercase,
+            'sublinear_tf': self.sublinear_tf,
+            'norm': self.norm,
+        }
+        with open(path, 'wb') as f:
+            np.savez(
+                f,
+                terms=terms.astype(str),
+                idf=self.idf,
+                coef=self.coef,
+                intercept=self.intercept,
+                labels=np.array(self.labels, dtype=str),
+                meta=np.array(json.dumps(meta))
+            )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            if meta.get('format_version') != cls.FORMAT_VERSION:
+                raise ValueError(f"Unsupported compiled model format: {meta.get('format_version')}")
+            return cls(
+                vocabulary={term: index for index, term in enumerate(data['terms'].tolist())},
+                idf=data['idf'],
+                coef=data['coef'],
+                intercept=data['intercept'],
+                labels=data['labels'].tolist(),
+                token_pattern=meta['token_pattern'],
+                lowercase=meta['lowercase'],
+                sublinear_tf=meta['sublinear_tf'],
+                norm=meta['norm']
+            )
+
+    def _features(self, text):
+        """Sorted feature indices and tf-idf weights of one text"""
+        if self.lowercase:
+            text = text.lower()
+        vocabulary = self.vocabulary
+        counts = {}
+        for token in self._tokenize(text):
+            index = vocabulary.get(token)
+            if index is not None:
+                counts[index] = counts.get(index, 0) + 1
+
+        indices = sorted(counts)
+        idf = self._idf_list
+        if self.sublinear_tf:
+            weights = [(math.log(counts[i]) + 1.0) * idf[i] for i in indices]
+        else:
+            weights = [float(counts[i]) * idf[i] for i in indices]
+
+        if self.norm == 'l2':
+            total = 0.0
+            for w in weights:
+                total += w * w
+            scale = math.sqrt(total)
+        elif self.norm == 'l1':
+            scale = 0.0
+            for w in weights:
+                scale += abs(w)
+        else:
+            scale = 0.0
+        if scale:
+            weights = [w / scale for w in weights]
+        return indices, weights
+
+    def transform(self, texts):
+        """tf-idf matrix of the texts, equal to the sklearn vectorizer's output"""
+        indptr = [0]
+        indices = []
+        weights = []
+        for text in texts:
+            row_indices, row_weights = self._features(text)
+            indices.extend(row_indices)
+            weights.extend(row_weights)
+            indptr.append(len(indices))
+        return sp.csr_matrix((
+            np.array(weights, dtype=np.float64),
+            np.array(indices, dtype=np.int32),
+            np.array(indptr, dtype=np.int32)
+        ), shape=(len(texts), self.coef.shape[0]))
+
+    def decision_function(self, texts):
+        """Per-class scores, shape (len(texts), n_classes)"""
+        # Same CSR x dense kernel sklearn ends up in, so the sums match exactly
+        return self.transform(texts) @ self.coef + self.intercept
+
+    def classify(self, texts):
+        labels = self.labels
+        return [labels[i] for i in self.decision_function(texts).argmax(axis=1)]
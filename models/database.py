@@ -1,107 +1,246 @@
+import os
+import queue
 import sqlite3
+import time
+from contextlib import contextmanager
 from datetime import datetime
 
+from . import migrations
+
+class Transaction:
+    """The statements of one unit of work: one pooled connection, one commit.
+
+    Offers the same query helpers as Database, so code reads the same
+    inside and outside a transaction. Callbacks registered with
+    after_commit() run only once the commit has succeeded.
+    """
+
+    def __init__(self, db, conn):
+        self.db = db
+        self.conn = conn
+        self._after_commit = []
+
+    def after_commit(self, callback):
+        self._after_commit.append(callback)
+
+    def execute_query(self, query, params=()):
+        with self.db._timed(query):
+            return self.conn.execute(query, params).lastrowid
+
+    def execute_returning(self, query, params=()):
+        with self.db._timed(query):
+            return self.conn.execute(query, params).fetchall()
+
+    def insert_many(self, query, seq_of_params):
+        """Run an INSERT per parameter tuple; the ids are contiguous under the write lock"""
+        rows = list(seq_of_params)
+        if not rows:
+            return []
+        with self.db._timed(query):
+            self.conn.executemany(query, rows)
+            last_id = self.conn.execute('SELECT last_insert_rowid()').fetchone()[0]
+        return list(range(last_id - len(rows) + 1, last_id + 1))
+
+    def execute_many(self, query, seq_of_params):
+        with self.db._timed(query):
+            return self.conn.executemany(query, seq_of_params).rowcount
+
+    def fetch_all(self, query, params=()):
+        with self.db._timed(query):
+            return self.conn.execute(query, params).fetchall()
+
+    def fetch_one(self, query, params=()):
+        with self.db._timed(query):
+            return self.conn.execute(query, params).fetchone()
+
 class Database:
-    def __init__(self, db_path='complaints.db'):
+    # Pragmas applied to every pooled connection. WAL lets readers run while a
+    # writer commits, and NORMAL sync is durable enough under WAL.
+    PRAGMAS = (
+        ('journal_mode', 'WAL'),
+        ('synchronous', 'NORMAL'),
+        ('cache_size', -20000),        # ~20 MB page cache per connection
+        ('mmap_size', 268435456),      # 256 MB memory-mapped I/O
+        ('temp_store', 'MEMORY'),
+        ('busy_timeout', 5000),        # ms to wait on a locked database
+    )
+
+    def __init__(self, db_path='complaints.db', pool_size=8):
         self.db_path = db_path
+        self.pool_size = pool_size
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+        self._pid = os.getpid()
+        self._write_listeners = []
+        self._query_listeners = []
+
+    def init_app(self, app):
+        """Configure the shared instance from the Flask config and create the schema"""
+        self.configure(
+            app.config.get('DATABASE_PATH', self.db_path),
+            app.config.get('DATABASE_POOL_SIZE', self.pool_size)
+        )
         self.init_db()
 
+    def configure(self, db_path, pool_size=None):
+        self.close_all()
+        self.db_path = db_path
+        if pool_size is not None:
+            self.pool_size = pool_size
+        self._pool = queue.LifoQueue(maxsize=self.pool_size)
+
     def init_db(self):
-        conn = self.get_connection()
-        c = conn.cursor()
-        
-        # Users table
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                email TEXT UNIQUE NOT NULL,
-                password TEXT NOT NULL,
-                role TEXT DEFAULT 'customer',
-                created_at TEXT NOT NULL,
-                is_active BOOLEAN DEFAULT TRUE
-            )
-        ''')
-        
-        # Enhanced complaints table
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS complaints (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                complaint_text TEXT NOT NULL,
-                predicted_category TEXT NOT NULL,
-                timestamp TEXT NOT NULL,
-                forwarded BOOLEAN DEFAULT FALSE,
-                forwarded_to TEXT,
-                forwarded_at TEXT,
-                resolution_status TEXT DEFAULT "Pending",
-                assigned_department_id INTEGER,
-                case_completed BOOLEAN DEFAULT FALSE,
-                completed_at TEXT,
-                priority TEXT DEFAULT 'Medium',
-                sla_breached BOOLEAN DEFAULT FALSE,
-                escalated_at TEXT,
-                customer_id INTEGER,
-                feedback_provided BOOLEAN DEFAULT FALSE,
-                FOREIGN KEY (assigned_department_id) REFERENCES departments (id),
-                FOREIGN KEY (customer_id) REFERENCES users (id)
-            )
-        ''')
-        
-        # Feedback table
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS feedback (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                complaint_id INTEGER NOT NULL,
-                rating INTEGER CHECK (rating >= 1 AND rating <= 5),
-                comments TEXT,
-                created_at TEXT NOT NULL,
-                FOREIGN KEY (complaint_id) REFERENCES complaints (id)
-            )
-        ''')
-        
-        # Internal notes table
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS case_notes (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                complaint_id INTEGER NOT NULL,
-                user_id INTEGER NOT NULL,
-                note_text TEXT NOT NULL,
-                created_at TEXT NOT NULL,
-                is_internal BOOLEAN DEFAULT TRUE,
-                FOREIGN KEY (complaint_id) REFERENCES complaints (id),
-                FOREIGN KEY (user_id) REFERENCES users (id)
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        """Bring the schema up to date by applying any pending migrations"""
+        with self.connection() as conn:
+            return migrations.migrate(conn)
+
+    def schema_version(self):
+        with self.connection() as conn:
+            return migrations.current_version(conn)
 
     def get_connection(self):
-        return sqlite3.connect(self.db_path)
+        """Open a new connection with the tuned pragmas applied"""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        for name, value in self.PRAGMAS:
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Borrow a pooled connection for the duration of the block"""
+        if os.getpid() != self._pid:
+            # Connections must not cross a fork; start the child with an empty pool
+            self._pid = os.getpid()
+            self._pool = queue.LifoQueue(maxsize=self.pool_size)
+
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self.get_connection()
+
+        try:
+            yield conn
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            try:
+                self._pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    @contextmanager
+    def transaction(self):
+        """Run the block's statements as one write transaction on one connection.
+
+        BEGIN IMMEDIATE takes the write lock up front, so rows read in the
+        block cannot change before the writes that depend on them, and a
+        busy database is waited on before anything runs rather than part
+        way through. Commits once when the block exits (rolls back if it
+        raises), then notifies write listeners and runs the after-commit
+        callbacks. Do not call the Database helpers inside the block: they
+        would wait on the write lock this transaction holds.
+        """
+        with self.connection() as conn:
+            tx = Transaction(self, conn)
+            conn.execute('BEGIN IMMEDIATE')
+            yield tx
+            with self._timed('COMMIT'):
+                conn.commit()
+        self._notify_write()
+        for callback in tx._after_commit:
+            callback()
+
+    @contextmanager
+    def snapshot(self):
+        """Run the block's reads in one read transaction, so they all see the same committed state"""
+        with self.connection() as conn:
+            conn.execute('BEGIN')
+            yield Transaction(self, conn)
+            conn.commit()
+
+    def add_write_listener(self, callback):
+        """Call callback() after every committed write (used for cache invalidation)"""
+        self._write_listeners.append(callback)
+
+    def _notify_write(self):
+        for callback in self._write_listeners:
+            callback()
+
+    def add_query_listener(self, callback):
+        """Call callback(query, seconds) after every query run through this class"""
+        self._query_listeners.append(callback)
+
+    @contextmanager
+    def _timed(self, query):
+        if not self._query_listeners:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            for callback in self._query_listeners:
+                callback(query, elapsed)
+
+    def close_all(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
 
     def execute_query(self, query, params=()):
-        conn = self.get_connection()
-        c = conn.cursor()
-        c.execute(query, params)
-        conn.commit()
-        result = c.lastrowid
-        conn.close()
-        return result
+        with self._timed(query), self.connection() as conn:
+            c = conn.execute(query, params)
+            conn.commit()
+        self._notify_write()
+        return c.lastrowid
+
+    def execute_returning(self, query, params=()):
+        """Run a write with a RETURNING clause and return the affected rows"""
+        with self._timed(query), self.connection() as conn:
+            rows = conn.execute(query, params).fetchall()
+            conn.commit()
+        self._notify_write()
+        return rows
+
+    def insert_many(self, query, seq_of_params):
+        """Run an INSERT for every parameter tuple in a single transaction.
+
+        Returns the new row ids. The write lock is taken up front, so the
+        AUTOINCREMENT ids of the batch are contiguous and can be derived
+        from last_insert_rowid().
+        """
+        rows = list(seq_of_params)
+        if not rows:
+            return []
+
+        with self._timed(query), self.connection() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.executemany(query, rows)
+            last_id = conn.execute('SELECT last_insert_rowid()').fetchone()[0]
+            conn.commit()
+        self._notify_write()
+        return list(range(last_id - len(rows) + 1, last_id + 1))
+
+    def execute_many(self, query, seq_of_params):
+        """Run a statement for every parameter tuple in a single transaction"""
+        with self._timed(query), self.connection() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            c = conn.executemany(query, seq_of_params)
+            conn.commit()
+        self._notify_write()
+        return c.rowcount
 
     def fetch_all(self, query, params=()):
-        conn = self.get_connection()
-        c = conn.cursor()
-        c.execute(query, params)
-        result = c.fetchall()
-        conn.close()
-        return result
+        with self._timed(query), self.connection() as conn:
+            return conn.execute(query, params).fetchall()
 
     def fetch_one(self, query, params=()):
-        conn = self.get_connection()
-        c = conn.cursor()
-        c.execute(query, params)
-        result = c.fetchone()
-        conn.close()
-        return result
-    
-    
\ No newline at end of file
+        with self._timed(query), self.connection() as conn:
+            return conn.execute(query, params).fetchone()
+
+
+# Shared instance used by every blueprint; configured once in create_app()
+db = Database()
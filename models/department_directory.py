@@ -0,0 +1,73 @@
+import threading
+import time
+
+class DepartmentDirectory:
+    """In-memory copy of the departments table.
+
+    Departments change a few times a year but are read on every
+    prediction and assignment, so the table is loaded once and served
+    from memory. Triggers bump a version counter in system_state on any
+    change to departments; the directory compares it at most every
+    ``check_interval`` seconds and reloads when it moved. Handlers that
+    change departments call invalidate(), so this process sees its own
+    changes at once, and a lookup of an unknown id checks the version
+    before giving up, so a department just added by another worker is
+    found immediately.
+    """
+
+    STATE_KEY = 'departments_version'
+    FIELDS = ('id', 'name', 'email', 'description', 'created_at')
+
+    def __init__(self, check_interval=2.0):
+        self.check_interval = check_interval
+        self.db = None
+        self._snapshot = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def init_app(self, app, db):
+        self.db = db
+        self.check_interval = app.config.get('DEPARTMENTS_CHECK_INTERVAL', self.check_interval)
+        self.invalidate()
+
+    def invalidate(self):
+        with self._lock:
+            self._snapshot = None
+
+    def all(self):
+        """Every department as a dict, ordered by name"""
+        return self._current()[2]
+
+    def get(self, department_id):
+        """The department with this id, or None"""
+        try:
+            department_id = int(department_id)
+        except (TypeError, ValueError):
+            return None
+        department = self._current()[1].get(department_id)
+        if department is None:
+            department = self._current(force=True)[1].get(department_id)
+        return department
+
+    def _current(self, force=False):
+        """(version, by id, ordered by name), reloaded if the table changed"""
+        snapshot = self._snapshot
+        if snapshot is not None and not force and time.monotonic() - self._checked_at < self.check_interval:
+            return snapshot
+        with self._lock:
+            version = self._version()
+            if self._snapshot is None or self._snapshot[0] != version:
+                # Read after the version: a change landing in between leaves
+                # newer rows under an older version, so the next check reloads
+                rows = self.db.fetch_all(f'SELECT {", ".join(self.FIELDS)} FROM departments ORDER BY name')
+                ordered = [dict(zip(self.FIELDS, row)) for row in rows]
+                self._snapshot = (version, {d['id']: d for d in ordered}, ordered)
+            self._checked_at = time.monotonic()
+            return self._snapshot
+
+    def _version(self):
+        row = self.db.fetch_one('SELECT value FROM system_state WHERE key = ?', (self.STATE_KEY,))
+        return row[0] if row else None
+
+# Shared instance; configured in create_app()
+department_directory = DepartmentDirectory()
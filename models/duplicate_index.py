@@ -0,0 +1,257 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import scipy.sparse as sp
+
+OPEN_STATUSES = ('Pending', 'Assigned', 'Escalated')
+
+class DuplicateIndex:
+    """Near-duplicate detection over recent open complaints.
+
+    Keeps the TF-IDF vectors of the last ``window_hours`` of open complaints
+    (at most ``max_size``) as one sparse matrix. The vectorizer L2-normalizes
+    its output, so a single sparse dot product gives the cosine similarity
+    of a new complaint to every case in the window. Every entry points at the
+    root of its cluster, so a repeat of a repeat links to the original case.
+
+    The window is filled from the database and topped up with newer rows
+    every ``refresh_interval`` seconds, which keeps each worker process in
+    step with complaints stored by the others; complaints stored by this
+    process join the window as soon as they are added. Vectors belong to one model
+    version; a model reload rebuilds the window.
+    """
+
+    MERGE_THRESHOLD = 64   # pending rows kept outside the main matrix
+
+    def __init__(self, threshold=0.8, window_hours=72, max_size=5000, refresh_interval=2.0):
+        self.threshold = threshold
+        self.window_hours = window_hours
+        self.max_size = max_size
+        self.refresh_interval = refresh_interval
+        self.auto_link = False
+        self.db = None
+        self.registry = None
+        self._lock = threading.Lock()
+        self._reset(None)
+        self.lookups = 0
+        self.matches = 0
+
+    def init_app(self, app, db, registry):
+        config = app.config
+        self.db = db
+        self.registry = registry
+        self.threshold = config.get('DUPLICATE_THRESHOLD', self.threshold)
+        self.window_hours = config.get('DUPLICATE_WINDOW_HOURS', self.window_hours)
+        self.max_size = config.get('DUPLICATE_WINDOW_SIZE', self.max_size)
+        self.auto_link = config.get('DUPLICATE_AUTO_LINK', self.auto_link)
+
+    @property
+    def enabled(self):
+        return self.db is not None and self.threshold > 0 and self.max_size > 0
+
+    def _reset(self, version):
+        self._version = version
+        self._matrix = None
+        self._ids, self._roots, self._timestamps = [], [], []
+        self._pending = []          # (id, root, timestamp, vector) not yet merged
+        self._known = set()
+        self._last_id = 0
+        self._refreshed_at = 0.0
+
+    def lookup_many(self, texts):
+        """Return (matches, vectors): the open root case each text duplicates, or None.
+
+        Texts are also matched against earlier texts of the same batch; such
+        a match has complaint_id None and the index of the batch row it
+        repeats in 'batch_row', for resolve_batch() to fill in once the
+        batch is stored. Each vector is a (model version, row) pair for add().
+        """
+        if not self.enabled:
+            nothing = [None] * len(texts)
+            return nothing, nothing
+
+        for _ in range(3):
+            bundle = self.registry.get()
+            vectors = bundle.vectorize(texts)
+            with self._lock:
+                self._sync()
+                # A reload between vectorizing and here would mix feature spaces
+                if self._version != bundle.version:
+                    continue
+                scores = self._scores(vectors)
+                ids = self._ids + [p[0] for p in self._pending]
+                roots = self._roots + [p[1] for p in self._pending]
+            break
+        else:
+            print("⚠️ Model kept changing during duplicate lookup; skipping it")
+            nothing = [None] * len(texts)
+            return nothing, nothing
+
+        order_keys = (np.array(ids, dtype=np.int64), np.array(roots, dtype=np.int64))
+        candidates = []
+        for row in scores:
+            # Best few above the threshold, ties to the oldest case; the
+            # database decides which are still open
+            hits = np.flatnonzero(row >= self.threshold)
+            top = hits[np.lexsort((order_keys[0][hits], order_keys[1][hits],
+                                   -np.round(row[hits], 6)))[:5]]
+            candidates.append([(roots[i], ids[i], float(row[i])) for i in top])
+
+        self.lookups += len(texts)
+        matches = [self._open_match(found) for found in candidates]
+        self._match_within(vectors, matches)
+        self.matches += sum(1 for match in matches if match)
+        return matches, [(bundle.version, vectors[i]) for i in range(len(texts))]
+
+    def lookup(self, text):
+        matches, vectors = self.lookup_many([text])
+        return matches[0], vectors[0]
+
+    def _match_within(self, vectors, matches, chunk=256):
+        """Link unmatched rows to the first earlier row of the batch they repeat"""
+        if vectors.shape[0] < 2:
+            return
+        for start in range(1, vectors.shape[0], chunk):
+            end = min(start + chunk, vectors.shape[0])
+            block = (vectors[start:end] @ vectors[:end].T).toarray()
+            for offset, row in enumerate(block):
+                i = start + offset
+                if matches[i]:
+                    continue
+                # Only earlier rows; the lowest index wins a tie
+                earlier = np.round(row[:i], 6)
+                if not len(earlier) or earlier.max() < self.threshold:
+                    continue
+                j = int(np.argmax(earlier))
+                root = matches[j]
+                if root is not None and root['complaint_id'] is not None:
+                    matches[i] = dict(root, similarity=round(float(row[j]), 4))
+                else:
+                    matches[i] = {'complaint_id': None, 'matched_id': None,
+                                  'batch_row': root['batch_row'] if root else j,
+                                  'similarity': round(float(row[j]), 4)}
+
+    @staticmethod
+    def resolve_batch(matches, complaint_ids):
+        """Fill in the ids of within-batch matches once the batch has been stored"""
+        resolved = []
+        for match in matches:
+            if match and match.get('batch_row') is not None:
+                root_id = complaint_ids[match['batch_row']]
+                match = {'complaint_id': root_id, 'matched_id': root_id,
+                         'similarity': match['similarity']}
+            resolved.append(match)
+        return resolved
+
+    def _open_match(self, candidates):
+        if not candidates:
+            return None
+        roots = {root for root, _, _ in candidates}
+        placeholders = ','.join('?' * len(roots))
+        open_roots = {row[0] for row in self.db.fetch_all(f'''
+            SELECT id FROM complaints
+            WHERE id IN ({placeholders}) AND resolution_status IN ({','.join('?' * len(OPEN_STATUSES))})
+        ''', list(roots) + list(OPEN_STATUSES))}
+        for root, complaint_id, similarity in candidates:
+            if root in open_roots:
+                return {'complaint_id': root, 'matched_id': complaint_id,
+                        'similarity': round(similarity, 4)}
+        return None
+
+    def add(self, complaint_id, vector, root_id=None, timestamp=None):
+        """Add a newly stored complaint to the window, using the vector lookup() returned"""
+        if not self.enabled or vector is None:
+            return
+        version, vector = vector
+        timestamp = timestamp or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self._lock:
+            if self._version != version or complaint_id in self._known:
+                return
+            self._known.add(complaint_id)
+            self._pending.append((complaint_id, root_id or complaint_id, timestamp, sp.csr_matrix(vector)))
+
+    def _sync(self):
+        bundle = self.registry.get()
+        version = bundle.version
+        if version != self._version:
+            self._reset(version)
+        if time.monotonic() - self._refreshed_at < self.refresh_interval:
+            return
+        self._refreshed_at = time.monotonic()
+
+        cutoff = (datetime.now() - timedelta(hours=self.window_hours)).strftime("%Y-%m-%d %H:%M:%S")
+        rows = self.db.fetch_all(f'''
+            SELECT id, complaint_text, COALESCE(duplicate_of, id), timestamp
+            FROM complaints
+            WHERE id > ? AND timestamp >= ?
+              AND resolution_status IN ({','.join('?' * len(OPEN_STATUSES))})
+            ORDER BY id DESC LIMIT ?
+        ''', (self._last_id, cutoff) + OPEN_STATUSES + (self.max_size,))
+        if not rows:
+            return
+        self._last_id = max(self._last_id, rows[0][0])
+        rows = [row for row in reversed(rows) if row[0] not in self._known]
+        if not rows:
+            return
+        vectors = bundle.vectorize([text or '' for _, text, _, _ in rows])
+        for (complaint_id, _, root_id, timestamp), vector in zip(rows, vectors):
+            self._known.add(complaint_id)
+            self._pending.append((complaint_id, root_id, timestamp, vector))
+        self._merge()
+
+    def _scores(self, vectors):
+        """Cosine similarity of each vector to the window, main matrix rows first"""
+        if len(self._pending) > self.MERGE_THRESHOLD:
+            self._merge()
+        blocks = []
+        if self._matrix is not None:
+            blocks.append((vectors @ self._matrix.T).toarray())
+        if self._pending:
+            # A handful of recent rows; scored on their own so the main matrix is not copied
+            pending = sp.vstack([p[3] for p in self._pending], format='csr')
+            blocks.append((vectors @ pending.T).toarray())
+        if not blocks:
+            return np.zeros((vectors.shape[0], 0))
+        return np.hstack(blocks)
+
+    def _merge(self):
+        ids = self._ids + [p[0] for p in self._pending]
+        roots = self._roots + [p[1] for p in self._pending]
+        timestamps = self._timestamps + [p[2] for p in self._pending]
+        blocks = ([self._matrix] if self._matrix is not None else []) + [p[3] for p in self._pending]
+        self._pending = []
+        if not blocks:
+            return
+        matrix = sp.vstack(blocks, format='csr')
+
+        # Drop rows that left the time window, then keep only the newest max_size
+        cutoff = (datetime.now() - timedelta(hours=self.window_hours)).strftime("%Y-%m-%d %H:%M:%S")
+        keep = [i for i, timestamp in enumerate(timestamps) if timestamp >= cutoff][-self.max_size:]
+        if len(keep) < len(ids):
+            dropped = set(range(len(ids))) - set(keep)
+            self._known.difference_update(ids[i] for i in dropped)
+            matrix = matrix[keep]
+            ids = [ids[i] for i in keep]
+            roots = [roots[i] for i in keep]
+            timestamps = [timestamps[i] for i in keep]
+
+        self._matrix = matrix if ids else None
+        self._ids, self._roots, self._timestamps = ids, roots, timestamps
+
+    def stats(self):
+        with self._lock:
+            return {
+                'threshold': self.threshold,
+                'window_hours': self.window_hours,
+                'window_size': len(self._ids) + len(self._pending),
+                'max_size': self.max_size,
+                'auto_link': self.auto_link,
+                'lookups': self.lookups,
+                'matches': self.matches
+            }
+
+
+# Shared index used by /predict; configured in create_app()
+duplicate_index = DuplicateIndex()
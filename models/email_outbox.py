@@ -0,0 +1,195 @@
+import os
+import smtplib
+import threading
+from datetime import datetime, timedelta
+
+class EmailOutbox:
+    """Durable outbound email queue drained by background worker threads.
+
+    Messages are written to the email_outbox table and sent later, so a slow
+    or unavailable SMTP server never blocks a request and no notification is
+    lost. Each worker claims a batch of due messages, sends them over one
+    authenticated SMTP session (kept open while there is work) and retries
+    failures with exponential backoff until max_attempts is reached.
+    Messages left claimed for ``claim_timeout`` seconds (their worker died
+    or could not record the outcome) are claimed again.
+    """
+
+    def __init__(self, workers=2, batch_size=20, max_attempts=5, backoff_seconds=30,
+                 poll_interval=5, idle_timeout=60, claim_timeout=600):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.poll_interval = poll_interval
+        self.idle_timeout = idle_timeout
+        self.claim_timeout = claim_timeout
+        self.db = None
+        self.sender = None
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._pid = None
+
+    def init_app(self, app, db, sender):
+        config = app.config
+        self.db = db
+        self.sender = sender
+        self.workers = config.get('EMAIL_WORKERS', self.workers)
+        self.batch_size = config.get('EMAIL_BATCH_SIZE', self.batch_size)
+        self.max_attempts = config.get('EMAIL_MAX_ATTEMPTS', self.max_attempts)
+        self.backoff_seconds = config.get('EMAIL_RETRY_BACKOFF', self.backoff_seconds)
+
+    def start(self):
+        """Start the worker threads in this process if they are not running"""
+        if self.db is None or self.workers <= 0:
+            return
+        with self._lock:
+            if self._pid == os.getpid() and all(t.is_alive() for t in self._threads):
+                return
+            # Threads do not survive a fork; each worker process runs its own
+            self._pid = os.getpid()
+            self._threads = [
+                threading.Thread(target=self._run, name=f'email-outbox-{i}', daemon=True)
+                for i in range(self.workers)
+            ]
+            for thread in self._threads:
+                thread.start()
+
+    def enqueue(self, to_email, subject, body):
+        return self.enqueue_many([(to_email, subject, body)]) == 1
+
+    def enqueue_many(self, messages):
+        """Queue (to_email, subject, body) tuples in one transaction"""
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        ids = self.db.insert_many('''
+            INSERT INTO email_outbox (to_email, subject, body, status, attempts,
+                                      next_attempt_at, created_at)
+            VALUES (?, ?, ?, 'pending', 0, ?, ?)
+        ''', [(to_email, subject, body, now, now) for to_email, subject, body in messages])
+        self.start()
+        self._wake.set()
+        return len(ids)
+
+    def depth(self):
+        rows = self.db.fetch_all('SELECT status, COUNT(*) FROM email_outbox GROUP BY status')
+        counts = {'pending': 0, 'sending': 0, 'sent': 0, 'failed': 0}
+        counts.update({status: count for status, count in rows})
+        oldest = self.db.fetch_one('''
+            SELECT MIN(created_at) FROM email_outbox WHERE status IN ('pending', 'sending')
+        ''')
+        counts['oldest_unsent'] = oldest[0] if oldest else None
+        counts['workers'] = sum(1 for t in self._threads if t.is_alive())
+        return counts
+
+    def _claim(self):
+        """Claim due messages, and any whose claim has gone stale"""
+        now = datetime.now()
+        stale = (now - timedelta(seconds=self.claim_timeout)).strftime("%Y-%m-%d %H:%M:%S")
+        now = now.strftime("%Y-%m-%d %H:%M:%S")
+        with self.db.connection() as conn:
+            rows = conn.execute('''
+                UPDATE email_outbox SET status = 'sending', claimed_at = ?
+                WHERE id IN (
+                    SELECT id FROM (
+                        SELECT id, next_attempt_at AS due FROM email_outbox
+                        WHERE status = 'pending' AND next_attempt_at <= ?
+                        UNION ALL
+                        SELECT id, claimed_at FROM email_outbox
+                        WHERE status = 'sending' AND claimed_at < ?
+                    )
+                    ORDER BY due, id LIMIT ?
+                )
+                RETURNING id, to_email, subject, body, attempts
+            ''', (now, now, stale, self.batch_size)).fetchall()
+            conn.commit()
+        return rows
+
+    def _run(self):
+        server = None
+        idle_since = datetime.now()
+        while True:
+            try:
+                batch = self._claim()
+                if not batch:
+                    if server is not None and (datetime.now() - idle_since).total_seconds() > self.idle_timeout:
+                        self._quit(server)
+                        server = None
+                    self._wake.wait(self.poll_interval)
+                    self._wake.clear()
+                    continue
+                server = self._send_batch(server, batch)
+                idle_since = datetime.now()
+            except Exception as e:
+                # Bookkeeping failed (e.g. database is locked); keep the worker
+                # alive, and let the claim timeout return any stranded messages
+                print(f"❌ Email outbox worker error: {e}")
+                self._quit(server)
+                server = None
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+    def _send_batch(self, server, batch):
+        """Deliver claimed messages over one session; returns the session to reuse"""
+        for message_id, to_email, subject, body, attempts in batch:
+            try:
+                if server is None:
+                    server = self.sender.open_connection()
+                try:
+                    self.sender.deliver(server, to_email, subject, body)
+                except smtplib.SMTPServerDisconnected:
+                    # The shared session timed out; reconnect once and retry
+                    server = self.sender.open_connection()
+                    self.sender.deliver(server, to_email, subject, body)
+            except Exception as e:
+                # A message-level rejection leaves the session usable;
+                # anything else (network, auth, protocol) gets a fresh one
+                if not isinstance(e, (smtplib.SMTPRecipientsRefused,
+                                      smtplib.SMTPSenderRefused, smtplib.SMTPDataError)):
+                    self._quit(server)
+                    server = None
+                self._mark_failed(message_id, attempts + 1, e)
+                continue
+            self._mark_sent(message_id)
+            print(f"Email sent successfully to {to_email}")
+        return server
+
+    def _mark_sent(self, message_id):
+        self._execute('''
+            UPDATE email_outbox SET status = 'sent', sent_at = ?, attempts = attempts + 1,
+                                    last_error = NULL
+            WHERE id = ?
+        ''', (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), message_id))
+
+    def _mark_failed(self, message_id, attempts, error):
+        if attempts >= self.max_attempts:
+            status, next_attempt = 'failed', datetime.now()
+            print(f"❌ Giving up on email {message_id} after {attempts} attempts: {error}")
+        else:
+            status = 'pending'
+            next_attempt = datetime.now() + timedelta(seconds=self.backoff_seconds * 2 ** (attempts - 1))
+            print(f"Error sending email {message_id} (attempt {attempts}), retrying: {error}")
+        self._execute('''
+            UPDATE email_outbox SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ?
+            WHERE id = ?
+        ''', (status, attempts, next_attempt.strftime("%Y-%m-%d %H:%M:%S"), str(error), message_id))
+
+    def _execute(self, query, params):
+        # Outbox bookkeeping goes straight to a pooled connection so it does
+        # not fire the write listeners that invalidate dashboard caches
+        with self.db.connection() as conn:
+            conn.execute(query, params)
+            conn.commit()
+
+    @staticmethod
+    def _quit(server):
+        if server is None:
+            return
+        try:
+            server.quit()
+        except Exception:
+            pass
+
+
+# Shared outbox used by the email service; configured in create_app()
+email_outbox = EmailOutbox()
@@ -3,39 +3,36 @@ from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import os
 
+from .email_outbox import email_outbox
+
 class EmailService:
-    def __init__(self):
+    def __init__(self, outbox=None):
         # Email configuration
         self.mail_server = os.environ.get('MAIL_SERVER', 'smtp.gmail.com')
         self.mail_port = int(os.environ.get('MAIL_PORT', 587))
         self.mail_username = os.environ.get('MAIL_USERNAME')
         self.mail_password = os.environ.get('MAIL_PASSWORD')
         self.mail_use_tls = os.environ.get('MAIL_USE_TLS', 'True').lower() == 'true'
+        self.outbox = outbox
+
+    def is_configured(self):
+        return bool(self.mail_username and self.mail_password)
 
     def send_email(self, to_email, subject, body):
+        """Queue an email for background delivery (or send inline without an outbox)"""
         try:
             if not all([self.mail_username, self.mail_password, to_email]):
                 print("Email configuration incomplete. Please set MAIL_USERNAME and MAIL_PASSWORD environment variables.")
                 return False
 
-            # Create message
-            msg = MIMEMultipart()
-            msg['From'] = self.mail_username
-            msg['To'] = to_email
-            msg['Subject'] = subject
+            if self.outbox is not None and self.outbox.db is not None:
+                return self.outbox.enqueue(to_email, subject, body)
 
-            # Add body to email
-            msg.attach(MIMEText(body, 'html'))
-
-            # Create server connection
-            server = smtplib.SMTP(self.mail_server, self.mail_port)
-            if self.mail_use_tls:
-                server.starttls()
-            
-            server.login(self.mail_username, self.mail_password)
-            text = msg.as_string()
-            server.sendmail(self.mail_username, to_email, text)
-            server.quit()
+            server = self.open_connection()
+            try:
+                self.deliver(server, to_email, subject, body)
+            finally:
+                server.quit()
             
             print(f"Email sent successfully to {to_email}")
             return True
@@ -43,6 +40,27 @@ class EmailService:
             print(f"Error sending email: {e}")
             return False
 
+    def open_connection(self):
+        """Open an authenticated SMTP session that can send many messages"""
+        server = smtplib.SMTP(self.mail_server, self.mail_port, timeout=30)
+        if self.mail_use_tls:
+            server.starttls()
+        
+        server.login(self.mail_username, self.mail_password)
+        return server
+
+    def deliver(self, server, to_email, subject, body):
+        # Create message
+        msg = MIMEMultipart()
+        msg['From'] = self.mail_username
+        msg['To'] = to_email
+        msg['Subject'] = subject
+
+        # Add body to email
+        msg.attach(MIMEText(body, 'html'))
+
+        server.sendmail(self.mail_username, to_email, msg.as_string())
+
     def send_complaint_forward_email(self, department_email, complaint_details):
         subject = f"New Complaint Assigned - {complaint_details['category']}"
         body = f"""
@@ -90,12 +108,25 @@ class EmailService:
         return self.send_email(department_email, subject, body)
     
     def send_sla_escalation_email(self, manager_email, complaint_details):
+        subject, body = self.sla_escalation_message(complaint_details)
+        return self.send_email(manager_email, subject, body)
+
+    def send_sla_escalation_emails(self, manager_email, complaints):
+        """Queue one escalation notice per complaint in a single outbox write"""
+        if not complaints or not (self.is_configured() and manager_email):
+            return 0
+        messages = [(manager_email,) + self.sla_escalation_message(details) for details in complaints]
+        if self.outbox is not None and self.outbox.db is not None:
+            return self.outbox.enqueue_many(messages)
+        return sum(1 for to_email, subject, body in messages if self.send_email(to_email, subject, body))
+
+    def sla_escalation_message(self, complaint_details):
         subject = f"🚨 SLA Escalation - Complaint #{complaint_details['id']}"
         body = f"""
         <html>
         <body>
             <h2 style="color: #dc2626;">SLA Escalation Notice</h2>
-            <p>The following complaint has exceeded the 24-hour response SLA and has been escalated:</p>
+            <p>The following complaint has exceeded the {complaint_details.get('sla_hours', 24):g}-hour response SLA and has been escalated:</p>
             
             <div style="background: #fef2f2; padding: 15px; border-radius: 5px; margin: 10px 0; border-left: 4px solid #dc2626;">
                 <h3>Complaint Details:</h3>
@@ -110,7 +141,7 @@ class EmailService:
         </body>
         </html>
         """
-        return self.send_email(manager_email, subject, body)
+        return subject, body
 
     def send_resolution_feedback_email(self, customer_email, complaint_details):
         subject = f"Resolution Feedback - Complaint #{complaint_details['id']}"
@@ -134,4 +165,8 @@ class EmailService:
         </body>
         </html>
         """
-        return self.send_email(customer_email, subject, body)
\ No newline at end of file
+        return self.send_email(customer_email, subject, body)
+
+
+# Shared instance; sends through the durable outbox once create_app() configures it
+email_service = EmailService(outbox=email_outbox)
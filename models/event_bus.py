@@ -0,0 +1,228 @@
+import asyncio
+import json
+import queue
+import threading
+from datetime import datetime
+from urllib.parse import parse_qs
+
+class EventBus:
+    """Complaint change events pushed to browsers over server-sent events.
+
+    Write paths publish an event per changed complaint. Each event is
+    appended to the change_events table, so every worker process and any
+    reconnecting client can see it. While a process has subscribers, a
+    poller thread reads the table in id order and delivers what is new;
+    a local publish wakes it at once, so this process's own events are
+    not held back, and events from every process reach subscribers in
+    one sequence. Clients resume from their last event id; one that has
+    fallen further behind than the retained log gets a 'reset' event and
+    reloads.
+    """
+
+    def __init__(self, poll_interval=1.0, retention=10000, keepalive=15):
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self.keepalive = keepalive
+        self.db = None
+        self._subscribers = {}
+        self._next_token = 0
+        self._last_polled = None
+        self._poller = None
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+
+    def init_app(self, app, db):
+        config = app.config
+        self.db = db
+        self.poll_interval = config.get('EVENTS_POLL_INTERVAL', self.poll_interval)
+        self.retention = config.get('EVENTS_RETENTION', self.retention)
+        self.keepalive = config.get('EVENTS_KEEPALIVE', self.keepalive)
+
+    def publish(self, kind, complaint_id, complaint=None, previous=None, tx=None):
+        """Record and deliver one event; returns its id"""
+        return self.publish_many(kind, [(complaint_id, complaint, previous)], tx)[-1]
+
+    def publish_many(self, kind, changes, tx=None):
+        """Record and deliver one event per (complaint_id, complaint, previous).
+
+        Given a transaction, the events are written as part of it and
+        delivered only once it commits.
+        """
+        if self.db is None or not changes:
+            return []
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        payloads = [json.dumps({'kind': kind, 'id': complaint_id, 'complaint': complaint, 'previous': previous})
+                    for complaint_id, complaint, previous in changes]
+        writer = tx or self.db
+        ids = writer.insert_many(
+            'INSERT INTO change_events (kind, complaint_id, data, created_at) VALUES (?, ?, ?, ?)',
+            [(kind, complaint_id, payload, now) for (complaint_id, _, _), payload in zip(changes, payloads)]
+        )
+        if ids[-1] // 1000 != (ids[0] - 1) // 1000:
+            # Trim the log every thousand events
+            writer.execute_query('DELETE FROM change_events WHERE id <= ?', (ids[-1] - self.retention,))
+        # Delivered by the poller, in id order with other processes' events
+        if tx is None:
+            self._wake.set()
+        else:
+            tx.after_commit(self._wake.set)
+        return ids
+
+    def subscribe(self, callback):
+        """Call callback([(id, data), ...]) for every new event; returns a token"""
+        with self._lock:
+            self._next_token += 1
+            self._subscribers[self._next_token] = callback
+            if self._last_polled is None:
+                row = self.db.fetch_one('SELECT MAX(id) FROM change_events')
+                self._last_polled = row[0] or 0
+            if self._poller is None or not self._poller.is_alive():
+                self._poller = threading.Thread(target=self._poll, name='event-bus-poller', daemon=True)
+                self._poller.start()
+            return self._next_token
+
+    def unsubscribe(self, token):
+        with self._lock:
+            self._subscribers.pop(token, None)
+
+    def replay(self, last_event_id):
+        """Events after last_event_id as (events, reset); reset means the log no longer reaches back that far"""
+        oldest = self.db.fetch_one('SELECT MIN(id) FROM change_events')[0]
+        if oldest is not None and last_event_id < oldest - 1:
+            return [], True
+        rows = self.db.fetch_all(
+            'SELECT id, data FROM change_events WHERE id > ? ORDER BY id LIMIT ?',
+            (last_event_id, self.retention)
+        )
+        return rows, False
+
+    def _deliver(self, events):
+        with self._lock:
+            callbacks = list(self._subscribers.values())
+        for callback in callbacks:
+            try:
+                callback(events)
+            except RuntimeError:
+                # The subscriber's event loop closed before it unsubscribed
+                pass
+
+    def _poll(self):
+        """Forward events committed by other processes while anyone is listening"""
+        while True:
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            with self._lock:
+                if not self._subscribers:
+                    self._poller = None
+                    self._last_polled = None
+                    return
+                last_polled = self._last_polled
+            try:
+                rows = self.db.fetch_all(
+                    'SELECT id, data FROM change_events WHERE id > ? ORDER BY id LIMIT 1000', (last_polled,)
+                )
+            except Exception as e:
+                print(f"❌ Event poll error: {e}")
+                continue
+            if not rows:
+                continue
+            with self._lock:
+                self._last_polled = rows[-1][0]
+            self._deliver(rows)
+            if len(rows) == 1000:
+                self._wake.set()
+
+    @staticmethod
+    def _unseen(events, seen):
+        """(events after seen in id order, the new last id): drops what replay already sent"""
+        fresh = []
+        for event_id, data in events:
+            if event_id > seen:
+                fresh.append((event_id, data))
+                seen = event_id
+        return fresh, seen
+
+    @staticmethod
+    def format(event_id, data):
+        return f'id: {event_id}\nevent: complaint\ndata: {data}\n\n'
+
+    def _resume(self, last_event_id):
+        """Opening lines of a stream: retry hint, then missed events or a reset"""
+        lines = ['retry: 5000\n\n']
+        seen = 0
+        if last_event_id is not None:
+            events, reset = self.replay(last_event_id)
+            if reset:
+                lines.append('event: reset\ndata: {}\n\n')
+            lines += [self.format(event_id, data) for event_id, data in events]
+            seen = events[-1][0] if events else last_event_id
+        return lines, seen
+
+    def stream(self, last_event_id=None):
+        """Blocking SSE body for WSGI servers (holds one thread per client)"""
+        inbox = queue.Queue()
+        token = self.subscribe(inbox.put)
+        try:
+            lines, seen = self._resume(last_event_id)
+            yield ''.join(lines)
+            while True:
+                try:
+                    events = inbox.get(timeout=self.keepalive)
+                except queue.Empty:
+                    yield ': keepalive\n\n'
+                    continue
+                fresh, seen = self._unseen(events, seen)
+                if fresh:
+                    yield ''.join(self.format(event_id, data) for event_id, data in fresh)
+        finally:
+            self.unsubscribe(token)
+
+    async def asgi_app(self, scope, receive, send):
+        """The same stream served on the event loop, without a request thread"""
+        loop = asyncio.get_running_loop()
+        inbox = asyncio.Queue()
+        token = self.subscribe(lambda events: loop.call_soon_threadsafe(inbox.put_nowait, events))
+        disconnect = loop.create_task(self._wait_disconnect(receive))
+        try:
+            last_event_id = parse_last_event_id(
+                dict(scope.get('headers', [])).get(b'last-event-id', b'').decode('latin-1'),
+                parse_qs(scope.get('query_string', b'').decode('latin-1')).get('last_event_id', [''])[0]
+            )
+            lines, seen = await loop.run_in_executor(None, self._resume, last_event_id)
+            await send({'type': 'http.response.start', 'status': 200, 'headers': [
+                (b'content-type', b'text/event-stream'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no'),
+            ]})
+            await send({'type': 'http.response.body', 'body': ''.join(lines).encode(), 'more_body': True})
+            while not disconnect.done():
+                getter = loop.create_task(inbox.get())
+                done, _ = await asyncio.wait({getter, disconnect}, timeout=self.keepalive,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if getter not in done:
+                    getter.cancel()
+                    if not disconnect.done():
+                        await send({'type': 'http.response.body', 'body': b': keepalive\n\n', 'more_body': True})
+                    continue
+                fresh, seen = self._unseen(getter.result(), seen)
+                if fresh:
+                    body = ''.join(self.format(event_id, data) for event_id, data in fresh)
+                    await send({'type': 'http.response.body', 'body': body.encode(), 'more_body': True})
+        finally:
+            disconnect.cancel()
+            self.unsubscribe(token)
+
+    @staticmethod
+    async def _wait_disconnect(receive):
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+def parse_last_event_id(*candidates):
+    """First integer among the Last-Event-ID header and the last_event_id parameter"""
+    for value in candidates:
+        if value and value.strip().isdigit():
+            return int(value)
+    return None
+
+# Shared instance; configured in create_app()
+event_bus = EventBus()
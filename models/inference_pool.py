@@ -0,0 +1,117 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+
+# Per-process model, loaded once by the pool initializer
+_worker_registry = None
+
+def _init_worker(paths, mmap_mode):
+    global _worker_registry
+    from .model_registry import ModelRegistry
+    _worker_registry = ModelRegistry(*paths, mmap_mode=mmap_mode)
+    _worker_registry.get()
+
+def _classify_in_worker(texts):
+    return _worker_registry.classify(texts)
+
+class InferencePool:
+    """Classification on a pool of worker processes.
+
+    Each worker loads the model once (memory-mapped, so the processes share
+    the array pages) and runs transform + predict outside the caller's GIL.
+    Large inputs are split into chunks and classified in parallel. Workers
+    are started with 'spawn' so they never inherit the threads or pooled
+    SQLite connections of the parent.
+    """
+
+    def __init__(self, paths=(), workers=None, mmap_mode='r', chunk_size=2000):
+        self.paths = tuple(paths)
+        # None means one worker per CPU; 0 classifies in the calling process
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.mmap_mode = mmap_mode
+        self.chunk_size = chunk_size
+        self.version = None
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def reload(self, paths, version=None):
+        """Point the pool at a new model; new work starts fresh workers.
+
+        Chunks already queued on the old workers (other requests' batches)
+        still complete: the old pool drains and shuts down in the background.
+        """
+        with self._lock:
+            if version is not None and version == self.version:
+                return
+            old, self._executor = self._executor, None
+            self.paths = tuple(paths)
+            self.version = version
+            if self.workers <= 0:
+                # Inline mode loads the new model on its next call
+                global _worker_registry
+                _worker_registry = None
+        if old is not None:
+            threading.Thread(target=old.shutdown, kwargs={'wait': True},
+                             name='inference-pool-drain', daemon=True).start()
+
+    def start(self):
+        self._current_executor()
+        return self
+
+    def _current_executor(self):
+        if self.workers <= 0:
+            return None
+        with self._lock:
+            if self._pid != os.getpid():
+                # A pool created before a fork belongs to the parent
+                self._executor = None
+                self._pid = os.getpid()
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker,
+                    initargs=(self.paths, self.mmap_mode)
+                )
+            return self._executor
+
+    def submit(self, texts):
+        """Classify one chunk in a worker; returns a Future of the labels"""
+        if self.workers <= 0:
+            future = Future()
+            if _worker_registry is None:
+                _init_worker(self.paths, self.mmap_mode)
+            future.set_result(_classify_in_worker(list(texts)))
+            return future
+        try:
+            return self._current_executor().submit(_classify_in_worker, list(texts))
+        except RuntimeError:
+            # The pool was swapped out by a reload between lookup and submit
+            return self._current_executor().submit(_classify_in_worker, list(texts))
+
+    def classify(self, texts):
+        """Classify any number of texts, spreading chunks across the workers"""
+        texts = list(texts)
+        if not texts:
+            return []
+        # Enough chunks to keep every worker busy, but no larger than chunk_size
+        size = max(1, min(self.chunk_size, -(-len(texts) // max(self.workers, 1))))
+        futures = [self.submit(texts[i:i + size]) for i in range(0, len(texts), size)]
+        labels = []
+        for future in futures:
+            labels.extend(future.result())
+        return labels
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
@@ -0,0 +1,153 @@
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+class InferenceScheduler:
+    """Coalesce concurrent single-text predictions into vectorized batches.
+
+    Requests are queued and a background thread drains them: the first item
+    opens a batch window of ``max_wait_ms`` and the batch is flushed as soon
+    as the window closes or ``max_batch_size`` items have arrived. Results are
+    handed back to each caller through a Future.
+    """
+
+    BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+    def __init__(self, predict_fn, max_batch_size=32, max_wait_ms=5.0, enabled=True):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.enabled = enabled
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+        self._pid = None
+        self._reset_stats()
+
+    def configure(self, max_batch_size=None, max_wait_ms=None, enabled=None):
+        if max_batch_size is not None:
+            self.max_batch_size = max_batch_size
+        if max_wait_ms is not None:
+            self.max_wait_ms = max_wait_ms
+        if enabled is not None:
+            self.enabled = enabled
+
+    def predict(self, text, timeout=30):
+        """Classify one text, sharing the model call with concurrent requests"""
+        if not self.enabled:
+            return self.predict_fn([text])[0]
+        return self.submit(text).result(timeout=timeout)
+
+    def submit(self, text):
+        future = Future()
+        self._ensure_worker()
+        self._queue.put((text, future, time.perf_counter()))
+        return future
+
+    def _ensure_worker(self):
+        # The worker thread does not survive a fork, so restart it per process
+        if self._worker is not None and self._worker.is_alive() and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive() or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._queue = queue.Queue()
+                self._worker = threading.Thread(
+                    target=self._run, name='inference-scheduler', daemon=True
+                )
+                self._worker.start()
+
+    def _run(self):
+        pending = self._queue
+        while True:
+            batch = [pending.get()]
+            deadline = batch[0][2] + self.max_wait_ms / 1000.0
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    if remaining > 0:
+                        batch.append(pending.get(timeout=remaining))
+                    else:
+                        batch.append(pending.get_nowait())
+                except queue.Empty:
+                    break
+
+            self._process(batch)
+
+    def _process(self, batch):
+        started = time.perf_counter()
+        try:
+            results = self.predict_fn([text for text, _, _ in batch])
+        except Exception as e:
+            for _, future, _ in batch:
+                future.set_exception(e)
+            results = None
+        finished = time.perf_counter()
+
+        if results is not None:
+            for (_, future, _), result in zip(batch, results):
+                future.set_result(result)
+
+        self._record(batch, started, finished)
+
+    def _reset_stats(self):
+        self._batches = 0
+        self._items = 0
+        self._size_histogram = [0] * (len(self.BATCH_SIZE_BUCKETS) + 1)
+        self._queue_waits = deque(maxlen=2048)
+        self._inference_ms_total = 0.0
+
+    def _record(self, batch, started, finished):
+        size = len(batch)
+        bucket = next(
+            (i for i, bound in enumerate(self.BATCH_SIZE_BUCKETS) if size <= bound),
+            len(self.BATCH_SIZE_BUCKETS)
+        )
+        with self._lock:
+            self._batches += 1
+            self._items += size
+            self._size_histogram[bucket] += 1
+            self._inference_ms_total += (finished - started) * 1000
+            self._queue_waits.extend((started - enqueued) * 1000 for _, _, enqueued in batch)
+
+    def stats(self):
+        """Batch size and queue wait metrics for tuning the batching window"""
+        with self._lock:
+            waits = sorted(self._queue_waits)
+            batches = self._batches
+            items = self._items
+            histogram = list(self._size_histogram)
+            inference_ms_total = self._inference_ms_total
+
+        def percentile(p):
+            if not waits:
+                return 0
+            return round(waits[min(len(waits) - 1, int(p / 100 * len(waits)))], 3)
+
+        labels = [f'<={bound}' for bound in self.BATCH_SIZE_BUCKETS]
+        labels.append(f'>{self.BATCH_SIZE_BUCKETS[-1]}')
+
+        return {
+            'enabled': self.enabled,
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait_ms,
+            'queue_depth': self._queue.qsize(),
+            'batches': batches,
+            'items': items,
+            'avg_batch_size': round(items / batches, 2) if batches else 0,
+            'batch_size_histogram': [
+                {'batch_size': label, 'count': count}
+                for label, count in zip(labels, histogram)
+            ],
+            'avg_inference_ms': round(inference_ms_total / batches, 3) if batches else 0,
+            'queue_wait_ms': {
+                'p50': percentile(50),
+                'p95': percentile(95),
+                'p99': percentile(99),
+                'max': round(waits[-1], 3) if waits else 0
+            }
+        }
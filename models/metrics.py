@@ -0,0 +1,146 @@
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from flask import Response, g, has_request_context, request
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a tuple of label values"""
+
+    def __init__(self, name, help_text, label_names, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * len(self.buckets), 0.0, 0]
+            counts = series[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = [(labels, list(counts), total, count)
+                      for labels, (counts, total, count) in sorted(self._series.items())]
+        for labels, counts, total, count in series:
+            base = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, labels))
+            prefix = base + ',' if base else ''
+            for bound, bucket_count in zip(self.buckets, counts):
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {bucket_count}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {count}')
+            lines.append(f'{self.name}_sum{{{base}}} {total:.6f}')
+            lines.append(f'{self.name}_count{{{base}}} {count}')
+        return lines
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+class Metrics:
+    """Per-request latency, SQL and model timings.
+
+    Every request gets its wall time, the number and total time of the
+    Database calls it made, and the time spent waiting on the model; these
+    feed Prometheus histograms served on /metrics and a Server-Timing
+    header on the response. A request issuing more than ``query_warn``
+    queries is logged with its most repeated statement, which is how N+1
+    loops show up. Figures are per process: scrape each worker.
+    """
+
+    LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+    QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+    COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 500)
+
+    def __init__(self, query_warn=20):
+        self.query_warn = query_warn
+        self.enabled = False
+        self.requests = Histogram('http_request_duration_seconds', 'Request latency by endpoint.',
+                                  ('endpoint', 'method', 'status'), self.LATENCY_BUCKETS)
+        self.queries = Histogram('db_query_duration_seconds', 'Database call latency by endpoint.',
+                                 ('endpoint',), self.QUERY_BUCKETS)
+        self.queries_per_request = Histogram('db_queries_per_request', 'Database calls made by one request.',
+                                             ('endpoint',), self.COUNT_BUCKETS)
+        self.inference = Histogram('model_inference_duration_seconds', 'Model call latency by batch size.',
+                                   ('batch',), self.LATENCY_BUCKETS)
+
+    def init_app(self, app, db):
+        self.enabled = app.config.get('METRICS_ENABLED', True)
+        self.query_warn = app.config.get('METRICS_QUERY_WARN', self.query_warn)
+        if not self.enabled:
+            return
+        db.add_query_listener(self.observe_query)
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.add_url_rule('/metrics', 'metrics', self.render_view)
+
+    def _start_request(self):
+        g.metrics = {'started': time.perf_counter(), 'queries': 0, 'db': 0.0,
+                     'statements': Counter(), 'timings': {}}
+
+    def _finish_request(self, response):
+        state = g.pop('metrics', None)
+        if state is None:
+            return response
+        elapsed = time.perf_counter() - state['started']
+        endpoint = request.endpoint or 'unmatched'
+        self.requests.observe((endpoint, request.method, str(response.status_code)), elapsed)
+        self.queries_per_request.observe((endpoint,), state['queries'])
+
+        if state['queries'] > self.query_warn:
+            statement, repeats = state['statements'].most_common(1)[0]
+            print(f"⚠️ {endpoint} made {state['queries']} queries; "
+                  f"repeated {repeats}x: {' '.join(statement.split())[:120]}")
+
+        timings = [f'app;dur={elapsed * 1000:.2f}',
+                   f'db;dur={state["db"] * 1000:.2f};desc="{state["queries"]} queries"']
+        timings += [f'{name};dur={seconds * 1000:.2f}' for name, seconds in state['timings'].items()]
+        response.headers['Server-Timing'] = ', '.join(timings)
+        return response
+
+    def observe_query(self, query, seconds):
+        """Database query listener; attributes the call to the current request"""
+        state = g.get('metrics') if has_request_context() else None
+        if state is None:
+            self.queries.observe(('background',), seconds)
+            return
+        self.queries.observe((request.endpoint or 'unmatched',), seconds)
+        state['queries'] += 1
+        state['db'] += seconds
+        state['statements'][query] += 1
+
+    def observe_inference(self, seconds, batch_size):
+        bucket = next((str(size) for size in (1, 8, 32, 128, 1024) if batch_size <= size), '1024+')
+        self.inference.observe((bucket,), seconds)
+
+    @contextmanager
+    def timed(self, name):
+        """Add the block's duration to the current request's Server-Timing under name"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            state = g.get('metrics') if has_request_context() else None
+            if state is not None:
+                state['timings'][name] = state['timings'].get(name, 0.0) + time.perf_counter() - started
+
+    def render(self):
+        lines = []
+        for histogram in (self.requests, self.queries, self.queries_per_request, self.inference):
+            lines.extend(histogram.render())
+        return '\n'.join(lines) + '\n'
+
+    def render_view(self):
+        return Response(self.render(), mimetype='text/plain; version=0.0.4')
+
+# Shared instance; hooked into the app by create_app()
+metrics = Metrics()
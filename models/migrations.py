@@ -0,0 +1,451 @@
+"""Versioned schema migrations for the complaints database.
+
+Each migration is a (version, name, function) entry in MIGRATIONS, applied in
+order inside its own transaction. The schema_version table records which
+versions have run, so migrate() is cheap to call on every startup and only
+applies what is new. Append new migrations at the end; never edit one that
+has shipped.
+"""
+from datetime import datetime
+
+def _baseline_schema(c):
+    # Users table
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            password TEXT NOT NULL,
+            role TEXT DEFAULT 'customer',
+            created_at TEXT NOT NULL,
+            is_active BOOLEAN DEFAULT TRUE
+        )
+    ''')
+
+    # Departments table
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS departments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE,
+            email TEXT NOT NULL,
+            description TEXT,
+            created_at TEXT NOT NULL
+        )
+    ''')
+
+    # Enhanced complaints table
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS complaints (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            complaint_text TEXT NOT NULL,
+            predicted_category TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            forwarded BOOLEAN DEFAULT FALSE,
+            forwarded_to TEXT,
+            forwarded_at TEXT,
+            resolution_status TEXT DEFAULT "Pending",
+            assigned_department_id INTEGER,
+            case_completed BOOLEAN DEFAULT FALSE,
+            completed_at TEXT,
+            priority TEXT DEFAULT 'Medium',
+            sla_breached BOOLEAN DEFAULT FALSE,
+            escalated_at TEXT,
+            customer_id INTEGER,
+            feedback_provided BOOLEAN DEFAULT FALSE,
+            FOREIGN KEY (assigned_department_id) REFERENCES departments (id),
+            FOREIGN KEY (customer_id) REFERENCES users (id)
+        )
+    ''')
+
+    # Feedback table
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS feedback (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            complaint_id INTEGER NOT NULL,
+            rating INTEGER CHECK (rating >= 1 AND rating <= 5),
+            comments TEXT,
+            created_at TEXT NOT NULL,
+            FOREIGN KEY (complaint_id) REFERENCES complaints (id)
+        )
+    ''')
+
+    # Internal notes table
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS case_notes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            complaint_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            note_text TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            is_internal BOOLEAN DEFAULT TRUE,
+            FOREIGN KEY (complaint_id) REFERENCES complaints (id),
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+    ''')
+
+def _add_workflow_columns(c):
+    # Databases created before the SLA/priority/feedback workflow lack these
+    existing = {row[1] for row in c.execute('PRAGMA table_info(complaints)')}
+    for column, definition in (
+        ('priority', "TEXT DEFAULT 'Medium'"),
+        ('sla_breached', 'BOOLEAN DEFAULT FALSE'),
+        ('escalated_at', 'TEXT'),
+        ('customer_id', 'INTEGER REFERENCES users (id)'),
+        ('feedback_provided', 'BOOLEAN DEFAULT FALSE'),
+    ):
+        if column not in existing:
+            c.execute(f'ALTER TABLE complaints ADD COLUMN {column} {definition}')
+
+# Secondary indexes on complaints. Kept as data so bulk loaders can drop
+# them before a large import and rebuild them afterwards.
+COMPLAINT_INDEXES = (
+    # Newest-first listing and keyset pagination
+    ('idx_complaints_timestamp', 'complaints (timestamp, id)'),
+    # Listing filters; the status index also serves the SLA scan
+    ('idx_complaints_status_timestamp', 'complaints (resolution_status, timestamp, id)'),
+    ('idx_complaints_category_timestamp', 'complaints (predicted_category, timestamp, id)'),
+    # Listing filter and the assigned-complaints check in delete_department
+    ('idx_complaints_department_timestamp', 'complaints (assigned_department_id, timestamp, id)'),
+    ('idx_complaints_priority_timestamp', 'complaints (priority, timestamp, id)'),
+    # Resolved-in-window KPI
+    ('idx_complaints_completed', 'complaints (case_completed, completed_at)'),
+)
+
+OTHER_INDEXES = (
+    ('idx_feedback_complaint', 'feedback (complaint_id)'),
+    ('idx_case_notes_complaint', 'case_notes (complaint_id)'),
+)
+
+def create_complaint_indexes(c):
+    for name, definition in COMPLAINT_INDEXES:
+        c.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {definition}')
+
+def drop_complaint_indexes(c):
+    for name, _ in COMPLAINT_INDEXES:
+        c.execute(f'DROP INDEX IF EXISTS {name}')
+
+def _normalize_timestamps_and_index(c):
+    # Timestamps are compared as text ('YYYY-MM-DD HH:MM:SS' sorts
+    # chronologically), so rewrite any other ISO spelling into that form
+    # before indexing. Queries then use plain range predicates such as
+    # "timestamp < ?" instead of wrapping the column in datetime().
+    for column in ('timestamp', 'forwarded_at', 'completed_at', 'escalated_at'):
+        c.execute(f'''
+            UPDATE complaints SET {column} = datetime({column})
+            WHERE {column} IS NOT NULL AND datetime({column}) IS NOT NULL
+            AND {column} != datetime({column})
+        ''')
+
+    create_complaint_indexes(c)
+    for name, definition in OTHER_INDEXES:
+        c.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {definition}')
+
+# Analytics rollups. complaint_rollup_totals holds all-time counts per
+# (category, status, department) and complaint_rollup_daily the same per day,
+# so the dashboard reads a handful of small rows instead of the complaints
+# table. Triggers keep both in step with every insert, update and delete.
+ROLLUP_TABLES = (
+    ('complaint_rollup_totals', ()),
+    ('complaint_rollup_daily', ('day',)),
+)
+
+# Dimension and measure expressions for one complaint row; {row} is NEW or OLD
+ROLLUP_DIMENSIONS = (
+    ('day', 'substr({row}.timestamp, 1, 10)'),
+    ('category', '{row}.predicted_category'),
+    ('status', "COALESCE({row}.resolution_status, '')"),
+    ('department_id', 'COALESCE({row}.assigned_department_id, 0)'),
+)
+ROLLUP_MEASURES = (
+    ('complaint_count', '1'),
+    ('forwarded_count', 'CASE WHEN {row}.forwarded THEN 1 ELSE 0 END'),
+    ('completed_count', 'CASE WHEN {row}.case_completed THEN 1 ELSE 0 END'),
+    ('response_hours_sum', """CASE WHEN {row}.forwarded AND {row}.forwarded_at IS NOT NULL
+        THEN (julianday({row}.forwarded_at) - julianday({row}.timestamp)) * 24 ELSE 0 END"""),
+    ('response_count', 'CASE WHEN {row}.forwarded AND {row}.forwarded_at IS NOT NULL THEN 1 ELSE 0 END'),
+)
+
+def _rollup_dimensions(extra):
+    return [(name, expr) for name, expr in ROLLUP_DIMENSIONS
+            if name != 'day' or 'day' in extra]
+
+def _rollup_apply(table, extra, row, sign):
+    """SQL adding (sign=+1) or removing (sign=-1) one row's contribution"""
+    dimensions = _rollup_dimensions(extra)
+    columns = [name for name, _ in dimensions] + [name for name, _ in ROLLUP_MEASURES]
+    values = [expr.format(row=row) for _, expr in dimensions]
+    values += [f"{'-' if sign < 0 else ''}({expr.format(row=row)})" for _, expr in ROLLUP_MEASURES]
+    keys = ', '.join(name for name, _ in dimensions)
+    updates = ', '.join(f'{name} = {name} + excluded.{name}' for name, _ in ROLLUP_MEASURES)
+    sql = f"""
+        INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(values)})
+        ON CONFLICT ({keys}) DO UPDATE SET {updates};"""
+    if sign < 0:
+        match = ' AND '.join(f'{name} = {expr.format(row=row)}' for name, expr in dimensions)
+        sql += f"\n        DELETE FROM {table} WHERE {match} AND complaint_count = 0;"
+    return sql
+
+def _create_rollups(c):
+    for table, extra in ROLLUP_TABLES:
+        dimensions = _rollup_dimensions(extra)
+        dimension_columns = ', '.join(
+            f"{name} {'INTEGER' if name == 'department_id' else 'TEXT'} NOT NULL"
+            for name, _ in dimensions
+        )
+        c.execute(f'''
+            CREATE TABLE IF NOT EXISTS {table} (
+                {dimension_columns},
+                complaint_count INTEGER NOT NULL DEFAULT 0,
+                forwarded_count INTEGER NOT NULL DEFAULT 0,
+                completed_count INTEGER NOT NULL DEFAULT 0,
+                response_hours_sum REAL NOT NULL DEFAULT 0,
+                response_count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY ({', '.join(name for name, _ in dimensions)})
+            ) WITHOUT ROWID
+        ''')
+
+        # Backfill from existing complaints
+        c.execute(f'''
+            INSERT INTO {table} ({', '.join(name for name, _ in dimensions)},
+                                 {', '.join(name for name, _ in ROLLUP_MEASURES)})
+            SELECT {', '.join(expr.format(row='c') for _, expr in dimensions)},
+                   {', '.join(f"SUM({expr.format(row='c')})" for _, expr in ROLLUP_MEASURES)}
+            FROM complaints c
+            GROUP BY {', '.join(str(i + 1) for i in range(len(dimensions)))}
+        ''')
+
+    c.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_complaints_rollup_insert
+        AFTER INSERT ON complaints BEGIN
+            {''.join(_rollup_apply(table, extra, 'NEW', +1) for table, extra in ROLLUP_TABLES)}
+        END
+    ''')
+    c.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_complaints_rollup_update
+        AFTER UPDATE OF timestamp, predicted_category, resolution_status, assigned_department_id,
+                        forwarded, forwarded_at, case_completed ON complaints BEGIN
+            {''.join(_rollup_apply(table, extra, 'OLD', -1) for table, extra in ROLLUP_TABLES)}
+            {''.join(_rollup_apply(table, extra, 'NEW', +1) for table, extra in ROLLUP_TABLES)}
+        END
+    ''')
+    c.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_complaints_rollup_delete
+        AFTER DELETE ON complaints BEGIN
+            {''.join(_rollup_apply(table, extra, 'OLD', -1) for table, extra in ROLLUP_TABLES)}
+        END
+    ''')
+
+def _create_email_outbox(c):
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS email_outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            to_email TEXT NOT NULL,
+            subject TEXT NOT NULL,
+            body TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at TEXT NOT NULL,
+            claimed_at TEXT,
+            last_error TEXT,
+            created_at TEXT NOT NULL,
+            sent_at TEXT
+        )
+    ''')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_email_outbox_due ON email_outbox (status, next_attempt_at, id)')
+
+def _create_system_state(c):
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS system_state (
+            key TEXT PRIMARY KEY,
+            value TEXT,
+            updated_at TEXT
+        )
+    ''')
+
+def _add_priority_scored_at(c):
+    # NULL marks rows the priority engine has not scored yet (the column
+    # default of 'Medium' is indistinguishable from a scored Medium)
+    existing = {row[1] for row in c.execute('PRAGMA table_info(complaints)')}
+    if 'priority_scored_at' not in existing:
+        c.execute('ALTER TABLE complaints ADD COLUMN priority_scored_at TEXT')
+    c.execute('''
+        CREATE INDEX IF NOT EXISTS idx_complaints_unscored
+        ON complaints (id) WHERE priority_scored_at IS NULL
+    ''')
+
+def _create_search_index(c):
+    # One FTS5 row per complaint (rowid = complaint id) holding its text and
+    # all of its case notes; bm25 weighs a hit in the complaint itself over
+    # one in a note
+    c.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS complaint_search USING fts5(
+            complaint_text, note_text,
+            tokenize = 'porter unicode61 remove_diacritics 2'
+        )
+    ''')
+    c.execute("INSERT INTO complaint_search (complaint_search, rank) VALUES ('rank', 'bm25(1.0, 0.5)')")
+
+    notes_of = "(SELECT group_concat(note_text, char(10)) FROM case_notes WHERE complaint_id = {id})"
+    triggers = (
+        ('trg_complaint_search_insert', 'AFTER INSERT ON complaints', f'''
+            INSERT INTO complaint_search (rowid, complaint_text, note_text)
+            VALUES (new.id, new.complaint_text, {notes_of.format(id='new.id')});'''),
+        ('trg_complaint_search_update', 'AFTER UPDATE OF complaint_text ON complaints', '''
+            UPDATE complaint_search SET complaint_text = new.complaint_text WHERE rowid = new.id;'''),
+        ('trg_complaint_search_delete', 'AFTER DELETE ON complaints', '''
+            DELETE FROM complaint_search WHERE rowid = old.id;'''),
+        ('trg_case_notes_search_insert', 'AFTER INSERT ON case_notes', f'''
+            UPDATE complaint_search SET note_text = {notes_of.format(id='new.complaint_id')}
+            WHERE rowid = new.complaint_id;'''),
+        ('trg_case_notes_search_update', 'AFTER UPDATE ON case_notes', f'''
+            UPDATE complaint_search SET note_text = {notes_of.format(id='old.complaint_id')}
+            WHERE rowid = old.complaint_id;
+            UPDATE complaint_search SET note_text = {notes_of.format(id='new.complaint_id')}
+            WHERE rowid = new.complaint_id;'''),
+        ('trg_case_notes_search_delete', 'AFTER DELETE ON case_notes', f'''
+            UPDATE complaint_search SET note_text = {notes_of.format(id='old.complaint_id')}
+            WHERE rowid = old.complaint_id;'''),
+    )
+    for name, event, body in triggers:
+        c.execute(f'CREATE TRIGGER IF NOT EXISTS {name} {event} BEGIN {body} END')
+
+    c.execute('DELETE FROM complaint_search')
+    c.execute(f'''
+        INSERT INTO complaint_search (rowid, complaint_text, note_text)
+        SELECT id, complaint_text, {notes_of.format(id='complaints.id')} FROM complaints
+    ''')
+
+def _add_duplicate_links(c):
+    existing = {row[1] for row in c.execute('PRAGMA table_info(complaints)')}
+    if 'duplicate_of' not in existing:
+        c.execute('ALTER TABLE complaints ADD COLUMN duplicate_of INTEGER REFERENCES complaints (id)')
+    c.execute('''
+        CREATE INDEX IF NOT EXISTS idx_complaints_duplicate_of
+        ON complaints (duplicate_of) WHERE duplicate_of IS NOT NULL
+    ''')
+
+def _index_feedback_created(c):
+    # Lets exports stream feedback in created_at order without a sort
+    c.execute('CREATE INDEX IF NOT EXISTS idx_feedback_created ON feedback (created_at, id)')
+
+def _create_change_events(c):
+    # Complaint change log behind the live event stream; shared by all
+    # worker processes and replayed to reconnecting clients
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS change_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            complaint_id INTEGER,
+            data TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        )
+    ''')
+
+def _version_departments(c):
+    # Any change to departments bumps a counter in system_state, so each
+    # worker's in-memory department directory can tell when to reload
+    c.execute('''
+        INSERT OR IGNORE INTO system_state (key, value, updated_at)
+        VALUES ('departments_version', '0', datetime('now', 'localtime'))
+    ''')
+    bump = '''
+        UPDATE system_state
+        SET value = CAST(value AS INTEGER) + 1, updated_at = datetime('now', 'localtime')
+        WHERE key = 'departments_version';'''
+    for name, event in (('trg_departments_version_insert', 'AFTER INSERT ON departments'),
+                        ('trg_departments_version_update', 'AFTER UPDATE ON departments'),
+                        ('trg_departments_version_delete', 'AFTER DELETE ON departments')):
+        c.execute(f'CREATE TRIGGER IF NOT EXISTS {name} {event} BEGIN {bump} END')
+
+def _create_archive(c):
+    # Long-completed complaints move to one table per month of receipt
+    # (see models/archiver.py). The index records where each one went, and
+    # the months table holds the totals the KPIs need from the archive.
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS complaint_archive_months (
+            month TEXT PRIMARY KEY,
+            table_name TEXT NOT NULL,
+            complaint_count INTEGER NOT NULL DEFAULT 0,
+            resolution_hours_sum REAL NOT NULL DEFAULT 0,
+            sla_breached_count INTEGER NOT NULL DEFAULT 0,
+            archived_at TEXT
+        )
+    ''')
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS complaint_archive_index (
+            complaint_id INTEGER PRIMARY KEY,
+            month TEXT NOT NULL
+        )
+    ''')
+    # Archived rows keep counting towards the all-time rollups and stay searchable
+    archived = 'EXISTS (SELECT 1 FROM complaint_archive_index WHERE complaint_id = OLD.id)'
+    c.execute('DROP TRIGGER IF EXISTS trg_complaint_search_delete')
+    c.execute(f'''
+        CREATE TRIGGER trg_complaint_search_delete
+        AFTER DELETE ON complaints
+        WHEN NOT {archived} BEGIN
+            DELETE FROM complaint_search WHERE rowid = old.id;
+        END
+    ''')
+    c.execute('DROP TRIGGER IF EXISTS trg_complaints_rollup_delete')
+    c.execute(f'''
+        CREATE TRIGGER trg_complaints_rollup_delete
+        AFTER DELETE ON complaints
+        WHEN NOT {archived} BEGIN
+            {''.join(_rollup_apply(table, extra, 'OLD', -1) for table, extra in ROLLUP_TABLES)}
+        END
+    ''')
+    # Rebuilt with a UNION ALL branch per archive table as they are created
+    c.execute('CREATE VIEW IF NOT EXISTS complaints_all AS SELECT * FROM complaints')
+
+MIGRATIONS = [
+    (1, 'baseline schema', _baseline_schema),
+    (2, 'add workflow columns to legacy complaints tables', _add_workflow_columns),
+    (3, 'normalize timestamps and add secondary indexes', _normalize_timestamps_and_index),
+    (4, 'analytics rollup tables maintained by triggers', _create_rollups),
+    (5, 'durable email outbox', _create_email_outbox),
+    (6, 'system state (SLA high-water mark)', _create_system_state),
+    (7, 'track priority scoring', _add_priority_scored_at),
+    (8, 'full-text search index', _create_search_index),
+    (9, 'link near-duplicate complaints', _add_duplicate_links),
+    (10, 'index feedback by creation time', _index_feedback_created),
+    (11, 'complaint change events', _create_change_events),
+    (12, 'version counter for departments', _version_departments),
+    (13, 'monthly archive of completed complaints', _create_archive),
+]
+
+def current_version(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TEXT NOT NULL
+        )
+    ''')
+    row = conn.execute('SELECT MAX(version) FROM schema_version').fetchone()
+    return row[0] or 0
+
+def migrate(conn, target=None):
+    """Apply every pending migration up to target (default: latest)"""
+    version = current_version(conn)
+    for number, name, apply in MIGRATIONS:
+        if number <= version or (target is not None and number > target):
+            continue
+
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            # Another worker may have applied it while we waited for the lock
+            if current_version(conn) >= number:
+                conn.commit()
+                continue
+            apply(conn.cursor())
+            conn.execute(
+                'INSERT INTO schema_version (version, name, applied_at) VALUES (?, ?, ?)',
+                (number, name, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        print(f"✅ Applied migration {number}: {name}")
+    return current_version(conn)
@@ -0,0 +1,252 @@
+import hashlib
+import os
+import threading
+import time
+from datetime import datetime
+
+import joblib
+import numpy as np
+
+from .compiled_model import CompiledModel
+
+# Checked against sklearn before the compiled path is used
+VERIFY_TEXTS = [
+    "model registry smoke test",
+    "I have issues with my billing statement",
+    "My credit card was charged twice and the bank will not refund it",
+    "Debt collector keeps calling me at work about a loan I already paid",
+    "",
+]
+
+class ModelBundle:
+    """One consistent model/vectorizer/encoder triple and its version"""
+
+    def __init__(self, model, vectorizer, encoder, version, paths, compiled=None):
+        self.model = model
+        self.vectorizer = vectorizer
+        self.encoder = encoder
+        self.version = version
+        self.paths = paths
+        self.compiled = compiled
+        self.loaded_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    def vectorize(self, texts):
+        """tf-idf features of the texts, from the compiled path when it is active"""
+        if self.compiled is not None:
+            return self.compiled.transform(texts)
+        return self.vectorizer.transform(texts)
+
+    def classify(self, texts):
+        if self.compiled is not None:
+            return self.compiled.classify(texts)
+        X_input = self.vectorizer.transform(texts)
+        predictions = self.model.predict(X_input)
+        return list(self.encoder.inverse_transform(predictions))
+
+    def confidence(self, texts):
+        """Probability of the predicted class for each text"""
+        X_input = self.vectorize(texts)
+        return self.model.predict_proba(X_input).max(axis=1).tolist()
+
+
+class ModelRegistry:
+    """Lazily loaded, hot-swappable classifier shared by every request.
+
+    Models are loaded on first use (or by a background warm-up thread) with
+    joblib's mmap mode, so numpy arrays are backed by the page cache and
+    shared read-only between forked workers. A reload builds and smoke-tests
+    a complete new bundle before swapping the reference, so callers always
+    see either the old triple or the new one, never a mix.
+    """
+
+    def __init__(self, model_path='customer_classification_model_lr.pkl',
+                 vectorizer_path='tfidf_vectorizer.pkl', encoder_path='label_encoder.pkl',
+                 mmap_mode='r', compiled=True, compiled_path='compiled_model.npz'):
+        self.paths = (model_path, vectorizer_path, encoder_path)
+        self.compiled_path = compiled_path
+        self.mmap_mode = mmap_mode
+        self.compiled = compiled
+        self.last_error = None
+        self.preload = 'background'
+        self.watch_interval = 0
+        self._bundle = None
+        self._lock = threading.Lock()
+        self._watcher = None
+        self._watched_mtimes = None
+
+    def init_app(self, app):
+        def resolve(path):
+            return path if os.path.isabs(path) else os.path.join(app.root_path, path)
+
+        config = app.config
+        self.paths = tuple(resolve(config.get(key, default)) for key, default in (
+            ('MODEL_PATH', self.paths[0]),
+            ('VECTORIZER_PATH', self.paths[1]),
+            ('ENCODER_PATH', self.paths[2]),
+        ))
+        self.mmap_mode = config.get('MODEL_MMAP_MODE', self.mmap_mode)
+        self.compiled = config.get('MODEL_COMPILED', self.compiled)
+        self.compiled_path = resolve(config.get('MODEL_COMPILED_PATH', self.compiled_path))
+        self.preload = config.get('MODEL_PRELOAD', self.preload)
+        self.watch_interval = config.get('MODEL_WATCH_INTERVAL', self.watch_interval)
+
+    def start(self):
+        """Preload the model and watch its files, as configured, in this process"""
+        if self.preload == 'eager':
+            # Load before workers fork so they share the pages copy-on-write
+            self.available()
+        elif self.preload == 'background':
+            self.warm_up()
+        if self.watch_interval:
+            self.watch(self.watch_interval)
+
+    @property
+    def version(self):
+        bundle = self._bundle
+        return bundle.version if bundle else None
+
+    def get(self):
+        """Return the current bundle, loading it on first use"""
+        bundle = self._bundle
+        if bundle is not None:
+            return bundle
+        with self._lock:
+            if self._bundle is None:
+                self._bundle = self._load(self.paths)
+            return self._bundle
+
+    def available(self):
+        try:
+            self.get()
+            return True
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"❌ Error loading model: {e}")
+            return False
+
+    def classify(self, texts):
+        """Classify a list of complaint texts with one vectorize and one predict call"""
+        return self.get().classify(texts)
+
+    def confidence(self, texts):
+        return self.get().confidence(texts)
+
+    def warm_up(self):
+        threading.Thread(target=self.available, name='model-warm-up', daemon=True).start()
+
+    def reload(self):
+        """Load the model triple from the configured paths and atomically swap it in; returns the new version"""
+        bundle = self._load(self.paths)
+        with self._lock:
+            self._bundle = bundle
+            self._watched_mtimes = self._mtimes()
+        print(f"✅ Model {bundle.version} swapped in")
+        return bundle.version
+
+    def status(self):
+        bundle = self._bundle
+        return {
+            'loaded': bundle is not None,
+            'version': bundle.version if bundle else None,
+            'loaded_at': bundle.loaded_at if bundle else None,
+            'compiled': bool(bundle and bundle.compiled),
+            'classes': [str(c) for c in bundle.encoder.classes_] if bundle else [],
+            'paths': list(bundle.paths if bundle else self.paths),
+            'last_error': self.last_error
+        }
+
+    def watch(self, interval):
+        """Reload automatically when the model files on disk change"""
+        if self._watcher is not None:
+            return
+        self._watched_mtimes = self._mtimes()
+        self._watcher = threading.Thread(
+            target=self._watch_loop, args=(interval,), name='model-watcher', daemon=True
+        )
+        self._watcher.start()
+
+    def _watch_loop(self, interval):
+        while True:
+            time.sleep(interval)
+            mtimes = self._mtimes()
+            if mtimes == self._watched_mtimes:
+                continue
+            # Wait one more interval so a file still being copied is complete
+            time.sleep(interval)
+            if self._mtimes() != mtimes:
+                continue
+            try:
+                self.reload()
+            except Exception as e:
+                self.last_error = str(e)
+                self._watched_mtimes = mtimes
+                print(f"❌ Model reload failed, keeping version {self.version}: {e}")
+
+    def _mtimes(self):
+        return tuple(os.path.getmtime(p) if os.path.exists(p) else None for p in self.paths)
+
+    def _load(self, paths):
+        for path in paths:
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"Model file not found: {path}")
+
+        digest = hashlib.sha256()
+        for path in paths:
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(chunk)
+
+        model_path, vectorizer_path, encoder_path = paths
+        bundle = ModelBundle(
+            model=joblib.load(model_path, mmap_mode=self.mmap_mode),
+            vectorizer=joblib.load(vectorizer_path, mmap_mode=self.mmap_mode),
+            encoder=joblib.load(encoder_path, mmap_mode=self.mmap_mode),
+            version=digest.hexdigest()[:12],
+            paths=paths
+        )
+
+        if self.compiled:
+            bundle.compiled = self._compile(bundle)
+
+        # Refuse a triple that cannot classify before it ever serves traffic
+        bundle.classify(["model registry smoke test"])
+        self.last_error = None
+        print(f"✅ ML models loaded (version {bundle.version}), classes: {bundle.encoder.classes_}")
+        return bundle
+
+    def _compile(self, bundle):
+        """Fast path from the exported artifact if present, else built from the triple.
+
+        Either is kept only if it scores exactly like sklearn; a stale
+        artifact falls through to a fresh build, and any failure leaves
+        the bundle on sklearn rather than failing the load.
+        """
+        builders = []
+        if self.compiled_path and os.path.exists(self.compiled_path):
+            builders.append((self.compiled_path, lambda: CompiledModel.load(self.compiled_path)))
+        builders.append(('the loaded model',
+                         lambda: CompiledModel.from_sklearn(bundle.model, bundle.vectorizer, bundle.encoder)))
+        try:
+            texts = VERIFY_TEXTS + [' '.join(list(bundle.vectorizer.vocabulary_)[:500])]
+            expected = bundle.model.decision_function(bundle.vectorizer.transform(texts))
+            labels = tuple(str(label) for label in bundle.encoder.inverse_transform(bundle.model.classes_))
+        except Exception as e:
+            print(f"⚠️ Compiled model disabled, using sklearn: {e}")
+            return None
+
+        for source, build in builders:
+            try:
+                compiled = build()
+                if compiled.labels != labels:
+                    raise ValueError('labels differ from the encoder')
+                if not np.array_equal(compiled.decision_function(texts), expected):
+                    raise ValueError('scores differ from sklearn')
+                return compiled
+            except Exception as e:
+                print(f"⚠️ Compiled model from {source} not used: {e}")
+        print("⚠️ Compiled model disabled, using sklearn")
+        return None
+
+
+# Shared instance used by the complaint routes; configured in create_app()
+model_registry = ModelRegistry()
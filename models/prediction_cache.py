@@ -0,0 +1,107 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+class PredictionCache:
+    """Size-bounded LRU cache of predictions with a per-entry TTL.
+
+    Keys are a hash of the complaint text after case and whitespace folding,
+    so templated or resubmitted complaints reuse an earlier prediction.
+    Entries belong to one model version: looking up with a different version
+    drops everything cached for the old model.
+    """
+
+    def __init__(self, max_size=10000, ttl=3600):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def configure(self, max_size=None, ttl=None):
+        with self._lock:
+            if max_size is not None:
+                self.max_size = max_size
+            if ttl is not None:
+                self.ttl = ttl
+            self._entries.clear()
+
+    @property
+    def enabled(self):
+        return self.max_size > 0
+
+    @staticmethod
+    def normalize(text):
+        # lower() like the TF-IDF vectorizer: casefold() would merge texts
+        # (e.g. "ß" and "ss") that the model scores differently
+        return ' '.join(text.lower().split())
+
+    def key(self, text):
+        return hashlib.blake2b(self.normalize(text).encode('utf-8'), digest_size=16).digest()
+
+    def get(self, text, version):
+        if not self.enabled or version is None:
+            return None
+
+        key = self.key(text)
+        with self._lock:
+            if version != self._version:
+                self._invalidate(version)
+
+            entry = self._entries.get(key)
+            if entry is None or (self.ttl and entry[1] < time.monotonic()):
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, text, version, value):
+        if not self.enabled or version is None:
+            return
+
+        key = self.key(text)
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            # A prediction made by a model that has since been swapped out is dropped
+            if version != self._version:
+                return
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._invalidate(self._version)
+
+    def _invalidate(self, version):
+        if self._entries:
+            self.invalidations += 1
+        self._entries.clear()
+        self._version = version
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl,
+                'model_version': self._version,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
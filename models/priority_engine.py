@@ -0,0 +1,57 @@
+import re
+
+class PriorityEngine:
+    """Keyword and category based priority scoring for batches of complaints.
+
+    All keyword rules are compiled into a single regex alternation, so each
+    complaint is scanned once regardless of how many keywords there are.
+    Matching keeps the original substring semantics ('failed' also matches
+    'failedpayment'). A complaint is High if any keyword matches or its
+    predicted category is a high-priority one; with a confidence threshold
+    set, the category rule only applies to confident predictions.
+    """
+
+    HIGH_KEYWORDS = (
+        'urgent', 'emergency', 'critical', 'immediately',
+        'not working', 'broken', 'failed', 'outage',
+    )
+    HIGH_CATEGORIES = ('Billing', 'Technical')
+
+    def __init__(self, keywords=HIGH_KEYWORDS, categories=HIGH_CATEGORIES, min_confidence=0.0):
+        self.min_confidence = min_confidence
+        self.configure(keywords, categories)
+
+    def init_app(self, app):
+        config = app.config
+        self.min_confidence = config.get('PRIORITY_MIN_CONFIDENCE', self.min_confidence)
+        self.configure(
+            config.get('PRIORITY_HIGH_KEYWORDS') or self.keywords,
+            config.get('PRIORITY_HIGH_CATEGORIES') or self.categories
+        )
+
+    def configure(self, keywords, categories):
+        self.keywords = tuple(keywords)
+        self.categories = frozenset(categories)
+        # Longest first so overlapping keywords resolve the same way every time
+        alternation = '|'.join(re.escape(k.lower()) for k in sorted(self.keywords, key=len, reverse=True))
+        self._pattern = re.compile(alternation) if alternation else None
+
+    @property
+    def uses_confidence(self):
+        return self.min_confidence > 0
+
+    def score(self, texts, categories, confidences=None):
+        """Return a priority for each (text, category[, confidence])"""
+        if confidences is None:
+            confidences = [1.0] * len(texts)
+        search = self._pattern.search if self._pattern else (lambda text: None)
+        return [
+            'High' if (search(text.lower())
+                       or (category in self.categories and confidence >= self.min_confidence))
+            else 'Medium'
+            for text, category, confidence in zip(texts, categories, confidences)
+        ]
+
+
+# Shared engine; configured in create_app()
+priority_engine = PriorityEngine()
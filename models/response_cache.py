@@ -0,0 +1,89 @@
+import functools
+import hashlib
+import threading
+import time
+
+from flask import request, make_response
+
+class ResponseCache:
+    """Short-TTL cache for read-heavy JSON endpoints with ETag support.
+
+    Cached bodies are dropped whenever the database reports a committed
+    write, and otherwise expire after ``ttl`` seconds (which bounds
+    staleness across worker processes). Responses carry an ETag so a
+    client polling an unchanged dashboard gets a body-less 304.
+    """
+
+    def __init__(self, ttl=5):
+        self.ttl = ttl
+        self._entries = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app, db):
+        self.ttl = app.config.get('RESPONSE_CACHE_TTL', self.ttl)
+        db.add_write_listener(self.invalidate)
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def cached(self, key):
+        """Decorator caching a view's 200 response body under key"""
+        def decorator(view):
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                generation = self._generation
+                entry = self._get(key)
+                if entry is None:
+                    response = make_response(view(*args, **kwargs))
+                    if response.status_code != 200:
+                        return response
+                    body = response.get_data()
+                    entry = (body, hashlib.sha1(body).hexdigest(), response.mimetype)
+                    self._set(key, entry, generation)
+
+                body, etag, mimetype = entry
+                if request.if_none_match.contains(etag):
+                    response = make_response('', 304)
+                else:
+                    response = make_response(body)
+                    response.mimetype = mimetype
+                response.set_etag(etag)
+                response.cache_control.no_cache = True
+                return response
+            return wrapper
+        return decorator
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[1]
+
+    def _set(self, key, value, generation):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            # Skip bodies computed from data that a concurrent write has changed
+            if generation == self._generation:
+                self._entries[key] = (time.monotonic() + self.ttl, value)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'ttl_seconds': self.ttl,
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+# Shared instance for the dashboard endpoints; configured in create_app()
+response_cache = ResponseCache()
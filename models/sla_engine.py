@@ -0,0 +1,177 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+class SLAEngine:
+    """Scheduled, set-based SLA escalation.
+
+    Each run escalates every overdue Pending/Assigned complaint with a single
+    UPDATE ... RETURNING. The response window for a complaint is the
+    strictest of its priority and category overrides, falling back to the
+    default. The time of the last run is kept in system_state as a
+    high-water mark, so a run only looks at complaints that crossed their
+    deadline since then; full sweeps (the first run, or on request) pick up
+    anything that changed status or priority behind the mark.
+    """
+
+    STATE_KEY = 'sla_last_run'
+    TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+    def __init__(self, default_hours=24, priority_hours=None, category_hours=None):
+        self.default_hours = default_hours
+        self.priority_hours = dict(priority_hours or {})
+        self.category_hours = dict(category_hours or {})
+        self.manager_email = None
+        self.check_interval = 0
+        self.db = None
+        self.email_service = None
+        self.events = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app, db, email_service, events=None):
+        config = app.config
+        self.db = db
+        self.email_service = email_service
+        self.events = events
+        self.default_hours = config.get('SLA_DEFAULT_HOURS', self.default_hours)
+        self.priority_hours = dict(config.get('SLA_PRIORITY_HOURS') or self.priority_hours)
+        self.category_hours = dict(config.get('SLA_CATEGORY_HOURS') or self.category_hours)
+        self.manager_email = config.get('SLA_MANAGER_EMAIL')
+        self.check_interval = config.get('SLA_CHECK_INTERVAL', self.check_interval)
+
+    def start(self):
+        """Schedule the periodic sweep in this process, if one is configured"""
+        if self.db is not None and self.check_interval:
+            self.schedule(self.check_interval)
+
+    def schedule(self, interval):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._loop, args=(interval,), name='sla-engine', daemon=True
+        )
+        self._thread.start()
+
+    def _loop(self, interval):
+        while True:
+            time.sleep(interval)
+            try:
+                self.run()
+            except Exception as e:
+                print(f"❌ SLA run failed: {e}")
+
+    def _sla_hours_sql(self):
+        """SQL for a row's SLA window in hours, with its parameters"""
+        def case(column, overrides):
+            if not overrides:
+                return 'NULL', []
+            sql = f"(CASE {column} {' '.join('WHEN ? THEN ?' for _ in overrides)} END)"
+            return sql, [value for item in overrides.items() for value in item]
+
+        priority_sql, priority_params = case('priority', self.priority_hours)
+        category_sql, category_params = case('predicted_category', self.category_hours)
+        # SQLite's two-argument MIN() is NULL if either side is, hence the COALESCE chain
+        sql = f'COALESCE(MIN({priority_sql}, {category_sql}), {priority_sql}, {category_sql}, ?)'
+        params = priority_params + category_params + priority_params + category_params
+        return sql, params + [self.default_hours]
+
+    def run(self, full=False):
+        """Escalate newly overdue complaints; returns the escalated rows"""
+        with self._lock:
+            now = datetime.now()
+            now_text = now.strftime(self.TIME_FORMAT)
+            last_run = None if full else self._last_run()
+
+            all_hours = [self.default_hours] + list(self.priority_hours.values()) + list(self.category_hours.values())
+            min_hours, max_hours = min(all_hours), max(all_hours)
+
+            conditions = [
+                "resolution_status IN ('Pending', 'Assigned')",
+                # Index range first: nothing younger than the tightest window is overdue
+                'timestamp < ?',
+            ]
+            params = [(now - timedelta(hours=min_hours)).strftime(self.TIME_FORMAT)]
+
+            if last_run:
+                # ...and nothing older than last run minus the loosest window is new
+                conditions.append('timestamp >= ?')
+                params.append((last_run - timedelta(hours=max_hours)).strftime(self.TIME_FORMAT))
+
+            hours_sql, hours_params = self._sla_hours_sql()
+            conditions.append(f"timestamp < datetime(?, '-' || CAST({hours_sql} * 3600 AS INTEGER) || ' seconds')")
+            params += [now_text] + hours_params
+            if last_run:
+                conditions.append(f"timestamp >= datetime(?, '-' || CAST({hours_sql} * 3600 AS INTEGER) || ' seconds')")
+                params += [last_run.strftime(self.TIME_FORMAT)] + hours_params
+
+            # The escalations, the watermark and their events commit together
+            with self.db.transaction() as tx:
+                escalated = tx.execute_returning(f'''
+                    UPDATE complaints
+                    SET resolution_status = 'Escalated', sla_breached = TRUE, escalated_at = ?
+                    WHERE {' AND '.join(conditions)}
+                    RETURNING id, predicted_category, timestamp, priority
+                ''', [now_text] + params)
+
+                tx.execute_query('''
+                    INSERT INTO system_state (key, value, updated_at) VALUES (?, ?, ?)
+                    ON CONFLICT (key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at
+                ''', (self.STATE_KEY, now_text, now_text))
+
+                if escalated:
+                    self._publish(escalated, now_text, tx)
+
+            if escalated:
+                print(f"⚠️ SLA Breach: {len(escalated)} complaints escalated")
+                self._notify(escalated)
+            return escalated
+
+    def _last_run(self):
+        row = self.db.fetch_one('SELECT value FROM system_state WHERE key = ?', (self.STATE_KEY,))
+        return datetime.strptime(row[0], self.TIME_FORMAT) if row else None
+
+    def _publish(self, escalated, escalated_at, tx=None):
+        if self.events is None:
+            return
+        # The previous status (Pending or Assigned) is not returned, so
+        # listeners get the new state only
+        self.events.publish_many('escalated', [
+            (complaint_id, {
+                'id': complaint_id, 'predicted_category': category, 'timestamp': timestamp,
+                'priority': priority, 'resolution_status': 'Escalated', 'sla_breached': True,
+                'escalated_at': escalated_at,
+            }, None)
+            for complaint_id, category, timestamp, priority in escalated
+        ], tx)
+
+    def _notify(self, escalated):
+        if not (self.email_service and self.manager_email):
+            return
+        details = [{
+            'id': complaint_id,
+            'category': category,
+            'timestamp': timestamp,
+            'status': 'Escalated',
+            'sla_hours': self.hours_for(category, priority)
+        } for complaint_id, category, timestamp, priority in escalated]
+        self.email_service.send_sla_escalation_emails(self.manager_email, details)
+
+    def hours_for(self, category, priority):
+        overrides = [h for h in (self.priority_hours.get(priority), self.category_hours.get(category))
+                     if h is not None]
+        return min(overrides) if overrides else self.default_hours
+
+    def status(self):
+        last_run = self._last_run()
+        return {
+            'default_hours': self.default_hours,
+            'priority_hours': self.priority_hours,
+            'category_hours': self.category_hours,
+            'last_run': last_run.strftime(self.TIME_FORMAT) if last_run else None,
+            'scheduled': self._thread is not None
+        }
+
+
+# Shared engine; configured in create_app(), scheduled by start_background_services()
+sla_engine = SLAEngine()
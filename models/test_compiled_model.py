@@ -0,0 +1,50 @@
+import os
+import random
+import tempfile
+
+import joblib
+import numpy as np
+
+from models.compiled_model import CompiledModel
+
+def _corpus(vectorizer, size=2000, seed=0):
+    # Real-looking complaints plus random vocabulary soups, edge cases and
+    # out-of-vocabulary text
+    texts = [
+        "I have issues with my billing statement",
+        "My credit card was charged twice and the bank will not refund it",
+        "URGENT!!! my mortgage payment failed, account not working",
+        "Überweisung naïve café ÉCOLE",
+        "zzzz qqqq",
+        "",
+        "credit credit credit CARD card",
+    ]
+    vocabulary = list(vectorizer.vocabulary_)
+    rng = random.Random(seed)
+    texts += [' '.join(rng.choices(vocabulary, k=rng.randint(1, 300))) for _ in range(size)]
+    return texts
+
+def test_compiled_model():
+    model = joblib.load('customer_classification_model_lr.pkl')
+    tfidf_vect = joblib.load('tfidf_vectorizer.pkl')
+    encoder = joblib.load('label_encoder.pkl')
+    compiled = CompiledModel.from_sklearn(model, tfidf_vect, encoder)
+
+    texts = _corpus(tfidf_vect)
+    expected_scores = model.decision_function(tfidf_vect.transform(texts))
+    expected_labels = list(encoder.inverse_transform(model.predict(tfidf_vect.transform(texts))))
+
+    assert np.array_equal(compiled.decision_function(texts), expected_scores), "scores differ from sklearn"
+    assert compiled.classify(texts) == expected_labels, "labels differ from sklearn"
+    print(f"✓ Compiled model matches sklearn bit for bit on {len(texts)} texts")
+
+    # The exported file must score identically after a round trip
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'compiled_model.npz')
+        compiled.save(path)
+        reloaded = CompiledModel.load(path)
+    assert np.array_equal(reloaded.decision_function(texts), expected_scores), "saved model differs"
+    print("✓ Saved compiled model round-trips")
+
+if __name__ == "__main__":
+    test_compiled_model()
@@ -0,0 +1,135 @@
+import os
+import tempfile
+
+import pytest
+
+from config import Config
+from models.database import db
+
+@pytest.fixture
+def client(monkeypatch):
+    """A test client on a fresh database, with no background threads"""
+    with tempfile.TemporaryDirectory() as directory:
+        for name, value in (('DATABASE_PATH', os.path.join(directory, 'api.db')), ('SLA_CHECK_INTERVAL', 0),
+                            ('EMAIL_WORKERS', 0), ('ARCHIVE_INTERVAL', 0), ('MODEL_PRELOAD', 'lazy')):
+            monkeypatch.setattr(Config, name, value)
+        from app import create_app
+        app = create_app()
+        yield app.test_client()
+        db.close_all()
+
+def _insert(rows):
+    return db.insert_many('''
+        INSERT INTO complaints (complaint_text, predicted_category, timestamp, resolution_status)
+        VALUES (?, ?, ?, ?)
+    ''', rows)
+
+def _pages(client, query):
+    """Every page of /api/complaints, following next_cursor"""
+    pages, cursor = [], None
+    while True:
+        url = f'/api/complaints?{query}' + (f'&cursor={cursor}' if cursor else '')
+        body = client.get(url).get_json()
+        pages.append([c['id'] for c in body['complaints']])
+        cursor = body['next_cursor']
+        assert body['has_more'] == (cursor is not None)
+        if cursor is None:
+            return pages
+
+def test_pages_through_equal_timestamps(client):
+    # A burst stored in the same second, between older and newer complaints
+    _insert([('older', 'Mortgage', '2024-05-01 08:00:00', 'Pending')])
+    burst = _insert([(f'burst {i}', 'Credit card', '2024-05-01 09:00:00', 'Pending' if i % 2 else 'Assigned')
+                     for i in range(7)])
+    _insert([('newer', 'Mortgage', '2024-05-01 10:00:00', 'Pending')])
+    expected = [row[0] for row in db.fetch_all('SELECT id FROM complaints ORDER BY timestamp DESC, id DESC')]
+
+    for limit in (1, 2, 3, 4, 9, 50):
+        pages = _pages(client, f'limit={limit}&fields=id')
+        ids = [complaint_id for page in pages for complaint_id in page]
+        assert ids == expected, limit
+        assert all(len(page) == limit for page in pages[:-1])
+
+    # Filters combine with the cursor the same way
+    pending = [row[0] for row in db.fetch_all('''
+        SELECT id FROM complaints WHERE resolution_status = 'Pending' ORDER BY timestamp DESC, id DESC
+    ''')]
+    ids = [i for page in _pages(client, 'limit=2&status=Pending&fields=id') for i in page]
+    assert ids == pending
+    assert set(burst) & set(ids)
+
+def test_cursor_is_opaque_and_validated(client):
+    _insert([(f'c {i}', 'Credit card', '2024-05-01 09:00:00', 'Pending') for i in range(3)])
+    body = client.get('/api/complaints?limit=1').get_json()
+    # Only timestamp and id are needed to continue, whatever fields were asked for
+    assert body['next_cursor']
+    assert set(body['complaints'][0]) > {'id', 'timestamp'}
+    narrow = client.get('/api/complaints?limit=1&fields=priority').get_json()
+    assert narrow['next_cursor'] == body['next_cursor']
+
+    for cursor in ('not-base64!', 'bm90IGpzb24=', 'WzFd', 'WyJ4IiwgInkiXQ=='):
+        response = client.get(f'/api/complaints?cursor={cursor}')
+        assert response.status_code == 400, cursor
+        assert response.get_json() == {'success': False, 'error': 'Invalid cursor'}
+
+def _search(client, query):
+    response = client.get(f'/api/complaints/search?{query}')
+    return response.status_code, response.get_json()
+
+def _hits(client, q):
+    status, body = _search(client, f'q={q}&fields=id')
+    assert status == 200, body
+    return [hit['id'] for hit in body['complaints']]
+
+def test_search_follows_complaint_and_note_writes(client):
+    refund, router = _insert([('The bank refused my refund for a duplicate charge', 'Credit card',
+                               '2024-05-01 09:00:00', 'Pending'),
+                              ('Broadband router keeps dropping', 'Other', '2024-05-01 10:00:00', 'Pending')])
+    # Insert: stemmed, accent-folded and prefix matches
+    assert _hits(client, 'refunds') == [refund]
+    assert _hits(client, 'refu') == [refund]
+    assert _hits(client, 'RÉFUND duplicate') == [refund]
+
+    _, body = _search(client, 'q=refund')
+    assert '<mark>refund</mark>' in body['complaints'][0]['snippet']
+    assert body['complaints'][0]['note_snippet'] is None
+
+    # Update of the complaint text
+    db.execute_query("UPDATE complaints SET complaint_text = 'Mortgage escrow was miscalculated' WHERE id = ?",
+                     (refund,))
+    assert _hits(client, 'refund') == []
+    assert _hits(client, 'escrow') == [refund]
+
+    # Case notes are searchable with their complaint, and follow edits and deletes
+    note = db.execute_query('''
+        INSERT INTO case_notes (complaint_id, user_id, note_text, created_at)
+        VALUES (?, 1, 'Customer sent <b>statements</b> by fax', '2024-05-02 09:00:00')
+    ''', (router,))
+    _, body = _search(client, 'q=fax')
+    assert [hit['id'] for hit in body['complaints']] == [router]
+    assert body['complaints'][0]['note_snippet'] == 'Customer sent &lt;b&gt;statements&lt;/b&gt; by <mark>fax</mark>'
+    db.execute_query("UPDATE case_notes SET note_text = 'Called back' WHERE id = ?", (note,))
+    assert _hits(client, 'fax') == []
+    assert _hits(client, 'called') == [router]
+    db.execute_query('DELETE FROM case_notes WHERE id = ?', (note,))
+    assert _hits(client, 'called') == []
+
+    # Delete
+    db.execute_query('DELETE FROM complaints WHERE id = ?', (router,))
+    assert _hits(client, 'router') == []
+    assert db.fetch_one('SELECT COUNT(*) FROM complaint_search')[0] == 1
+
+def test_search_rejects_bad_queries(client):
+    _insert([('Late fee charged twice', 'Credit card', '2024-05-01 09:00:00', 'Pending')])
+    # Free text is quoted, so FTS syntax in it is searched for as words
+    assert _hits(client, 'fee OR (') == []
+    assert _hits(client, 'charged "twice') != []
+
+    for query in ('q=', 'q=%21%21%21', 'q=fee%20AND%20(&syntax=fts', 'q=%22unterminated&syntax=fts',
+                  'q=nosuchcolumn%3Afee&syntax=fts', 'q=fee&limit=abc'):
+        status, body = _search(client, query)
+        assert status == 400, query
+        assert body['success'] is False
+
+    status, body = _search(client, 'q=fee%20OR%20nothing&syntax=fts')
+    assert status == 200 and len(body['complaints']) == 1
@@ -0,0 +1,111 @@
+import os
+import tempfile
+from datetime import datetime
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from models.database import Database
+from models.duplicate_index import DuplicateIndex
+
+OUTAGE = "No internet connection since this morning, the whole street has an outage"
+CORPUS = [
+    OUTAGE,
+    "I was charged twice on my credit card statement this month",
+    "The mortgage payment failed and my account is locked",
+    "Debt collector keeps calling me at work about a paid loan",
+]
+
+class Bundle:
+    def __init__(self, version, corpus):
+        self.version = version
+        self.vectorizer = TfidfVectorizer().fit(corpus)
+        self.on_vectorize = None
+
+    def vectorize(self, texts):
+        vectors = self.vectorizer.transform(texts)
+        if self.on_vectorize:
+            self.on_vectorize()
+        return vectors
+
+class Registry:
+    """Stands in for ModelRegistry: a swappable bundle with a version"""
+
+    def __init__(self, bundle):
+        self.bundle = bundle
+
+    @property
+    def version(self):
+        return self.bundle.version
+
+    def get(self):
+        return self.bundle
+
+def _index(directory, registry):
+    db = Database(os.path.join(directory, 'duplicates.db'))
+    db.init_db()
+    index = DuplicateIndex(threshold=0.9, refresh_interval=3600)
+    index.db, index.registry, index.auto_link = db, registry, True
+    return index
+
+def _store(index, text):
+    """Store a complaint the way /predict does and return (id, match)"""
+    match, vector = index.lookup(text)
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    complaint_id = index.db.execute_query('''
+        INSERT INTO complaints (complaint_text, predicted_category, timestamp, duplicate_of)
+        VALUES (?, 'Internet', ?, ?)
+    ''', (text, timestamp, match['complaint_id'] if match else None))
+    index.add(complaint_id, vector, match['complaint_id'] if match else None, timestamp)
+    return complaint_id, match
+
+def test_repeat_right_after_first():
+    with tempfile.TemporaryDirectory() as directory:
+        index = _index(directory, Registry(Bundle('v1', CORPUS)))
+        first, match = _store(index, OUTAGE)
+        assert match is None
+        # Well inside the refresh interval: found through add(), not the database
+        second, match = _store(index, OUTAGE)
+        assert match['complaint_id'] == first
+        # A repeat of the repeat still points at the original
+        _, match = _store(index, OUTAGE)
+        assert match['complaint_id'] == first
+
+def test_ties_go_to_the_oldest_case():
+    with tempfile.TemporaryDirectory() as directory:
+        index = _index(directory, Registry(Bundle('v1', CORPUS)))
+        index.auto_link = False
+        first, _ = _store(index, OUTAGE)
+        _store(index, OUTAGE)
+        _store(index, OUTAGE)
+        match, _ = index.lookup(OUTAGE)
+        assert match['complaint_id'] == first
+
+def test_repeats_within_a_batch():
+    with tempfile.TemporaryDirectory() as directory:
+        index = _index(directory, Registry(Bundle('v1', CORPUS)))
+        texts = [OUTAGE, CORPUS[1], OUTAGE, OUTAGE]
+        matches, _ = index.lookup_many(texts)
+        assert matches[0] is None and matches[1] is None
+        assert matches[2]['batch_row'] == 0 and matches[3]['batch_row'] == 0
+
+        complaint_ids = [11, 12, 13, 14]
+        resolved = index.resolve_batch(matches, complaint_ids)
+        assert [m and m['complaint_id'] for m in resolved] == [None, None, 11, 11]
+
+def test_model_swap_during_lookup():
+    with tempfile.TemporaryDirectory() as directory:
+        old = Bundle('v1', CORPUS)
+        new = Bundle('v2', CORPUS + ["A new vocabulary word: broadband router firmware"])
+        registry = Registry(old)
+        index = _index(directory, registry)
+        first, _ = _store(index, OUTAGE)
+
+        def swap():
+            old.on_vectorize = None
+            registry.bundle = new
+        old.on_vectorize = swap
+
+        # Vectorized with the old model, scored after the swap: looked up again
+        match, (version, vector) = index.lookup(OUTAGE)
+        assert version == 'v2' and vector.shape[1] == len(new.vectorizer.vocabulary_)
+        assert match['complaint_id'] == first
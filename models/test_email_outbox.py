@@ -0,0 +1,124 @@
+import os
+import smtplib
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from models.database import Database
+from models.email_outbox import EmailOutbox
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+class FlakySender:
+    """Stands in for EmailService's SMTP side: the first ``failures`` deliveries raise"""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.delivered = []
+        self.connections = 0
+
+    def open_connection(self):
+        self.connections += 1
+        return self
+
+    def deliver(self, server, to_email, subject, body):
+        if self.failures:
+            self.failures -= 1
+            raise smtplib.SMTPServerDisconnected('connection dropped')
+        self.delivered.append(to_email)
+
+    def quit(self):
+        pass
+
+def _outbox(directory, sender, **kwargs):
+    db = Database(os.path.join(directory, 'outbox.db'))
+    db.init_db()
+    outbox = EmailOutbox(workers=0, **kwargs)
+    outbox.db, outbox.sender = db, sender
+    return outbox
+
+def _row(outbox, message_id=1):
+    return outbox.db.fetch_one('''
+        SELECT status, attempts, next_attempt_at, last_error FROM email_outbox WHERE id = ?
+    ''', (message_id,))
+
+def _make_due(outbox, message_id=1):
+    outbox.db.execute_query('UPDATE email_outbox SET next_attempt_at = ? WHERE id = ?',
+                            ((datetime.now() - timedelta(seconds=1)).strftime(TIME_FORMAT), message_id))
+
+def _delay(row):
+    return (datetime.strptime(row[2], TIME_FORMAT) - datetime.now()).total_seconds()
+
+def test_retry_with_backoff():
+    with tempfile.TemporaryDirectory() as directory:
+        # Each delivery reconnects once, so two failures cost one attempt
+        sender = FlakySender(failures=4)
+        outbox = _outbox(directory, sender, backoff_seconds=30, max_attempts=5)
+        outbox.enqueue('citizen@example.com', 'Complaint received', 'Thank you')
+
+        outbox._send_batch(None, outbox._claim())
+        status, attempts, _, error = row = _row(outbox)
+        assert (status, attempts) == ('pending', 1)
+        assert 'connection dropped' in error
+        assert 28 <= _delay(row) <= 31
+        # Not due again until the backoff has passed
+        assert outbox._claim() == []
+
+        _make_due(outbox)
+        outbox._send_batch(None, outbox._claim())
+        row = _row(outbox)
+        assert row[:2] == ('pending', 2)
+        assert 58 <= _delay(row) <= 61
+
+        _make_due(outbox)
+        outbox._send_batch(None, outbox._claim())
+        assert _row(outbox)[:2] == ('sent', 3)
+        assert _row(outbox)[3] is None
+        assert sender.delivered == ['citizen@example.com']
+
+def test_gives_up_after_max_attempts():
+    with tempfile.TemporaryDirectory() as directory:
+        outbox = _outbox(directory, FlakySender(failures=100), backoff_seconds=30, max_attempts=2)
+        outbox.enqueue('citizen@example.com', 'Complaint received', 'Thank you')
+        for _ in range(2):
+            _make_due(outbox)
+            outbox._send_batch(None, outbox._claim())
+        assert _row(outbox)[:2] == ('failed', 2)
+        _make_due(outbox)
+        assert outbox._claim() == []
+
+def test_stale_claims_are_reclaimed():
+    with tempfile.TemporaryDirectory() as directory:
+        outbox = _outbox(directory, FlakySender(failures=0), claim_timeout=600)
+        outbox.enqueue('citizen@example.com', 'Complaint received', 'Thank you')
+        assert len(outbox._claim()) == 1
+        # Claimed moments ago: still owned by its worker
+        assert outbox._claim() == []
+
+        stale = (datetime.now() - timedelta(seconds=601)).strftime(TIME_FORMAT)
+        outbox.db.execute_query('UPDATE email_outbox SET claimed_at = ? WHERE id = 1', (stale,))
+        assert [row[0] for row in outbox._claim()] == [1]
+
+def test_worker_survives_bookkeeping_errors():
+    with tempfile.TemporaryDirectory() as directory:
+        sender = FlakySender(failures=0)
+        outbox = _outbox(directory, sender, poll_interval=0.05, claim_timeout=0)
+        mark_sent = outbox._mark_sent
+        calls = []
+
+        def locked_once(message_id):
+            calls.append(message_id)
+            if len(calls) == 1:
+                raise RuntimeError('database is locked')
+            mark_sent(message_id)
+
+        outbox._mark_sent = locked_once
+        outbox.workers = 1
+        outbox.start()
+        outbox.enqueue('citizen@example.com', 'Complaint received', 'Thank you')
+
+        deadline = time.monotonic() + 10
+        while _row(outbox)[0] != 'sent' and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert _row(outbox)[0] == 'sent'
+        assert outbox._threads[0].is_alive()
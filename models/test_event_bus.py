@@ -0,0 +1,42 @@
+import os
+import re
+import tempfile
+
+from models.database import Database
+from models.event_bus import EventBus
+
+def _bus(db):
+    bus = EventBus(poll_interval=0.5, keepalive=5)
+    bus.db = db
+    return bus
+
+def _ids(stream, count):
+    """Read from an SSE stream until count event ids have arrived"""
+    ids = []
+    while len(ids) < count:
+        ids += [int(i) for i in re.findall(r'^id: (\d+)$', next(stream), re.M)]
+    return ids
+
+def test_events_from_every_process_arrive_in_order():
+    with tempfile.TemporaryDirectory() as directory:
+        db = Database(os.path.join(directory, 'events.db'))
+        db.init_db()
+        local, other = _bus(db), _bus(db)
+
+        stream = local.stream()
+        next(stream)
+        # Another worker commits first; this one's own event must not overtake it
+        first = other.publish('created', 1, {'id': 1})
+        second = local.publish('created', 2, {'id': 2})
+        with db.transaction() as tx:
+            third = local.publish('status', 1, {'id': 1}, tx=tx)
+        assert _ids(stream, 3) == [first, second, third]
+
+        # A reconnect resumes after the last id it was sent, without gaps or repeats
+        resumed = local.stream(last_event_id=first)
+        assert _ids(resumed, 2) == [second, third]
+        fourth = other.publish('deleted', 2, None, {'id': 2})
+        assert _ids(resumed, 1) == [fourth]
+        assert _ids(stream, 1) == [fourth]
+        stream.close()
+        resumed.close()
@@ -0,0 +1,84 @@
+import os
+import tempfile
+
+from models.database import Database
+
+# What the dashboard rollups must hold, computed straight from complaints
+EXPECTED = '''
+    SELECT {day} predicted_category, COALESCE(resolution_status, ''),
+           COALESCE(assigned_department_id, 0),
+           COUNT(*),
+           SUM(CASE WHEN forwarded THEN 1 ELSE 0 END),
+           SUM(CASE WHEN case_completed THEN 1 ELSE 0 END),
+           SUM(CASE WHEN forwarded AND forwarded_at IS NOT NULL
+               THEN (julianday(forwarded_at) - julianday(timestamp)) * 24 ELSE 0 END),
+           SUM(CASE WHEN forwarded AND forwarded_at IS NOT NULL THEN 1 ELSE 0 END)
+    FROM complaints
+    GROUP BY {group}
+'''
+ROLLUPS = {
+    'complaint_rollup_totals': (EXPECTED.format(day='', group='1, 2, 3'), '''
+        SELECT category, status, department_id, complaint_count, forwarded_count,
+               completed_count, response_hours_sum, response_count
+        FROM complaint_rollup_totals'''),
+    'complaint_rollup_daily': (EXPECTED.format(day='substr(timestamp, 1, 10),', group='1, 2, 3, 4'), '''
+        SELECT day, category, status, department_id, complaint_count, forwarded_count,
+               completed_count, response_hours_sum, response_count
+        FROM complaint_rollup_daily'''),
+}
+
+def _rounded(rows):
+    return sorted(tuple(round(v, 6) if isinstance(v, float) else v for v in row) for row in rows)
+
+def _assert_rollups_match(db):
+    for table, (expected, actual) in ROLLUPS.items():
+        assert _rounded(db.fetch_all(actual)) == _rounded(db.fetch_all(expected)), table
+
+def test_rollups_follow_every_complaint_write():
+    with tempfile.TemporaryDirectory() as directory:
+        db = Database(os.path.join(directory, 'rollups.db'))
+        db.init_db()
+        department = db.execute_query('''
+            INSERT INTO departments (name, email, created_at) VALUES ('Billing', 'b@example.com', '2024-01-01 00:00:00')
+        ''')
+        _assert_rollups_match(db)
+
+        # Insert: single rows and a batch, across days and categories
+        first = db.execute_query('''
+            INSERT INTO complaints (complaint_text, predicted_category, timestamp)
+            VALUES ('charged twice', 'Credit card', '2024-03-01 09:00:00')
+        ''')
+        db.insert_many('''
+            INSERT INTO complaints (complaint_text, predicted_category, timestamp) VALUES (?, ?, ?)
+        ''', [('loan', 'Consumer Loan', '2024-03-01 10:00:00'),
+              ('mortgage', 'Mortgage', '2024-03-02 11:00:00'),
+              ('card again', 'Credit card', '2024-03-02 12:30:00')])
+        _assert_rollups_match(db)
+
+        # Forward: status, department and response time move together
+        db.execute_query('''
+            UPDATE complaints SET forwarded = TRUE, forwarded_at = '2024-03-01 15:30:00',
+                                  assigned_department_id = ?, resolution_status = 'Assigned'
+            WHERE id = ?
+        ''', (department, first))
+        _assert_rollups_match(db)
+
+        # Complete
+        db.execute_query('''
+            UPDATE complaints SET case_completed = TRUE, completed_at = '2024-03-03 08:00:00',
+                                  resolution_status = 'Completed'
+            WHERE id = ?
+        ''', (first,))
+        _assert_rollups_match(db)
+
+        # Columns outside the rollups leave them alone
+        db.execute_query("UPDATE complaints SET priority = 'High' WHERE id = ?", (first,))
+        _assert_rollups_match(db)
+
+        # Delete: emptied groups disappear rather than lingering at zero
+        db.execute_query('DELETE FROM complaints WHERE id = ?', (first,))
+        _assert_rollups_match(db)
+        assert not db.fetch_all("SELECT * FROM complaint_rollup_totals WHERE status = 'Completed'")
+        db.execute_query('DELETE FROM complaints')
+        _assert_rollups_match(db)
+        assert db.fetch_one('SELECT COUNT(*) FROM complaint_rollup_daily')[0] == 0
@@ -1,11 +1,10 @@
 from flask import Blueprint, request, jsonify, session
-from models.database import Database
+from models.database import db
 import hashlib
 import secrets
 from datetime import datetime, timedelta
 
 auth_bp = Blueprint('auth', __name__)
-db = Database()
 
 # User roles
 USER_ROLES = {
@@ -1,54 +1,141 @@
-from flask import Blueprint, request, jsonify, render_template
-import joblib
+from flask import Blueprint, request, jsonify, render_template, current_app
 import sqlite3
-from datetime import datetime
-import os
+from datetime import datetime, timedelta
+import base64
+import binascii
+import csv
+import html
+import io
+import hmac
+import json
+import re
+import time
 
 complaints_bp = Blueprint('complaints', __name__)
 
 # Initialize database and email service
-from models.database import Database
-from models.email_service import EmailService
+from models.archiver import complaint_archiver
+from models.database import db
+from models.department_directory import department_directory
+from models.duplicate_index import duplicate_index
+from models.email_service import email_service
+from models.email_outbox import email_outbox
+from models.event_bus import event_bus
+from models.inference_pool import InferencePool
+from models.inference_scheduler import InferenceScheduler
+from models.metrics import metrics
+from models.model_registry import model_registry
+from models.prediction_cache import PredictionCache
+from models.priority_engine import priority_engine
+from models.sla_engine import sla_engine
 
-db = Database()
-email_service = EmailService()
+# Optional process pool for transform + predict (INFERENCE_BACKEND='process')
+inference_pool = None
+inline_inference_chars = 0
 
-# Load ML model with correct paths
-try:
-    # Get the current directory and parent directory
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    parent_dir = os.path.dirname(current_dir)
-    
-    # Construct correct paths to model files
-    model_path = os.path.join(parent_dir, 'customer_classification_model_lr.pkl')
-    vectorizer_path = os.path.join(parent_dir, 'tfidf_vectorizer.pkl')
-    encoder_path = os.path.join(parent_dir, 'label_encoder.pkl')
-    
-    print(f"Looking for model files in: {parent_dir}")
-    print(f"Model path: {model_path}")
-    print(f"Vectorizer path: {vectorizer_path}")
-    print(f"Encoder path: {encoder_path}")
-    
-    # Check if files exist
-    if not os.path.exists(model_path):
-        raise FileNotFoundError(f"Model file not found: {model_path}")
-    if not os.path.exists(vectorizer_path):
-        raise FileNotFoundError(f"Vectorizer file not found: {vectorizer_path}")
-    if not os.path.exists(encoder_path):
-        raise FileNotFoundError(f"Encoder file not found: {encoder_path}")
-    
-    # Load models
-    model = joblib.load(model_path)
-    tfidf_vect = joblib.load(vectorizer_path)
-    encoder = joblib.load(encoder_path)
-    
-    model_loaded = True
-    print("✅ ML models loaded successfully!")
-    print(f"Model classes: {encoder.classes_}")
-    
-except Exception as e:
-    print(f"❌ Error loading model: {e}")
-    model_loaded = False
+def run_inference(texts):
+    """Classify texts in this thread, or on the process pool when the input is large enough"""
+    started = time.perf_counter()
+    if inference_pool is not None and sum(len(text) for text in texts) >= inline_inference_chars:
+        version = model_registry.version
+        if version != inference_pool.version:
+            # The registry hot-swapped its model; restart the pool on the new files
+            inference_pool.reload(model_registry.paths, version)
+        labels = inference_pool.classify(texts)
+    else:
+        labels = model_registry.classify(texts)
+    metrics.observe_inference(time.perf_counter() - started, len(texts))
+    return labels
+
+# Coalesces concurrent /predict calls into one vectorized model call
+inference_scheduler = InferenceScheduler(run_inference)
+
+# Skips the model entirely for repeated complaint texts
+prediction_cache = PredictionCache()
+
+@complaints_bp.record_once
+def configure_inference(state):
+    config = state.app.config
+    inference_scheduler.configure(
+        max_batch_size=config.get('INFERENCE_MAX_BATCH_SIZE'),
+        max_wait_ms=config.get('INFERENCE_BATCH_WINDOW_MS'),
+        enabled=config.get('INFERENCE_BATCHING')
+    )
+    prediction_cache.configure(
+        max_size=config.get('PREDICTION_CACHE_SIZE'),
+        ttl=config.get('PREDICTION_CACHE_TTL')
+    )
+
+    global inference_pool, inline_inference_chars
+    if config.get('INFERENCE_BACKEND') == 'process':
+        inference_pool = InferencePool(
+            model_registry.paths,
+            workers=config.get('INFERENCE_POOL_WORKERS'),
+            mmap_mode=config.get('MODEL_MMAP_MODE', 'r')
+        )
+        inline_inference_chars = config.get('INFERENCE_INLINE_MAX_CHARS', 2000)
+
+def classify_complaint(text):
+    """Classify one complaint, answering repeats from the prediction cache"""
+    version = model_registry.version
+    label = prediction_cache.get(text, version)
+    if label is None:
+        with metrics.timed('inference'):
+            label = inference_scheduler.predict(text)
+        prediction_cache.set(text, version, label)
+    return label
+
+def classify_complaints(texts):
+    """Classify a batch, sending only cache misses to the model in one call"""
+    version = model_registry.version
+    labels = [prediction_cache.get(text, version) for text in texts]
+    misses = [i for i, label in enumerate(labels) if label is None]
+    if misses:
+        with metrics.timed('inference'):
+            predicted = run_inference([texts[i] for i in misses])
+        for i, label in zip(misses, predicted):
+            labels[i] = label
+            prediction_cache.set(texts[i], version, label)
+    return labels
+
+def score_priorities(texts, labels):
+    """Priority for each classified complaint, scored in one pass"""
+    confidences = model_registry.confidence(texts) if priority_engine.uses_confidence else None
+    return priority_engine.score(texts, labels, confidences)
+
+def _read_batch_payload():
+    """Extract complaint texts from a JSON array, NDJSON body or CSV upload"""
+    def text_of(item):
+        if isinstance(item, dict):
+            item = item.get('complaint') or item.get('complaint_text')
+        return item.strip() if isinstance(item, str) else ''
+
+    if 'file' in request.files or request.mimetype == 'text/csv':
+        if 'file' in request.files:
+            raw = request.files['file'].read().decode('utf-8-sig')
+        else:
+            raw = request.get_data(as_text=True)
+        rows = list(csv.reader(io.StringIO(raw)))
+        if not rows:
+            return []
+        header = [col.strip().lower() for col in rows[0]]
+        for name in ('complaint', 'complaint_text'):
+            if name in header:
+                column = header.index(name)
+                return [row[column].strip() if len(row) > column else '' for row in rows[1:]]
+        # No recognised header: treat the first column of every row as the text
+        return [row[0].strip() if row else '' for row in rows]
+
+    if request.mimetype in ('application/x-ndjson', 'application/jsonlines'):
+        lines = request.get_data(as_text=True).splitlines()
+        return [text_of(json.loads(line)) for line in lines if line.strip()]
+
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get('complaints')
+    if not isinstance(data, list):
+        raise ValueError('Expected a JSON array, NDJSON lines or a CSV file')
+    return [text_of(item) for item in data]
 
 @complaints_bp.route('/')
 def home():
@@ -64,35 +151,45 @@ def predict():
         complaint = request.form['complaint']
         print(f"🔍 Received complaint: {complaint}")
         
-        if not model_loaded:
+        if not model_registry.available():
             error_msg = 'Model not loaded properly'
             print(f"❌ {error_msg}")
             return jsonify({'success': False, 'error': error_msg})
         
-        # Transform and predict
-        X_input = tfidf_vect.transform([complaint])
-        prediction = model.predict(X_input)
-        predicted_label = encoder.inverse_transform(prediction)[0]
+        # Transform and predict (batched with concurrent requests)
+        predicted_label = classify_complaint(complaint)
         
         print(f"✅ Prediction successful: {predicted_label}")
         
+        priority = score_priorities([complaint], [predicted_label])[0]
+        duplicate, vector = duplicate_index.lookup(complaint)
+        duplicate_of = duplicate['complaint_id'] if duplicate and duplicate_index.auto_link else None
+
         # Save to database
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        complaint_id = db.execute_query('''
-            INSERT INTO complaints (complaint_text, predicted_category, timestamp)
-            VALUES (?, ?, ?)
-        ''', (complaint, predicted_label, timestamp))
+        with db.transaction() as tx:
+            complaint_id = tx.execute_query('''
+                INSERT INTO complaints (complaint_text, predicted_category, timestamp,
+                                        priority, priority_scored_at, duplicate_of)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (complaint, predicted_label, timestamp, priority, timestamp, duplicate_of))
+            event_bus.publish('created', complaint_id,
+                              new_complaint_event(complaint_id, predicted_label, timestamp, priority, duplicate_of),
+                              tx=tx)
+        duplicate_index.add(complaint_id, vector, duplicate_of, timestamp)
         
         print(f"✅ Complaint saved to database with ID: {complaint_id}")
-        
-        # Get departments for dropdown
-        departments = db.fetch_all('SELECT id, name FROM departments ORDER BY name')
+        if duplicate:
+            print(f"🔁 Complaint #{complaint_id} looks like a duplicate of #{duplicate['complaint_id']}")
         
         return jsonify({
             'success': True,
             'prediction_text': f"Predicted Category: {predicted_label}",
             'complaint_id': complaint_id,
-            'departments': [{'id': dept[0], 'name': dept[1]} for dept in departments]
+            'priority': priority,
+            'duplicate_of': duplicate,
+            # Departments for the forwarding dropdown
+            'departments': [{'id': dept['id'], 'name': dept['name']} for dept in department_directory.all()]
         })
         
     except Exception as e:
@@ -100,6 +197,106 @@ def predict():
         print(f"❌ {error_msg}")
         return jsonify({'success': False, 'error': error_msg})
 
+@complaints_bp.route('/api/predict_batch', methods=['POST'])
+def predict_batch():
+    """Classify and store a burst of complaints in one vectorized pass"""
+    try:
+        if not model_registry.available():
+            return jsonify({'success': False, 'error': 'Model not loaded properly'})
+
+        complaints = _read_batch_payload()
+        if not complaints:
+            return jsonify({'success': False, 'error': 'No complaints provided'})
+        if not all(complaints):
+            return jsonify({'success': False, 'error': 'Empty complaint text in batch'})
+
+        max_size = current_app.config.get('PREDICT_BATCH_MAX_SIZE', 10000)
+        if len(complaints) > max_size:
+            return jsonify({'success': False, 'error': f'Batch exceeds {max_size} complaints'}), 413
+
+        labels = classify_complaints(complaints)
+        priorities = score_priorities(complaints, labels)
+        duplicates, vectors = duplicate_index.lookup_many(complaints)
+
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with db.transaction() as tx:
+            complaint_ids = tx.insert_many('''
+                INSERT INTO complaints (complaint_text, predicted_category, timestamp,
+                                        priority, priority_scored_at)
+                VALUES (?, ?, ?, ?, ?)
+            ''', [(text, label, timestamp, priority, timestamp)
+                  for text, label, priority in zip(complaints, labels, priorities)])
+            # Repeats of earlier rows in this batch only get an id to point at now
+            duplicates = duplicate_index.resolve_batch(duplicates, complaint_ids)
+            links = [d['complaint_id'] if d and duplicate_index.auto_link else None for d in duplicates]
+            linked = [(link, complaint_id) for complaint_id, link in zip(complaint_ids, links) if link]
+            if linked:
+                tx.execute_many('UPDATE complaints SET duplicate_of = ? WHERE id = ?', linked)
+            event_bus.publish_many('created', [
+                (complaint_id, new_complaint_event(complaint_id, label, timestamp, priority, link), None)
+                for complaint_id, label, priority, link in zip(complaint_ids, labels, priorities, links)
+            ], tx=tx)
+        for complaint_id, vector, link in zip(complaint_ids, vectors, links):
+            duplicate_index.add(complaint_id, vector, link, timestamp)
+
+        print(f"✅ Batch of {len(complaint_ids)} complaints classified and saved")
+
+        return jsonify({
+            'success': True,
+            'count': len(complaint_ids),
+            'results': [
+                {'complaint_id': complaint_id, 'predicted_category': label, 'priority': priority,
+                 'duplicate_of': duplicate}
+                for complaint_id, label, priority, duplicate
+                in zip(complaint_ids, labels, priorities, duplicates)
+            ]
+        })
+    except (ValueError, UnicodeDecodeError, csv.Error) as e:
+        return jsonify({'success': False, 'error': f"Invalid batch payload: {e}"}), 400
+    except Exception as e:
+        error_msg = f"Error during batch prediction: {str(e)}"
+        print(f"❌ {error_msg}")
+        return jsonify({'success': False, 'error': error_msg})
+
+@complaints_bp.route('/api/inference_stats')
+def inference_stats():
+    stats = inference_scheduler.stats()
+    stats['prediction_cache'] = prediction_cache.stats()
+    stats['duplicate_index'] = duplicate_index.stats()
+    stats['backend'] = 'process' if inference_pool is not None else 'thread'
+    if inference_pool is not None:
+        stats['pool_workers'] = inference_pool.workers
+        stats['inline_max_chars'] = inline_inference_chars
+    return jsonify(stats)
+
+@complaints_bp.route('/api/admin/model', methods=['GET'])
+def model_status():
+    return jsonify(model_registry.status())
+
+@complaints_bp.route('/api/admin/reload_model', methods=['POST'])
+def reload_model():
+    """Hot-swap the retrained model triple at the configured paths without restarting the workers"""
+    admin_token = current_app.config.get('ADMIN_TOKEN')
+    if not admin_token:
+        # Loading a model unpickles it: never allow this without a token
+        return jsonify({'success': False, 'error': 'Model reload is disabled; set ADMIN_TOKEN'}), 403
+    if not hmac.compare_digest(request.headers.get('X-Admin-Token', ''), admin_token):
+        return jsonify({'success': False, 'error': 'Unauthorized'}), 401
+
+    try:
+        version = model_registry.reload()
+        return jsonify({'success': True, 'version': version})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@complaints_bp.route('/api/admin/email_queue')
+def email_queue():
+    return jsonify(email_outbox.depth())
+
+@complaints_bp.route('/api/admin/archive')
+def archive_status():
+    return jsonify(complaint_archiver.status())
+
 # ... keep the rest of your routes the same
 @complaints_bp.route('/forward_complaint', methods=['POST'])
 def forward_complaint():
@@ -109,37 +306,37 @@ def forward_complaint():
     
     try:
         # Get department details
-        department = db.fetch_one(
-            'SELECT name, email FROM departments WHERE id = ?', 
-            (department_id,)
-        )
+        department = department_directory.get(department_id)
         
         if not department:
             return jsonify({'success': False, 'error': 'Department not found'})
         
-        dept_name, dept_email = department
+        dept_name, dept_email = department['name'], department['email']
         
-        # Update complaint
-        forwarded_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        db.execute_query('''
-            UPDATE complaints 
-            SET forwarded = TRUE, forwarded_to = ?, forwarded_at = ?, 
-                assigned_department_id = ?, resolution_status = 'Assigned'
-            WHERE id = ?
-        ''', (dept_name, forwarded_at, department_id, complaint_id))
-        
-        # Get complaint details for email
-        complaint = db.fetch_one(
-            'SELECT complaint_text, predicted_category, timestamp FROM complaints WHERE id = ?',
-            (complaint_id,)
-        )
+        with db.transaction() as tx:
+            previous = event_snapshot(complaint_id, tx)
+            if previous is None:
+                return jsonify({'success': False, 'error': 'Complaint not found'})
+
+            # Update complaint, reading back what the email and event need
+            forwarded_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            rows = tx.execute_returning(f'''
+                UPDATE complaints 
+                SET forwarded = TRUE, forwarded_to = ?, forwarded_at = ?, 
+                    assigned_department_id = ?, resolution_status = 'Assigned'
+                WHERE id = ?
+                RETURNING complaint_text, {EVENT_COLUMNS}
+            ''', (dept_name, forwarded_at, department_id, complaint_id))
+            complaint_text = rows[0][0]
+            complaint = complaint_row_to_dict(EVENT_FIELDS, rows[0][1:])
+            event_bus.publish('assigned', complaint_id, complaint, previous, tx=tx)
         
         # Send email
         complaint_details = {
             'id': complaint_id,
-            'text': complaint[0],
-            'category': complaint[1],
-            'timestamp': complaint[2],
+            'text': complaint_text,
+            'category': complaint['predicted_category'],
+            'timestamp': complaint['timestamp'],
             'department': dept_name
         }
         
@@ -159,24 +356,29 @@ def complete_case():
     complaint_id = data.get('complaint_id')
     
     try:
-        # Get complaint and department details
-        complaint = db.fetch_one('''
-            SELECT c.complaint_text, c.predicted_category, c.forwarded_to, d.email
-            FROM complaints c
-            LEFT JOIN departments d ON c.assigned_department_id = d.id
-            WHERE c.id = ?
-        ''', (complaint_id,))
-        
-        if not complaint:
-            return jsonify({'success': False, 'error': 'Complaint not found'})
-        
-        # Update complaint status
-        completed_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        db.execute_query('''
-            UPDATE complaints 
-            SET resolution_status = 'Completed', case_completed = TRUE, completed_at = ?
-            WHERE id = ?
-        ''', (completed_at, complaint_id))
+        with db.transaction() as tx:
+            # Get complaint and department details
+            complaint = tx.fetch_one(f'''
+                SELECT c.complaint_text, c.predicted_category, c.forwarded_to, d.email,
+                       {', '.join('c.' + field for field in EVENT_FIELDS)}
+                FROM complaints c
+                LEFT JOIN departments d ON c.assigned_department_id = d.id
+                WHERE c.id = ?
+            ''', (complaint_id,))
+            
+            if not complaint:
+                return jsonify({'success': False, 'error': 'Complaint not found'})
+            
+            # Update complaint status
+            completed_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            rows = tx.execute_returning(f'''
+                UPDATE complaints 
+                SET resolution_status = 'Completed', case_completed = TRUE, completed_at = ?
+                WHERE id = ?
+                RETURNING {EVENT_COLUMNS}
+            ''', (completed_at, complaint_id))
+            event_bus.publish('completed', complaint_id, complaint_row_to_dict(EVENT_FIELDS, rows[0]),
+                              complaint_row_to_dict(EVENT_FIELDS, complaint[4:]), tx=tx)
         
         # Send completion email if department email exists
         complaint_details = {
@@ -199,59 +401,265 @@ def complete_case():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
+# Columns exposed by the complaint listing/detail APIs, in SELECT order
+COMPLAINT_FIELDS = {
+    'id': 'c.id',
+    'complaint_text': 'c.complaint_text',
+    'predicted_category': 'c.predicted_category',
+    'timestamp': 'c.timestamp',
+    'forwarded': 'c.forwarded',
+    'forwarded_to': 'c.forwarded_to',
+    'forwarded_at': 'c.forwarded_at',
+    'resolution_status': 'c.resolution_status',
+    'assigned_department_id': 'c.assigned_department_id',
+    'case_completed': 'c.case_completed',
+    'completed_at': 'c.completed_at',
+    'department_email': 'd.email',
+    'priority': 'c.priority',
+    'sla_breached': 'c.sla_breached',
+    'escalated_at': 'c.escalated_at',
+    'feedback_provided': 'c.feedback_provided',
+    'duplicate_of': 'c.duplicate_of',
+}
+BOOLEAN_FIELDS = {'forwarded', 'case_completed', 'sla_breached', 'feedback_provided'}
+
+def complaint_row_to_dict(fields, row):
+    item = dict(zip(fields, row))
+    for field in BOOLEAN_FIELDS.intersection(item):
+        item[field] = bool(item[field])
+    return item
+
+# Columns carried by live change events: what the case list and the
+# dashboard need to apply a change without reloading
+EVENT_FIELDS = ('id', 'predicted_category', 'timestamp', 'forwarded', 'forwarded_to', 'resolution_status',
+                'assigned_department_id', 'case_completed', 'completed_at', 'priority', 'sla_breached',
+                'duplicate_of')
+EVENT_COLUMNS = ', '.join(EVENT_FIELDS)
+
+def event_snapshot(complaint_id, source=db):
+    """Current event fields of a complaint, or None if it does not exist"""
+    row = source.fetch_one(f'SELECT {EVENT_COLUMNS} FROM complaints WHERE id = ?', (complaint_id,))
+    return complaint_row_to_dict(EVENT_FIELDS, row) if row else None
+
+def new_complaint_event(complaint_id, category, timestamp, priority, duplicate_of):
+    """Event fields of a just-inserted complaint, without reading it back"""
+    return {
+        'id': complaint_id, 'predicted_category': category, 'timestamp': timestamp,
+        'forwarded': False, 'forwarded_to': None, 'resolution_status': 'Pending',
+        'assigned_department_id': None, 'case_completed': False, 'completed_at': None,
+        'priority': priority, 'sla_breached': False, 'duplicate_of': duplicate_of,
+    }
+
+def requested_fields(args, available=COMPLAINT_FIELDS):
+    """Field names from the comma separated ?fields= argument (default: all)"""
+    fields = list(available)
+    if args.get('fields'):
+        requested = [f.strip() for f in args['fields'].split(',') if f.strip()]
+        unknown = [f for f in requested if f not in available]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        fields = requested
+    return fields
+
+def date_range_filters(args, column):
+    """Conditions for inclusive date_from/date_to (YYYY-MM-DD) on column"""
+    conditions, params = [], []
+    if args.get('date_from'):
+        conditions.append(f'{column} >= ?')
+        params.append(datetime.strptime(args['date_from'], '%Y-%m-%d').strftime('%Y-%m-%d'))
+    if args.get('date_to'):
+        day_after = datetime.strptime(args['date_to'], '%Y-%m-%d') + timedelta(days=1)
+        conditions.append(f'{column} < ?')
+        params.append(day_after.strftime('%Y-%m-%d'))
+    return conditions, params
+
+def complaint_filters(args):
+    """WHERE conditions and params for the status/category/department/priority/date filters"""
+    conditions = []
+    params = []
+    for arg, column in (('status', 'c.resolution_status'),
+                        ('category', 'c.predicted_category'),
+                        ('department_id', 'c.assigned_department_id'),
+                        ('priority', 'c.priority')):
+        if args.get(arg):
+            conditions.append(f'{column} = ?')
+            params.append(args[arg])
+
+    date_conditions, date_params = date_range_filters(args, 'c.timestamp')
+    conditions += date_conditions
+    params += date_params
+    if args.get('exclude_duplicates') == '1':
+        conditions.append('c.duplicate_of IS NULL')
+    return conditions, params
+
+def _encode_cursor(timestamp, complaint_id):
+    raw = json.dumps([timestamp, complaint_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+def _decode_cursor(cursor):
+    try:
+        timestamp, complaint_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return str(timestamp), int(complaint_id)
+    except (ValueError, TypeError, binascii.Error):
+        raise ValueError('Invalid cursor')
+
 @complaints_bp.route('/api/complaints')
 def get_complaints():
-    complaints = db.fetch_all('''
-        SELECT c.*, d.email as department_email
+    """List complaints newest first, one keyset page at a time.
+
+    Query parameters: limit, cursor (from the previous page's next_cursor),
+    status, category, department_id, priority, date_from/date_to
+    (YYYY-MM-DD, inclusive), exclude_duplicates=1 and fields (comma
+    separated column names).
+    Every filter has a matching (column, timestamp, id) index, so a page
+    costs O(limit) regardless of table size.
+    """
+    args = request.args
+    try:
+        limit = min(max(int(args.get('limit', 50)), 1), 500)
+
+        fields = requested_fields(args)
+        # The cursor is built from timestamp and id, so always select them
+        select_fields = fields + [f for f in ('timestamp', 'id') if f not in fields]
+
+        conditions, params = complaint_filters(args)
+        if args.get('cursor'):
+            conditions.append('(c.timestamp, c.id) < (?, ?)')
+            params.extend(_decode_cursor(args['cursor']))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    join = 'LEFT JOIN departments d ON c.assigned_department_id = d.id' if 'department_email' in select_fields else ''
+    rows = db.fetch_all(f'''
+        SELECT {', '.join(COMPLAINT_FIELDS[f] for f in select_fields)}
         FROM complaints c
-        LEFT JOIN departments d ON c.assigned_department_id = d.id
-        ORDER BY c.timestamp DESC
-    ''')
-    
-    complaints_list = []
-    for comp in complaints:
-        complaints_list.append({
-            'id': comp[0],
-            'complaint_text': comp[1],
-            'predicted_category': comp[2],
-            'timestamp': comp[3],
-            'forwarded': bool(comp[4]),
-            'forwarded_to': comp[5],
-            'forwarded_at': comp[6],
-            'resolution_status': comp[7],
-            'assigned_department_id': comp[8],
-            'case_completed': bool(comp[9]),
-            'completed_at': comp[10],
-            'department_email': comp[11]
-        })
-    
-    return jsonify(complaints_list)
+        {join}
+        {where}
+        ORDER BY c.timestamp DESC, c.id DESC
+        LIMIT ?
+    ''', params + [limit + 1])
 
-@complaints_bp.route('/api/complaint_details/<int:complaint_id>')
-def get_complaint_details(complaint_id):
-    complaint = db.fetch_one('''
-        SELECT c.*, d.email as department_email
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = None
+    if has_more:
+        last = dict(zip(select_fields, rows[-1]))
+        next_cursor = _encode_cursor(last['timestamp'], last['id'])
+
+    return jsonify({
+        'complaints': [complaint_row_to_dict(fields, row) for row in rows],
+        'next_cursor': next_cursor,
+        'has_more': has_more
+    })
+
+def _search_query(text):
+    """Turn free text into an FTS5 query: every word must match, the last as a prefix"""
+    terms = re.findall(r'\w+', text)
+    if not terms:
+        raise ValueError('Search query has no searchable words')
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+def _highlight(snippet):
+    # Snippets are HTML-escaped, then the match markers become <mark> tags
+    return html.escape(snippet or '').replace('\x02', '<mark>').replace('\x03', '</mark>')
+
+@complaints_bp.route('/api/complaints/search')
+def search_complaints():
+    """Full-text search over complaint text and case notes, best match first.
+
+    Query parameters: q (words, all required; syntax=fts passes q through as
+    an FTS5 expression), limit, offset, fields and the same filters as
+    /api/complaints. Archived cases are included. Each hit carries a bm25
+    score and HTML-safe snippets.
+    """
+    args = request.args
+    try:
+        limit = min(max(int(args.get('limit', 20)), 1), 100)
+        offset = min(max(int(args.get('offset', 0)), 0), 1000)
+        fields = requested_fields(args)
+        if not args.get('q', '').strip():
+            raise ValueError('Missing search query')
+        match = args['q'] if args.get('syntax') == 'fts' else _search_query(args['q'])
+        conditions, params = complaint_filters(args)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    join = 'LEFT JOIN departments d ON c.assigned_department_id = d.id' if 'department_email' in fields else ''
+    where = ''.join(f' AND {condition}' for condition in conditions)
+    try:
+        rows = db.fetch_all(f'''
+            SELECT {', '.join(COMPLAINT_FIELDS[f] for f in fields)},
+                   s.rank,
+                   snippet(complaint_search, 0, char(2), char(3), '…', 16),
+                   snippet(complaint_search, 1, char(2), char(3), '…', 16)
+            FROM complaint_search s
+            JOIN complaints_all c ON c.id = s.rowid
+            {join}
+            WHERE complaint_search MATCH ?{where}
+            ORDER BY s.rank
+            LIMIT ? OFFSET ?
+        ''', [match] + params + [limit + 1, offset])
+    except sqlite3.OperationalError as e:
+        return jsonify({'success': False, 'error': f"Invalid search query: {e}"}), 400
+
+    has_more = len(rows) > limit
+    results = []
+    for row in rows[:limit]:
+        item = complaint_row_to_dict(fields, row[:len(fields)])
+        score, text_snippet, note_snippet = row[len(fields):]
+        item['score'] = -score
+        item['snippet'] = _highlight(text_snippet)
+        item['note_snippet'] = _highlight(note_snippet) if note_snippet and '\x02' in note_snippet else None
+        results.append(item)
+
+    return jsonify({
+        'success': True,
+        'complaints': results,
+        'next_offset': offset + limit if has_more else None,
+        'has_more': has_more
+    })
+
+@complaints_bp.route('/api/complaints/<int:complaint_id>/duplicates')
+def get_duplicates(complaint_id):
+    """Complaints linked to this case as near-duplicates, newest first"""
+    try:
+        fields = requested_fields(request.args)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    join = 'LEFT JOIN departments d ON c.assigned_department_id = d.id' if 'department_email' in fields else ''
+    rows = db.fetch_all(f'''
+        SELECT {', '.join(COMPLAINT_FIELDS[f] for f in fields)}
         FROM complaints c
-        LEFT JOIN departments d ON c.assigned_department_id = d.id
-        WHERE c.id = ?
+        {join}
+        WHERE c.duplicate_of = ?
+        ORDER BY c.timestamp DESC, c.id DESC
     ''', (complaint_id,))
+    return jsonify({
+        'success': True,
+        'complaint_id': complaint_id,
+        'duplicates': [complaint_row_to_dict(fields, row) for row in rows]
+    })
+
+@complaints_bp.route('/api/complaint_details/<int:complaint_id>')
+def get_complaint_details(complaint_id):
+    fields = list(COMPLAINT_FIELDS)
+    # Archived cases are only reached through the union view
+    for table in ('complaints', 'complaints_all'):
+        complaint = db.fetch_one(f'''
+            SELECT {', '.join(COMPLAINT_FIELDS.values())}
+            FROM {table} c
+            LEFT JOIN departments d ON c.assigned_department_id = d.id
+            WHERE c.id = ?
+        ''', (complaint_id,))
+        if complaint:
+            break
     
     if complaint:
-        complaint_details = {
-            'id': complaint[0],
-            'complaint_text': complaint[1],
-            'predicted_category': complaint[2],
-            'timestamp': complaint[3],
-            'forwarded': bool(complaint[4]),
-            'forwarded_to': complaint[5],
-            'forwarded_at': complaint[6],
-            'resolution_status': complaint[7],
-            'assigned_department_id': complaint[8],
-            'case_completed': bool(complaint[9]),
-            'completed_at': complaint[10],
-            'department_email': complaint[11]
-        }
-        return jsonify(complaint_details)
+        return jsonify(complaint_row_to_dict(fields, complaint))
     else:
         return jsonify({'error': 'Complaint not found'}), 404
     
@@ -260,21 +668,19 @@ def test_prediction():
     """Test route to verify model is working"""
     try:
         test_complaint = "I have issues with my billing statement"
-        X_input = tfidf_vect.transform([test_complaint])
-        prediction = model.predict(X_input)
-        predicted_label = encoder.inverse_transform(prediction)[0]
+        predicted_label = model_registry.classify([test_complaint])[0]
         
         return jsonify({
             'success': True,
             'test_complaint': test_complaint,
             'prediction': predicted_label,
-            'model_loaded': model_loaded
+            'model_loaded': model_registry.version is not None
         })
     except Exception as e:
         return jsonify({
             'success': False,
             'error': str(e),
-            'model_loaded': model_loaded
+            'model_loaded': model_registry.version is not None
         })
     
 
@@ -286,7 +692,12 @@ def delete_case():
     
     try:
         # Delete the complaint from database
-        db.execute_query('DELETE FROM complaints WHERE id = ?', (complaint_id,))
+        with db.transaction() as tx:
+            deleted = tx.execute_returning(f'DELETE FROM complaints WHERE id = ? RETURNING {EVENT_COLUMNS}',
+                                           (complaint_id,))
+            if deleted:
+                event_bus.publish('deleted', deleted[0][0], None, complaint_row_to_dict(EVENT_FIELDS, deleted[0]),
+                                  tx=tx)
         
         return jsonify({'success': True, 'message': 'Case deleted successfully'})
     except Exception as e:
@@ -300,73 +711,73 @@ def update_case():
     resolution_status = data.get('resolution_status')
     
     try:
+        if not department_id and not resolution_status:
+            return jsonify({'success': False, 'error': 'No updates provided'})
+
         if department_id:
             # Get department details
-            department = db.fetch_one(
-                'SELECT name, email FROM departments WHERE id = ?', 
-                (department_id,)
-            )
+            department = department_directory.get(department_id)
             
             if not department:
                 return jsonify({'success': False, 'error': 'Department not found'})
             
-            dept_name, dept_email = department
-            
-            # Update complaint with department assignment
-            forwarded_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            db.execute_query('''
-                UPDATE complaints 
-                SET forwarded = TRUE, forwarded_to = ?, forwarded_at = ?, 
-                    assigned_department_id = ?, resolution_status = ?
-                WHERE id = ?
-            ''', (dept_name, forwarded_at, department_id, resolution_status, complaint_id))
-            
-            # Get complaint details for email
-            complaint = db.fetch_one(
-                'SELECT complaint_text, predicted_category, timestamp FROM complaints WHERE id = ?',
-                (complaint_id,)
-            )
-            
-            # Send email only if this is a new assignment
-            existing_assignment = db.fetch_one(
-                'SELECT assigned_department_id FROM complaints WHERE id = ?',
-                (complaint_id,)
-            )
-            
-            if existing_assignment and existing_assignment[0] is None:
-                # This is a new assignment, send email
-                complaint_details = {
-                    'id': complaint_id,
-                    'text': complaint[0],
-                    'category': complaint[1],
-                    'timestamp': complaint[2],
-                    'department': dept_name
-                }
-                email_sent = email_service.send_complaint_forward_email(dept_email, complaint_details)
+            dept_name, dept_email = department['name'], department['email']
+
+        with db.transaction() as tx:
+            # Read the current state before changing it: the event needs it,
+            # and an email goes out only when no department was assigned yet
+            previous = event_snapshot(complaint_id, tx)
+            if previous is None:
+                return jsonify({'success': False, 'error': 'Complaint not found'})
+
+            if department_id:
+                # Update complaint with department assignment
+                forwarded_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                rows = tx.execute_returning(f'''
+                    UPDATE complaints 
+                    SET forwarded = TRUE, forwarded_to = ?, forwarded_at = ?, 
+                        assigned_department_id = ?, resolution_status = ?
+                    WHERE id = ?
+                    RETURNING complaint_text, {EVENT_COLUMNS}
+                ''', (dept_name, forwarded_at, department_id, resolution_status, complaint_id))
+                complaint_text = rows[0][0]
+                complaint = complaint_row_to_dict(EVENT_FIELDS, rows[0][1:])
+                event_bus.publish('assigned', complaint_id, complaint, previous, tx=tx)
             else:
-                email_sent = False
-            
-            return jsonify({
-                'success': True, 
-                'forwarded_at': forwarded_at,
-                'email_sent': email_sent,
-                'message': 'Case updated and assigned to department successfully'
-            })
-        
-        elif resolution_status:
-            # Only update resolution status
-            db.execute_query('''
-                UPDATE complaints 
-                SET resolution_status = ?
-                WHERE id = ?
-            ''', (resolution_status, complaint_id))
-            
+                # Only update resolution status
+                rows = tx.execute_returning(f'''
+                    UPDATE complaints 
+                    SET resolution_status = ?
+                    WHERE id = ?
+                    RETURNING {EVENT_COLUMNS}
+                ''', (resolution_status, complaint_id))
+                event_bus.publish('status', complaint_id, complaint_row_to_dict(EVENT_FIELDS, rows[0]), previous,
+                                  tx=tx)
+
+        if not department_id:
             return jsonify({
                 'success': True,
                 'message': 'Case status updated successfully'
             })
-        else:
-            return jsonify({'success': False, 'error': 'No updates provided'})
+
+        # Send email only if this is a new assignment
+        email_sent = False
+        if previous['assigned_department_id'] is None:
+            complaint_details = {
+                'id': complaint_id,
+                'text': complaint_text,
+                'category': complaint['predicted_category'],
+                'timestamp': complaint['timestamp'],
+                'department': dept_name
+            }
+            email_sent = email_service.send_complaint_forward_email(dept_email, complaint_details)
+        
+        return jsonify({
+            'success': True, 
+            'forwarded_at': forwarded_at,
+            'email_sent': email_sent,
+            'message': 'Case updated and assigned to department successfully'
+        })
             
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
@@ -374,65 +785,54 @@ def update_case():
 
 @complaints_bp.route('/api/sla_check')
 def check_sla_violations():
-    """Check for SLA violations and escalate"""
+    """Check for SLA violations and escalate (?full=1 sweeps behind the high-water mark)"""
     try:
-        # Find complaints that are overdue
-        overdue_complaints = db.fetch_all('''
-            SELECT id, predicted_category, timestamp, resolution_status 
-            FROM complaints 
-            WHERE resolution_status IN ('Pending', 'Assigned')
-            AND datetime(timestamp) < datetime('now', '-24 hours')
-        ''')
-        
-        for complaint in overdue_complaints:
-            complaint_id, category, timestamp, status = complaint
-            
-            # Escalate the complaint
-            db.execute_query('''
-                UPDATE complaints 
-                SET resolution_status = 'Escalated', 
-                    sla_breached = TRUE,
-                    escalated_at = ?
-                WHERE id = ?
-            ''', (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), complaint_id))
-            
-            print(f"⚠️ SLA Breach: Complaint #{complaint_id} escalated")
-        
+        escalated = sla_engine.run(full=request.args.get('full') == '1')
         return jsonify({
             'success': True,
-            'escalated_count': len(overdue_complaints)
+            'escalated_count': len(escalated),
+            'escalated_ids': [row[0] for row in escalated]
         })
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
+@complaints_bp.route('/api/sla_status')
+def sla_status():
+    """Current SLA thresholds and the last escalation run"""
+    try:
+        return jsonify({'success': True, 'sla': sla_engine.status()})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
 @complaints_bp.route('/api/priority_analysis')
 def priority_analysis():
-    """Analyze complaints and assign priority"""
+    """Score complaints that were stored before priority scoring ran at insert time"""
     try:
-        complaints = db.fetch_all('''
-            SELECT id, complaint_text, predicted_category, timestamp 
-            FROM complaints 
-            WHERE priority IS NULL
-        ''')
-        
-        for complaint in complaints:
-            complaint_id, text, category, timestamp = complaint
-            
-            # Simple priority logic (can be enhanced with ML)
-            priority = 'Medium'
-            text_lower = text.lower()
-            
-            if any(word in text_lower for word in ['urgent', 'emergency', 'critical', 'immediately']):
-                priority = 'High'
-            elif any(word in text_lower for word in ['not working', 'broken', 'failed', 'outage']):
-                priority = 'High'
-            elif category in ['Billing', 'Technical']:
-                priority = 'High'
-            
-            db.execute_query('''
-                UPDATE complaints SET priority = ? WHERE id = ?
-            ''', (priority, complaint_id))
-        
-        return jsonify({'success': True, 'updated_count': len(complaints)})
+        chunk_size = current_app.config.get('PRIORITY_BACKFILL_CHUNK', 1000)
+        updated = 0
+        last_id = 0
+        while True:
+            complaints = db.fetch_all('''
+                SELECT id, complaint_text, predicted_category
+                FROM complaints
+                WHERE priority_scored_at IS NULL AND id > ?
+                ORDER BY id LIMIT ?
+            ''', (last_id, chunk_size))
+            if not complaints:
+                break
+
+            ids, texts, categories = zip(*complaints)
+            texts = [text or '' for text in texts]
+            priorities = score_priorities(texts, categories)
+
+            scored_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            db.execute_many('''
+                UPDATE complaints SET priority = ?, priority_scored_at = ? WHERE id = ?
+            ''', [(priority, scored_at, complaint_id)
+                  for complaint_id, priority in zip(ids, priorities)])
+            updated += len(ids)
+            last_id = ids[-1]
+
+        return jsonify({'success': True, 'updated_count': updated})
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)})
\ No newline at end of file
+        return jsonify({'success': False, 'error': str(e)})
@@ -1,89 +1,100 @@
 from flask import Blueprint, jsonify, render_template
-from models.database import Database
+from models.archiver import complaint_archiver
+from models.database import db
+from models.department_directory import department_directory
+from models.response_cache import response_cache
 from datetime import datetime, timedelta
 from collections import Counter
 
 dashboard_bp = Blueprint('dashboard', __name__)
-db = Database()
 
 @dashboard_bp.route('/dashboard')
 def dashboard():
     return render_template('dashboard.html')
 
 @dashboard_bp.route('/api/analytics')
+@response_cache.cached('analytics')
 def get_analytics():
+    """Dashboard analytics served from the trigger-maintained rollup tables.
+
+    All-time figures come from complaint_rollup_totals (one row per
+    category/status/department) and time-bucketed figures from bounded
+    ranges of complaint_rollup_daily, so the cost does not grow with the
+    number of complaints.
+    """
     try:
-        # Get all complaints
-        complaints = db.fetch_all('''
-            SELECT predicted_category, timestamp, forwarded, resolution_status, 
-                   case_completed, assigned_department_id
-            FROM complaints
-        ''')
-        
-        # Get departments
-        departments = db.fetch_all('SELECT id, name FROM departments')
-        dept_names = {dept[0]: dept[1] for dept in departments}
-        
-        total_complaints = len(complaints)
-        
-        # Category distribution
-        categories = [comp[0] for comp in complaints]
-        category_counts = Counter(categories)
-        
-        # Forwarding status
-        forwarded_count = sum(1 for comp in complaints if comp[2])
-        not_forwarded_count = total_complaints - forwarded_count
-        
-        # Resolution status
-        status_counts = Counter(comp[3] for comp in complaints)
-        
-        # Case completion
-        completed_count = sum(1 for comp in complaints if comp[4])
-        
-        # Department distribution
-        dept_complaints = Counter(comp[5] for comp in complaints if comp[5])
-        department_stats = {dept_names.get(dept_id, 'Unknown'): count 
-                          for dept_id, count in dept_complaints.items()}
-        
-        # Monthly trends (last 6 months)
-        monthly_data = {}
-        for i in range(6):
-            month = datetime.now().replace(day=1) - timedelta(days=30*i)
-            month_key = month.strftime("%Y-%m")
-            
-            count = db.fetch_one('''
-                SELECT COUNT(*) FROM complaints 
-                WHERE strftime('%Y-%m', timestamp) = ?
-            ''', (month_key,))
-            
-            if count:
-                monthly_data[month_key] = count[0]
+        now = datetime.now()
+
+        # One read transaction, so the figures and last_event_id agree
+        with db.snapshot() as snapshot:
+            # All-time totals, grouped by every dimension in one read
+            rollups = snapshot.fetch_all('''
+                SELECT category, status, department_id, complaint_count,
+                       forwarded_count, completed_count, response_hours_sum, response_count
+                FROM complaint_rollup_totals
+            ''')
+        
+            # Get departments
+            dept_names = {dept['id']: dept['name'] for dept in department_directory.all()}
+        
+            category_counts = Counter()
+            status_counts = Counter()
+            dept_complaints = Counter()
+            total_complaints = forwarded_count = completed_count = response_count = 0
+            response_hours_sum = 0.0
+            for category, status, dept_id, count, forwarded, completed, hours_sum, responses in rollups:
+                category_counts[category] += count
+                status_counts[status] += count
+                if dept_id:
+                    dept_complaints[dept_id] += count
+                total_complaints += count
+                forwarded_count += forwarded
+                completed_count += completed
+                response_hours_sum += hours_sum
+                response_count += responses
+        
+            not_forwarded_count = total_complaints - forwarded_count
+            department_stats = {dept_names.get(dept_id, 'Unknown'): count 
+                              for dept_id, count in dept_complaints.items()}
+        
+            # Monthly trends (last 6 calendar months)
+            month_starts = [now.replace(day=1)]
+            for _ in range(5):
+                month_starts.append((month_starts[-1] - timedelta(days=1)).replace(day=1))
+            monthly_data = {month.strftime("%Y-%m"): 0 for month in month_starts}
+        
+            monthly_rows = snapshot.fetch_all('''
+                SELECT substr(day, 1, 7), SUM(complaint_count)
+                FROM complaint_rollup_daily
+                WHERE day >= ?
+                GROUP BY substr(day, 1, 7)
+            ''', (month_starts[-1].strftime("%Y-%m-%d"),))
+            for month_key, count in monthly_rows:
+                if month_key in monthly_data:
+                    monthly_data[month_key] = count
+        
+            # Response time analysis
+            avg_response_hours = round(response_hours_sum / response_count, 1) if response_count else 0
+        
+            # Today's complaints
+            today = now.strftime("%Y-%m-%d")
+            today_count_result = snapshot.fetch_one('''
+                SELECT SUM(complaint_count) FROM complaint_rollup_daily WHERE day = ?
+            ''', (today,))
+            today_count = (today_count_result[0] or 0) if today_count_result else 0
+        
+            # Calculate days since first complaint for average
+            first_complaint_result = snapshot.fetch_one('SELECT MIN(day) FROM complaint_rollup_daily')
+            if first_complaint_result and first_complaint_result[0]:
+                first_date = datetime.strptime(first_complaint_result[0], '%Y-%m-%d')
+                days_since_first = (now - first_date).days
+                avg_complaints_per_day = total_complaints / max(1, days_since_first)
             else:
-                monthly_data[month_key] = 0
-        
-        # Response time analysis
-        response_time_result = db.fetch_one('''
-            SELECT AVG((julianday(forwarded_at) - julianday(timestamp)) * 24) 
-            FROM complaints WHERE forwarded = TRUE AND forwarded_at IS NOT NULL
-        ''')
-        avg_response_hours = round(response_time_result[0], 1) if response_time_result and response_time_result[0] else 0
-        
-        # Today's complaints
-        today = datetime.now().strftime("%Y-%m-%d")
-        today_count_result = db.fetch_one('''
-            SELECT COUNT(*) FROM complaints WHERE date(timestamp) = ?
-        ''', (today,))
-        today_count = today_count_result[0] if today_count_result else 0
-        
-        # Calculate days since first complaint for average
-        first_complaint_result = db.fetch_one('SELECT MIN(timestamp) FROM complaints')
-        if first_complaint_result and first_complaint_result[0]:
-            first_date = datetime.strptime(first_complaint_result[0], '%Y-%m-%d %H:%M:%S')
-            days_since_first = (datetime.now() - first_date).days
-            avg_complaints_per_day = total_complaints / max(1, days_since_first)
-        else:
-            avg_complaints_per_day = 0
+                avg_complaints_per_day = 0
         
+            # Live event id these figures include; clients apply later events on top
+            last_event = snapshot.fetch_one('SELECT MAX(id) FROM change_events')
+
         analytics = {
             'total_complaints': total_complaints,
             'category_distribution': dict(category_counts),
@@ -100,7 +111,8 @@ def get_analytics():
             'department_stats': department_stats,
             'avg_response_hours': avg_response_hours,
             'today_complaints': today_count,
-            'avg_complaints_per_day': round(avg_complaints_per_day, 1)
+            'avg_complaints_per_day': round(avg_complaints_per_day, 1),
+            'last_event_id': last_event[0] or 0
         }
         
         return jsonify(analytics)
@@ -112,41 +124,38 @@ def get_analytics():
 
 
 @dashboard_bp.route('/api/kpi_metrics')
+@response_cache.cached('kpi_metrics')
 def get_kpi_metrics():
     try:
-        # Total complaints
-        total_complaints = db.fetch_one('SELECT COUNT(*) FROM complaints')[0]
-        
-        # Resolved complaints (last 30 days)
-        resolved_30_days = db.fetch_one('''
-            SELECT COUNT(*) FROM complaints 
-            WHERE case_completed = TRUE 
-            AND datetime(completed_at) > datetime('now', '-30 days')
-        ''')[0]
-        
-        # Average resolution time
-        avg_resolution = db.fetch_one('''
-            SELECT AVG((julianday(completed_at) - julianday(timestamp)) * 24) 
-            FROM complaints WHERE case_completed = TRUE
-        ''')[0]
-        
-        # SLA compliance rate
-        total_with_sla = db.fetch_one('''
-            SELECT COUNT(*) FROM complaints 
-            WHERE datetime(timestamp) < datetime('now', '-24 hours')
-        ''')[0]
-        
-        sla_breached = db.fetch_one('''
-            SELECT COUNT(*) FROM complaints WHERE sla_breached = TRUE
-        ''')[0]
+        now = datetime.now()
+        
+        # Every KPI in one pass over complaints using conditional aggregates
+        (total_complaints, resolved_30_days, resolution_hours, resolution_count,
+         total_with_sla, sla_breached, avg_rating) = db.fetch_one('''
+            SELECT COUNT(*),
+                   COALESCE(SUM(case_completed = TRUE AND completed_at > ?), 0),
+                   COALESCE(SUM(CASE WHEN case_completed = TRUE
+                       THEN (julianday(completed_at) - julianday(timestamp)) * 24 END), 0),
+                   COUNT(CASE WHEN case_completed = TRUE
+                       THEN (julianday(completed_at) - julianday(timestamp)) END),
+                   COALESCE(SUM(timestamp < ?), 0),
+                   COALESCE(SUM(sla_breached = TRUE), 0),
+                   (SELECT AVG(rating) FROM feedback WHERE rating IS NOT NULL)
+            FROM complaints
+        ''', ((now - timedelta(days=30)).strftime("%Y-%m-%d %H:%M:%S"),
+              (now - timedelta(hours=24)).strftime("%Y-%m-%d %H:%M:%S")))
+
+        # Archived cases are all completed, and long past their SLA window
+        archived, archived_hours, archived_breached = complaint_archiver.totals()
+        total_complaints += archived
+        resolution_hours += archived_hours
+        resolution_count += archived
+        total_with_sla += archived
+        sla_breached += archived_breached
+        avg_resolution = resolution_hours / resolution_count if resolution_count else None
         
         sla_compliance = ((total_with_sla - sla_breached) / total_with_sla * 100) if total_with_sla > 0 else 100
         
-        # Customer satisfaction
-        avg_rating = db.fetch_one('''
-            SELECT AVG(rating) FROM feedback WHERE rating IS NOT NULL
-        ''')[0]
-        
         metrics = {
             'total_complaints': total_complaints,
             'resolved_30_days': resolved_30_days,
@@ -158,4 +167,4 @@ def get_kpi_metrics():
         
         return jsonify(metrics)
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
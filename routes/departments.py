@@ -5,8 +5,8 @@ from datetime import datetime
 departments_bp = Blueprint('departments', __name__)
 
 # Initialize database
-from models.database import Database
-db = Database()
+from models.database import db
+from models.department_directory import department_directory
 
 @departments_bp.route('/departments')
 def departments_page():
@@ -14,22 +14,7 @@ def departments_page():
 
 @departments_bp.route('/api/departments', methods=['GET'])
 def get_departments():
-    departments = db.fetch_all('''
-        SELECT id, name, email, description, created_at 
-        FROM departments ORDER BY name
-    ''')
-    
-    departments_list = []
-    for dept in departments:
-        departments_list.append({
-            'id': dept[0],
-            'name': dept[1],
-            'email': dept[2],
-            'description': dept[3],
-            'created_at': dept[4]
-        })
-    
-    return jsonify(departments_list)
+    return jsonify(department_directory.all())
 
 @departments_bp.route('/api/departments', methods=['POST'])
 def add_department():
@@ -47,6 +32,7 @@ def add_department():
             INSERT INTO departments (name, email, description, created_at)
             VALUES (?, ?, ?, ?)
         ''', (name, email, description, created_at))
+        department_directory.invalidate()
         
         return jsonify({'success': True})
     except sqlite3.IntegrityError:
@@ -57,9 +43,9 @@ def add_department():
 @departments_bp.route('/api/departments/<int:dept_id>', methods=['DELETE'])
 def delete_department(dept_id):
     try:
-        # Check if department has assigned complaints
+        # Check if department has assigned complaints, archived ones included
         assigned_complaints = db.fetch_one(
-            'SELECT COUNT(*) FROM complaints WHERE assigned_department_id = ?', 
+            'SELECT COUNT(*) FROM complaints_all WHERE assigned_department_id = ?', 
             (dept_id,)
         )
         
@@ -70,6 +56,7 @@ def delete_department(dept_id):
             })
         
         db.execute_query('DELETE FROM departments WHERE id = ?', (dept_id,))
+        department_directory.invalidate()
         return jsonify({'success': True})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
\ No newline at end of file
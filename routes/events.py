@@ -0,0 +1,16 @@
+from flask import Blueprint, Response, request
+
+from models.event_bus import event_bus, parse_last_event_id
+
+events_bp = Blueprint('events', __name__)
+
+@events_bp.route('/api/events')
+def complaint_events():
+    """Server-sent stream of complaint changes (resume with Last-Event-ID or ?last_event_id=)"""
+    last_event_id = parse_last_event_id(
+        request.headers.get('Last-Event-ID', ''), request.args.get('last_event_id', '')
+    )
+    response = Response(event_bus.stream(last_event_id), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
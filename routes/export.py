@@ -0,0 +1,122 @@
+from flask import Blueprint, Response, request, jsonify, current_app
+from models.database import db
+from routes.complaints import (
+    COMPLAINT_FIELDS, BOOLEAN_FIELDS, complaint_filters, date_range_filters, requested_fields
+)
+import csv
+import io
+import json
+
+export_bp = Blueprint('export', __name__)
+
+FEEDBACK_FIELDS = {
+    'id': 'f.id',
+    'complaint_id': 'f.complaint_id',
+    'rating': 'f.rating',
+    'comments': 'f.comments',
+    'created_at': 'f.created_at',
+    'predicted_category': 'c.predicted_category',
+    'assigned_department_id': 'c.assigned_department_id',
+}
+
+def _stream_rows(query, params, fields, export_format, filename):
+    """Stream a query as CSV or NDJSON, holding one fetchmany() chunk at a time"""
+    chunk_size = current_app.config.get('EXPORT_CHUNK_SIZE', 1000)
+    booleans = {i for i, field in enumerate(fields) if field in BOOLEAN_FIELDS}
+
+    def generate():
+        # A dedicated connection: a long export must not hold a pooled one
+        conn = db.get_connection()
+        try:
+            cursor = conn.execute(query, params)
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            if export_format == 'csv':
+                writer.writerow(fields)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                if booleans:
+                    rows = [tuple(bool(v) if i in booleans and v is not None else v
+                                  for i, v in enumerate(row)) for row in rows]
+                if export_format == 'csv':
+                    writer.writerows(rows)
+                else:
+                    for row in rows:
+                        buffer.write(json.dumps(dict(zip(fields, row))))
+                        buffer.write('\n')
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            # Anything still buffered (only the CSV header of an empty export)
+            if buffer.getvalue():
+                yield buffer.getvalue()
+        finally:
+            conn.close()
+
+    mimetype = 'text/csv' if export_format == 'csv' else 'application/x-ndjson'
+    extension = 'csv' if export_format == 'csv' else 'ndjson'
+    return Response(generate(), mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename={filename}.{extension}',
+        'X-Accel-Buffering': 'no'
+    })
+
+def _export_format(args):
+    export_format = args.get('format', 'csv').lower()
+    if export_format not in ('csv', 'ndjson'):
+        raise ValueError("format must be 'csv' or 'ndjson'")
+    return export_format
+
+@export_bp.route('/api/export/complaints')
+def export_complaints():
+    """Stream complaints oldest first as CSV or NDJSON.
+
+    Query parameters: format (csv or ndjson), fields, and the filters of
+    /api/complaints (status, category, department_id, priority,
+    date_from/date_to, exclude_duplicates). include_archived=1 adds the
+    archived cases, at the cost of sorting the whole result.
+    """
+    args = request.args
+    try:
+        export_format = _export_format(args)
+        fields = requested_fields(args)
+        conditions, params = complaint_filters(args)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    join = 'LEFT JOIN departments d ON c.assigned_department_id = d.id' if 'department_email' in fields else ''
+    table = 'complaints_all' if args.get('include_archived') in ('1', 'true') else 'complaints'
+    query = f'''
+        SELECT {', '.join(COMPLAINT_FIELDS[f] for f in fields)}
+        FROM {table} c
+        {join}
+        {where}
+        ORDER BY c.timestamp, c.id
+    '''
+    return _stream_rows(query, params, fields, export_format, 'complaints')
+
+@export_bp.route('/api/export/feedback')
+def export_feedback():
+    """Stream feedback oldest first as CSV or NDJSON (format, fields, date_from/date_to)"""
+    args = request.args
+    try:
+        export_format = _export_format(args)
+        fields = requested_fields(args, FEEDBACK_FIELDS)
+        conditions, params = date_range_filters(args, 'f.created_at')
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    # Feedback outlives the move to the archive, so look its case up in both
+    join = 'LEFT JOIN complaints_all c ON c.id = f.complaint_id' if any(
+        FEEDBACK_FIELDS[f].startswith('c.') for f in fields) else ''
+    query = f'''
+        SELECT {', '.join(FEEDBACK_FIELDS[f] for f in fields)}
+        FROM feedback f
+        {join}
+        {where}
+        ORDER BY f.created_at, f.id
+    '''
+    return _stream_rows(query, params, fields, export_format, 'feedback')
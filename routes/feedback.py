@@ -1,9 +1,8 @@
 from flask import Blueprint, request, jsonify
-from models.database import Database
+from models.database import db
 from datetime import datetime
 
 feedback_bp = Blueprint('feedback', __name__)
-db = Database()
 
 @feedback_bp.route('/api/feedback', methods=['POST'])
 def submit_feedback():
@@ -15,15 +14,17 @@ def submit_feedback():
     try:
         created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
-        db.execute_query('''
-            INSERT INTO feedback (complaint_id, rating, comments, created_at)
-            VALUES (?, ?, ?, ?)
-        ''', (complaint_id, rating, comments, created_at))
-        
-        # Update complaint with feedback status
-        db.execute_query('''
-            UPDATE complaints SET feedback_provided = TRUE WHERE id = ?
-        ''', (complaint_id,))
+        # Store the feedback and flag the complaint in one transaction
+        with db.transaction() as tx:
+            tx.execute_query('''
+                INSERT INTO feedback (complaint_id, rating, comments, created_at)
+                VALUES (?, ?, ?, ?)
+            ''', (complaint_id, rating, comments, created_at))
+            
+            # Update complaint with feedback status
+            tx.execute_query('''
+                UPDATE complaints SET feedback_provided = TRUE WHERE id = ?
+            ''', (complaint_id,))
         
         return jsonify({'success': True, 'message': 'Feedback submitted successfully'})
     except Exception as e: